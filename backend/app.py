@@ -4,6 +4,7 @@ Main Flask application
 from flask import Flask, jsonify
 from flask_cors import CORS
 from app_config import config
+from utils.cache import cache
 from routes.stock_routes import stock_bp
 from routes.indicators_routes import indicators_bp
 from routes.wyckoff_routes import wyckoff_bp
@@ -22,6 +23,7 @@ def create_app(config_name='default'):
     """Create and configure Flask app"""
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    cache.init_app(app)
     
     # Enable CORS for all routes
     CORS(app)
@@ -67,6 +69,7 @@ def create_app(config_name='default'):
                     'get_enabled_indicators': 'GET /api/indicators/',
                     'get_indicators_config': 'GET /api/indicators/config',
                     'get_symbol_indicators': 'GET /api/indicators/<symbol>',
+                    'get_batch_indicators': 'POST /api/indicators/batch',
                     'calculate_indicators': 'POST /api/indicators/<symbol>/calculate',
                     'calculate_all_indicators': 'POST /api/indicators/calculate-all',
                     'get_latest_indicators': 'GET /api/indicators/latest/<symbol>'
@@ -19,6 +19,8 @@ class Config:
     MYSQL_USER = os.environ.get('MYSQL_USER') or 'root'
     MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD') or ''
     MYSQL_DATABASE = os.environ.get('MYSQL_DATABASE') or 'kyzereye_stock_data'
+    # Allow LOAD DATA LOCAL INFILE for bulk loads (server must enable local_infile too)
+    MYSQL_LOCAL_INFILE = os.environ.get('MYSQL_LOCAL_INFILE', 'False').lower() == 'true'
     
     @property
     def DATABASE_URI(self):
@@ -46,8 +46,10 @@ def get_stock_data_for_symbol(symbol_id: int):
         return None
     
     try:
+        # Prices are cast to DOUBLE in SQL so they arrive as floats rather than Decimals
         query = """
-            SELECT date, open, high, low, close, volume
+            SELECT date, CAST(open AS DOUBLE) AS open, CAST(high AS DOUBLE) AS high,
+                   CAST(low AS DOUBLE) AS low, CAST(close AS DOUBLE) AS close, volume
             FROM daily_stock_data
             WHERE symbol_id = %s
             ORDER BY date ASC
@@ -66,8 +68,8 @@ def get_stock_data_for_symbol(symbol_id: int):
     finally:
         db.disconnect()
 
-def calculate_indicators_for_all_symbols():
-    """Calculate indicators for all symbols with data"""
+def calculate_indicators_for_all_symbols(incremental: bool = False):
+    """Calculate indicators for all symbols with data (incremental: only bars newer than stored indicators)"""
     print("🔍 Finding symbols with stock data...")
     
     symbols = get_all_symbols_with_data()
@@ -88,12 +90,13 @@ def calculate_indicators_for_all_symbols():
     success_count = 0
     failed_count = 0
     
+    # Load every symbol's data, then calculate them in parallel
+    symbol_dfs = {}
+    symbol_names = {}
     for symbol in symbols:
         symbol_id = symbol['id']
         symbol_name = symbol['symbol']
         
-        print(f"\n🔄 Processing {symbol_name}...")
-        
         # Get stock data
         df = get_stock_data_for_symbol(symbol_id)
         if df is None or df.empty:
@@ -101,19 +104,28 @@ def calculate_indicators_for_all_symbols():
             failed_count += 1
             continue
         
-        print(f"  📊 Data: {len(df)} rows from {df['date'].min()} to {df['date'].max()}")
-        
-        # Calculate and store indicators
-        try:
-            success = service.calculate_and_store_indicators(symbol_id, df)
-            if success:
-                print(f"  ✅ Successfully calculated indicators for {symbol_name}")
-                success_count += 1
-            else:
-                print(f"  ❌ Failed to calculate indicators for {symbol_name}")
-                failed_count += 1
-        except Exception as e:
-            print(f"  ❌ Error processing {symbol_name}: {e}")
+        print(f"  📊 {symbol_name}: {len(df)} rows from {df['date'].min()} to {df['date'].max()}")
+        symbol_dfs[symbol_id] = df
+        symbol_names[symbol_id] = symbol_name
+    
+    print(f"\n🔄 Processing {len(symbol_dfs)} symbols...")
+    
+    # Calculate and store indicators
+    try:
+        if incremental:
+            results = {symbol_id: service.update_indicators(symbol_id, df) for symbol_id, df in symbol_dfs.items()}
+        else:
+            results = service.calculate_and_store_indicators_batch(symbol_dfs)
+    except Exception as e:
+        print(f"  ❌ Error processing symbols: {e}")
+        results = {}
+    
+    for symbol_id, symbol_name in symbol_names.items():
+        if results.get(symbol_id):
+            print(f"  ✅ Successfully calculated indicators for {symbol_name}")
+            success_count += 1
+        else:
+            print(f"  ❌ Failed to calculate indicators for {symbol_name}")
             failed_count += 1
     
     # Summary
@@ -122,7 +134,7 @@ def calculate_indicators_for_all_symbols():
     print(f"  ❌ Failed: {failed_count} symbols")
     print(f"  📊 Total processed: {len(symbols)} symbols")
 
-def calculate_indicators_for_symbol(symbol: str):
+def calculate_indicators_for_symbol(symbol: str, incremental: bool = False):
     """Calculate indicators for a specific symbol"""
     db = get_db_connection()
     if not db.connect():
@@ -151,7 +163,10 @@ def calculate_indicators_for_symbol(symbol: str):
         
         # Calculate and store indicators
         service = TechnicalIndicatorsService()
-        success = service.calculate_and_store_indicators(symbol_id, df)
+        if incremental:
+            success = service.update_indicators(symbol_id, df)
+        else:
+            success = service.calculate_and_store_indicators(symbol_id, df)
         
         if success:
             print(f"✅ Successfully calculated indicators for {symbol.upper()}")
@@ -168,13 +183,17 @@ def main():
     print("📈 Technical Indicators Calculator")
     print("=" * 50)
     
-    if len(sys.argv) > 1:
+    # --incremental only calculates bars newer than the stored indicators
+    incremental = '--incremental' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--incremental']
+    
+    if args:
         # Calculate for specific symbol
-        symbol = sys.argv[1].upper()
-        calculate_indicators_for_symbol(symbol)
+        symbol = args[0].upper()
+        calculate_indicators_for_symbol(symbol, incremental)
     else:
         # Calculate for all symbols
-        calculate_indicators_for_all_symbols()
+        calculate_indicators_for_all_symbols(incremental)
 
 if __name__ == "__main__":
     main()
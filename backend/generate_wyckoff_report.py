@@ -85,21 +85,27 @@ def generate_wyckoff_report():
     
     # Initialize Wyckoff analysis service
     wyckoff_service = WyckoffAnalysisService()
-    analysis_results = []
     
+    print(f"\n📥 Loading stock data...")
+    symbol_dfs = {}
+    for symbol in symbols:
+        df = get_stock_data_for_symbol(symbol['id'])
+        if df is not None and not df.empty:
+            symbol_dfs[symbol['symbol']] = df
+    
+    # The analyses are independent and CPU-bound, so they run across worker processes
     print(f"\n🔄 Analyzing stocks using Wyckoff Method...")
     print("-" * 60)
+    analyses = iter(wyckoff_service.batch_analyze(symbol_dfs))
+    analysis_results = []
     
     for i, symbol in enumerate(symbols, 1):
-        symbol_id = symbol['id']
         symbol_name = symbol['symbol']
         
-        print(f"[{i}/{len(symbols)}] Analyzing {symbol_name}...", end=" ")
+        print(f"[{i}/{len(symbols)}] {symbol_name}...", end=" ")
         
         try:
-            # Get stock data
-            df = get_stock_data_for_symbol(symbol_id)
-            if df is None or df.empty:
+            if symbol_name not in symbol_dfs:
                 print("❌ No data")
                 analysis_results.append({
                     'symbol': symbol_name,
@@ -107,8 +113,7 @@ def generate_wyckoff_report():
                 })
                 continue
             
-            # Perform Wyckoff analysis
-            analysis = wyckoff_service.analyze_wyckoff_phases(df, symbol_name)
+            analysis = next(analyses)
             analysis_results.append(analysis)
             
             # Print quick summary
@@ -4,6 +4,7 @@ Flask routes for technical indicators API
 from flask import Blueprint, jsonify, request
 from services.technical_indicators import TechnicalIndicatorsService
 from utils.database import get_db_connection
+from utils.cache import cache, is_success
 from config.indicators_config import get_enabled_indicators, INDICATOR_CONFIGS
 import logging
 
@@ -13,6 +14,7 @@ logger = logging.getLogger(__name__)
 indicators_bp = Blueprint('indicators', __name__, url_prefix='/api/indicators')
 
 @indicators_bp.route('/', methods=['GET'])
+@cache.cached(timeout=600, response_filter=is_success)
 def get_enabled_indicators_list():
     """Get list of enabled indicators"""
     try:
@@ -30,6 +32,7 @@ def get_enabled_indicators_list():
         }), 500
 
 @indicators_bp.route('/config', methods=['GET'])
+@cache.cached(timeout=600, response_filter=is_success)
 def get_indicators_config():
     """Get full indicators configuration"""
     try:
@@ -44,7 +47,109 @@ def get_indicators_config():
             'error': str(e)
         }), 500
 
+@indicators_bp.route('/batch', methods=['POST'])
+def get_batch_indicators():
+    """
+    Get technical indicators for several symbols in one request.
+    Body: {"symbols": ["AAPL", "MSFT"], "indicators": ["RSI", "MACD"], "limit": 100}.
+    indicators (optional) match indicator names like the indicator filter of
+    /<symbol>; limit (default 100) applies per symbol.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            'success': False,
+            'error': 'Request body must be a JSON object'
+        }), 400
+    
+    symbols = data.get('symbols')
+    if not isinstance(symbols, list) or not symbols:
+        return jsonify({
+            'success': False,
+            'error': 'symbols must be a non-empty list'
+        }), 400
+    symbols = [str(symbol).upper() for symbol in symbols]
+    
+    indicator_names = data.get('indicators') or []
+    if not isinstance(indicator_names, list):
+        return jsonify({
+            'success': False,
+            'error': 'indicators must be a list'
+        }), 400
+    
+    try:
+        limit = int(data.get('limit', 100))
+    except (TypeError, ValueError):
+        limit = 0
+    if limit <= 0:
+        return jsonify({
+            'success': False,
+            'error': 'limit must be a positive integer'
+        }), 400
+    
+    db = get_db_connection()
+    try:
+        if not db.connect():
+            return jsonify({
+                'success': False,
+                'error': 'Database connection failed'
+            }), 500
+        
+        # One query for every symbol: rows numbered newest first within each symbol,
+        # so the per-symbol limit is applied in the database
+        placeholders = ', '.join(['%s'] * len(symbols))
+        query = f"""
+            SELECT symbol, date, indicator_name, value, period
+            FROM (
+                SELECT s.symbol, t.date, t.indicator_name, t.value, t.period,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY t.symbol_id ORDER BY t.date DESC, t.indicator_name
+                       ) AS row_num
+                FROM technical_indicators t
+                INNER JOIN stock_symbols s ON s.id = t.symbol_id
+                WHERE s.symbol IN ({placeholders})
+        """
+        params = list(symbols)
+        
+        if indicator_names:
+            query += " AND (" + " OR ".join(["t.indicator_name LIKE %s"] * len(indicator_names)) + ")"
+            params.extend(f"%{name}%" for name in indicator_names)
+        
+        query += """
+            ) ranked
+            WHERE row_num <= %s
+            ORDER BY symbol, date DESC, indicator_name
+        """
+        params.append(limit)
+        
+        result = db.execute_query(query, params)
+        if result is None:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to query indicators'
+            }), 500
+        
+        grouped = {symbol: [] for symbol in symbols}
+        for row in result:
+            grouped.setdefault(row.pop('symbol'), []).append(row)
+        
+        return jsonify({
+            'success': True,
+            'data': grouped,
+            'counts': {symbol: len(rows) for symbol, rows in grouped.items()}
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting batch indicators for {symbols}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    finally:
+        db.disconnect()
+
 @indicators_bp.route('/<symbol>', methods=['GET'])
+@cache.cached(timeout=60, query_string=True, response_filter=is_success)
 def get_symbol_indicators(symbol):
     """Get technical indicators for a specific symbol"""
     try:
@@ -141,8 +246,10 @@ def calculate_indicators_for_symbol(symbol):
         symbol_id = symbol_result[0]['id']
         
         # Get stock data
+        # Prices are cast to DOUBLE in SQL so they arrive as floats rather than Decimals
         data_query = """
-            SELECT date, open, high, low, close, volume
+            SELECT date, CAST(open AS DOUBLE) AS open, CAST(high AS DOUBLE) AS high,
+                   CAST(low AS DOUBLE) AS low, CAST(close AS DOUBLE) AS close, volume
             FROM daily_stock_data
             WHERE symbol_id = %s
             ORDER BY date ASC
@@ -164,6 +271,8 @@ def calculate_indicators_for_symbol(symbol):
         success = service.calculate_and_store_indicators(symbol_id, df)
         
         if success:
+            # Cached indicator responses are stale now
+            cache.clear()
             return jsonify({
                 'success': True,
                 'message': f'Successfully calculated indicators for {symbol.upper()}',
@@ -226,8 +335,10 @@ def calculate_all_indicators():
             
             try:
                 # Get stock data for this symbol
+                # Prices are cast to DOUBLE in SQL so they arrive as floats rather than Decimals
                 data_query = """
-                    SELECT date, open, high, low, close, volume
+                    SELECT date, CAST(open AS DOUBLE) AS open, CAST(high AS DOUBLE) AS high,
+                           CAST(low AS DOUBLE) AS low, CAST(close AS DOUBLE) AS close, volume
                     FROM daily_stock_data
                     WHERE symbol_id = %s
                     ORDER BY date ASC
@@ -253,6 +364,10 @@ def calculate_all_indicators():
                 logger.error(f"Error processing {symbol_name}: {e}")
                 results['failed'].append(symbol_name)
         
+        if results['success']:
+            # Cached indicator responses are stale now
+            cache.clear()
+        
         return jsonify({
             'success': True,
             'message': f'Processed {len(symbols_result)} symbols',
@@ -93,7 +93,7 @@ def optimize_stop_loss(symbol):
                 'avg_win': monthly.avg_win,
                 'avg_loss': monthly.avg_loss,
                 'profit_factor': monthly.profit_factor,
-                'trades': monthly.trades
+                'trades': monthly.trade_records()
             })
         
         # Convert quarterly results
@@ -112,7 +112,7 @@ def optimize_stop_loss(symbol):
                 'avg_win': quarterly.avg_win,
                 'avg_loss': quarterly.avg_loss,
                 'profit_factor': quarterly.profit_factor,
-                'trades': quarterly.trades
+                'trades': quarterly.trade_records()
             })
         
         # Convert yearly results
@@ -131,7 +131,7 @@ def optimize_stop_loss(symbol):
                 'avg_win': yearly.avg_win,
                 'avg_loss': yearly.avg_loss,
                 'profit_factor': yearly.profit_factor,
-                'trades': yearly.trades
+                'trades': yearly.trade_records()
             })
         
         return jsonify(result)
@@ -13,10 +13,61 @@ import numpy as np
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from enum import IntEnum
 import logging
 
+from utils.numba_compat import njit, NUMBA_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
+
+@njit(inline='always')
+def _ewm_recurrence(values, alpha, beta):
+    """Shared EWM (adjust=False) loop, matching pandas ewm(span=...).mean()"""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float32)
+    prev = np.float32(np.nan)
+    for i in range(n):
+        x = values[i]
+        if np.isnan(x):
+            out[i] = prev
+        elif np.isnan(prev):
+            prev = x
+            out[i] = x
+        else:
+            prev = alpha * x + beta * prev
+            out[i] = prev
+    return out
+
+@njit(cache=True)
+def _ewm_float32(values, span):
+    """EWM over a float32 array for an arbitrary span"""
+    alpha = np.float32(2.0 / (span + 1.0))
+    return _ewm_recurrence(values, alpha, np.float32(1.0) - alpha)
+
+# The strategy only ever uses spans 21 and 50; with alpha as a compile-time
+# constant the loop keeps both coefficients in registers
+_ALPHA_21 = np.float32(2.0 / 22.0)
+_BETA_21 = np.float32(1.0) - _ALPHA_21
+_ALPHA_50 = np.float32(2.0 / 51.0)
+_BETA_50 = np.float32(1.0) - _ALPHA_50
+
+@njit(cache=True)
+def _ewm_span21(values):
+    return _ewm_recurrence(values, _ALPHA_21, _BETA_21)
+
+@njit(cache=True)
+def _ewm_span50(values):
+    return _ewm_recurrence(values, _ALPHA_50, _BETA_50)
+
+_EWM_SPAN_KERNELS = {21: _ewm_span21, 50: _ewm_span50}
+
+class ExitReason(IntEnum):
+    """Why a position was closed"""
+    EMA_SIGNAL = 0
+    TRAILING_STOP = 1
+    END_OF_PERIOD = 2
+
 @dataclass
 class EMASignal:
     """EMA trading signal"""
@@ -29,6 +80,7 @@ class EMASignal:
     confidence: float
     atr: Optional[float] = None
     trailing_stop: Optional[float] = None
+    exit_reason_code: Optional[ExitReason] = None  # set on SELL signals
 
 @dataclass
 class EMATrade:
@@ -44,6 +96,29 @@ class EMATrade:
     pnl_percent: Optional[float]
     duration_days: Optional[int]
     exit_reason: Optional[str] = None  # 'EMA_SIGNAL' or 'TRAILING_STOP'
+    exit_reason_code: Optional[ExitReason] = None
+
+@dataclass
+class EMAArrays:
+    """Price and indicator arrays projected once from the input DataFrame"""
+    dates: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    ema_21: Optional[np.ndarray] = None
+    ema_50: Optional[np.ndarray] = None
+    atr: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'EMAArrays':
+        return cls(
+            dates=df.index,
+            open=np.ascontiguousarray(df['open'].to_numpy(dtype=np.float64)),
+            high=np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64)),
+            low=np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64)),
+            close=np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        )
 
 @dataclass
 class EMAResults:
@@ -74,27 +149,26 @@ class EMATradingEngine:
         self.atr_period = atr_period
         self.atr_multiplier = atr_multiplier
         
-    def calculate_ema(self, data: pd.Series, period: int) -> pd.Series:
-        """Calculate Exponential Moving Average"""
-        return data.ewm(span=period, adjust=False).mean()
+    def calculate_ema(self, values: np.ndarray, period: int) -> np.ndarray:
+        """Calculate Exponential Moving Average of a float32 price array"""
+        values = np.ascontiguousarray(values, dtype=np.float32)
+        if NUMBA_AVAILABLE:
+            kernel = _EWM_SPAN_KERNELS.get(period)
+            return kernel(values) if kernel is not None else _ewm_float32(values, period)
+        return pd.Series(values).ewm(span=period, adjust=False).mean().to_numpy(dtype=np.float32)
     
-    def calculate_atr(self, df: pd.DataFrame, period: int) -> pd.Series:
+    def calculate_atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
         """Calculate Average True Range (ATR)"""
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
-        # Calculate True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        # True Range: max(high - low, |high - prev close|, |low - prev close|)
+        true_range = high - low
+        prev_close = close[:-1]
+        true_range[1:] = np.maximum(
+            true_range[1:],
+            np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close))
+        )
         
         # Calculate ATR as EMA of True Range
-        atr = true_range.ewm(span=period, adjust=False).mean()
-        
-        return atr
+        return self.calculate_ema(true_range, period)
     
     def run_analysis(self, df: pd.DataFrame, symbol: str) -> EMAResults:
         """
@@ -112,35 +186,42 @@ class EMATradingEngine:
         if len(df) < self.ema_50_period:
             raise ValueError(f"Not enough data for EMA analysis. Need at least {self.ema_50_period} days")
         
-        # Calculate EMAs and ATR
-        df['ema_21'] = self.calculate_ema(df['close'], self.ema_21_period)
-        df['ema_50'] = self.calculate_ema(df['close'], self.ema_50_period)
-        df['atr'] = self.calculate_atr(df, self.atr_period)
+        arrs = EMAArrays.from_dataframe(df)
+        
+        # Calculate EMAs and ATR on float32 prices (plenty of precision for
+        # ~4 significant digits, half the memory traffic). Trade prices and
+        # PnL still come from the float64 arrays.
+        high32 = arrs.high.astype(np.float32)
+        low32 = arrs.low.astype(np.float32)
+        close32 = arrs.close.astype(np.float32)
+        arrs.ema_21 = self.calculate_ema(close32, self.ema_21_period)
+        arrs.ema_50 = self.calculate_ema(close32, self.ema_50_period)
+        arrs.atr = self.calculate_atr(high32, low32, close32, self.atr_period)
         
         # Generate signals
-        signals = self._generate_signals(df)
+        signals = self._generate_signals(arrs)
         
         # Execute trades
-        trades = self._execute_trades(df, signals)
+        trades = self._execute_trades(arrs, signals)
         
         # Calculate performance metrics
         performance_metrics = self._calculate_performance_metrics(trades)
         
         # Generate equity curve
-        equity_curve = self._generate_equity_curve(df, trades)
+        equity_curve = self._generate_equity_curve(arrs, trades)
         
         return EMAResults(
             symbol=symbol,
-            start_date=df.index[0],
-            end_date=df.index[-1],
-            total_days=len(df),
+            start_date=arrs.dates[0],
+            end_date=arrs.dates[-1],
+            total_days=len(arrs.dates),
             trades=trades,
             signals=signals,
             performance_metrics=performance_metrics,
             equity_curve=equity_curve
         )
     
-    def _generate_signals(self, df: pd.DataFrame) -> List[EMASignal]:
+    def _generate_signals(self, arrs: EMAArrays) -> List[EMASignal]:
         """Generate EMA trading signals with trailing stop management"""
         signals = []
         in_trade = False
@@ -150,21 +231,36 @@ class EMATradingEngine:
         # Start from max(ema_50_period, atr_period) to ensure both are calculated
         start_index = max(self.ema_50_period, self.atr_period)
         
-        for i in range(start_index, len(df)):
-            current_price = df.iloc[i]['close']
-            ema_21 = df.iloc[i]['ema_21']
-            ema_50 = df.iloc[i]['ema_50']
-            atr = df.iloc[i]['atr']
-            date = df.index[i]
+        close = arrs.close
+        ema_21_values = arrs.ema_21.astype(np.float64)
+        ema_50_values = arrs.ema_50.astype(np.float64)
+        atr_values = arrs.atr.astype(np.float64)
+        dates = arrs.dates
+        
+        # Crossovers computed once: a cross happens on bar i when the condition
+        # holds at i but did not hold at i-1
+        above_50 = close > ema_50_values
+        below_21 = close < ema_21_values
+        buy_cross = np.zeros(len(close), dtype=bool)
+        buy_cross[1:] = above_50[1:] & ~above_50[:-1]
+        sell_ema21_cross = np.zeros(len(close), dtype=bool)
+        sell_ema21_cross[1:] = below_21[1:] & ~below_21[:-1]
+        
+        for i in range(start_index, len(close)):
+            current_price = close[i]
+            ema_21 = ema_21_values[i]
+            ema_50 = ema_50_values[i]
+            atr = atr_values[i]
+            date = dates[i]
             
             # Skip if indicators are not calculated yet
-            if pd.isna(ema_21) or pd.isna(ema_50) or pd.isna(atr):
+            if np.isnan(ema_21) or np.isnan(ema_50) or np.isnan(atr):
                 continue
             
             # BUY signal: Price closes above 50 EMA (only if not in trade)
-            if not in_trade and current_price > ema_50:
+            if not in_trade and above_50[i]:
                 # Check if this is a new signal (price closed below 50 EMA in previous period)
-                if i > 0 and df.iloc[i-1]['close'] <= df.iloc[i-1]['ema_50']:
+                if buy_cross[i]:
                     confidence = min(0.9, abs(current_price - ema_50) / ema_50 * 10)
                     # Set initial trailing stop
                     current_trailing_stop = current_price - (atr * self.atr_multiplier)
@@ -194,16 +290,19 @@ class EMATradingEngine:
                 # Check for SELL signals: Price below 21 EMA OR below trailing stop
                 sell_triggered = False
                 sell_reason = ""
+                exit_reason_code = None
                 
-                if current_price < ema_21:
+                if below_21[i]:
                     # Check if this is a new signal (price closed above 21 EMA in previous period)
-                    if i > 0 and df.iloc[i-1]['close'] >= df.iloc[i-1]['ema_21']:
+                    if sell_ema21_cross[i]:
                         sell_triggered = True
                         sell_reason = f"Price {current_price:.2f} closed below 21 EMA {ema_21:.2f}"
+                        exit_reason_code = ExitReason.EMA_SIGNAL
                 
                 elif current_trailing_stop is not None and current_price < current_trailing_stop:
                     sell_triggered = True
                     sell_reason = f"Price {current_price:.2f} hit trailing stop {current_trailing_stop:.2f}"
+                    exit_reason_code = ExitReason.TRAILING_STOP
                 
                 if sell_triggered:
                     confidence = min(0.9, abs(current_price - ema_21) / ema_21 * 10)
@@ -216,7 +315,8 @@ class EMATradingEngine:
                         reasoning=sell_reason,
                         confidence=confidence,
                         atr=atr,
-                        trailing_stop=current_trailing_stop
+                        trailing_stop=current_trailing_stop,
+                        exit_reason_code=exit_reason_code
                     ))
                     in_trade = False
                     current_trailing_stop = None
@@ -224,21 +324,22 @@ class EMATradingEngine:
         
         return signals
     
-    def _execute_trades(self, df: pd.DataFrame, signals: List[EMASignal]) -> List[EMATrade]:
+    def _execute_trades(self, arrs: EMAArrays, signals: List[EMASignal]) -> List[EMATrade]:
         """Execute trades based on signals using next day's open prices"""
         trades = []
         current_position = None
         available_capital = self.initial_capital
         
-        # Create a mapping of dates to DataFrame indices for quick lookup
-        date_to_index = {df.index[i]: i for i in range(len(df))}
+        # Create a mapping of dates to array indices for quick lookup
+        n = len(arrs.dates)
+        date_to_index = {date: i for i, date in enumerate(arrs.dates)}
         
         for signal in signals:
             if signal.signal_type == 'BUY' and current_position is None:
                 # Find the next day's open price for entry
                 signal_index = date_to_index.get(signal.date)
-                if signal_index is not None and signal_index + 1 < len(df):
-                    next_day_open = df.iloc[signal_index + 1]['open']
+                if signal_index is not None and signal_index + 1 < n:
+                    next_day_open = arrs.open[signal_index + 1]
                     shares = int(available_capital / next_day_open)
                     if shares > 0:
                         current_position = {
@@ -253,15 +354,14 @@ class EMATradingEngine:
             elif signal.signal_type == 'SELL' and current_position is not None:
                 # Find the next day's open price for exit
                 signal_index = date_to_index.get(signal.date)
-                if signal_index is not None and signal_index + 1 < len(df):
-                    next_day_open = df.iloc[signal_index + 1]['open']
+                if signal_index is not None and signal_index + 1 < n:
+                    next_day_open = arrs.open[signal_index + 1]
                     shares = current_position['shares']
                     pnl = shares * (next_day_open - current_position['entry_price'])
                     pnl_percent = (next_day_open - current_position['entry_price']) / current_position['entry_price'] * 100
                     duration = (signal.date - current_position['entry_date']).days
                     
-                    # Determine exit reason
-                    exit_reason = 'TRAILING_STOP' if 'trailing stop' in signal.reasoning.lower() else 'EMA_SIGNAL'
+                    exit_reason_code = signal.exit_reason_code
                     
                     trade = EMATrade(
                         entry_date=current_position['entry_date'],
@@ -274,7 +374,8 @@ class EMATradingEngine:
                         pnl=pnl,
                         pnl_percent=pnl_percent,
                         duration_days=duration,
-                        exit_reason=exit_reason
+                        exit_reason=exit_reason_code.name,
+                        exit_reason_code=exit_reason_code
                     )
                     
                     trades.append(trade)
@@ -285,8 +386,8 @@ class EMATradingEngine:
         
         # Close any remaining position at the end
         if current_position is not None:
-            final_price = df.iloc[-1]['close']
-            final_date = df.index[-1]
+            final_price = arrs.close[-1]
+            final_date = arrs.dates[-1]
             shares = current_position['shares']
             pnl = shares * (final_price - current_position['entry_price'])
             pnl_percent = (final_price - current_position['entry_price']) / current_position['entry_price'] * 100
@@ -302,7 +403,8 @@ class EMATradingEngine:
                 shares=shares,
                 pnl=pnl,
                 pnl_percent=pnl_percent,
-                duration_days=duration
+                duration_days=duration,
+                exit_reason_code=ExitReason.END_OF_PERIOD
             )
             
             trades.append(trade)
@@ -361,7 +463,7 @@ class EMATradingEngine:
             'sharpe_ratio': 0.0  # Simplified for now
         }
     
-    def _generate_equity_curve(self, df: pd.DataFrame, trades: List[EMATrade]) -> List[Tuple[datetime, float]]:
+    def _generate_equity_curve(self, arrs: EMAArrays, trades: List[EMATrade]) -> List[Tuple[datetime, float]]:
         """Generate equity curve"""
         equity_curve = []
         current_equity = self.initial_capital
@@ -372,7 +474,7 @@ class EMATradingEngine:
             if trade.exit_date and trade.pnl is not None:
                 trade_pnl_by_date[trade.exit_date] = trade.pnl
         
-        for date in df.index:
+        for date in arrs.dates:
             if date in trade_pnl_by_date:
                 current_equity += trade_pnl_by_date[date]
             equity_curve.append((date, current_equity))
@@ -0,0 +1,278 @@
+"""
+Technical Indicator Kernels
+Numba-compiled array kernels used by the technical indicators service.
+Kernels take float32 price arrays, keep their running state in float64 and
+return float32 results (display precision is all the indicators need).
+They release the GIL, so symbols can also be processed from threads.
+"""
+
+import numpy as np
+
+from utils.numba_compat import njit
+
+
+@njit(cache=True, nogil=True)
+def ema(values, span):
+    """EMA matching pandas ewm(span=span).mean() (adjust=True)"""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float32)
+    decay = 1.0 - 2.0 / (span + 1.0)
+    num = 0.0
+    den = 0.0
+    for i in range(n):
+        num *= decay
+        den *= decay
+        x = values[i]
+        if not np.isnan(x):
+            num += x
+            den += 1.0
+        out[i] = num / den if den > 0 else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def fused_ema(values, spans):
+    """
+    EMAs for several spans in a single pass over values (same recurrence as
+    ema). Returns an (n, len(spans)) array, one column per span.
+    """
+    n = values.shape[0]
+    k = spans.shape[0]
+    out = np.empty((n, k), dtype=np.float32)
+    decay = 1.0 - 2.0 / (spans + 1.0)
+    num = np.zeros(k)
+    den = np.zeros(k)
+    for i in range(n):
+        x = values[i]
+        observed = not np.isnan(x)
+        for j in range(k):
+            num[j] *= decay[j]
+            den[j] *= decay[j]
+            if observed:
+                num[j] += x
+                den[j] += 1.0
+            out[i, j] = num[j] / den[j] if den[j] > 0 else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rsi(close, period):
+    """
+    Wilder's RSI in a single pass. Averages are seeded with the mean of the
+    first `period` changes, so the first value is at index `period`.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan, dtype=np.float32)
+    if n <= period:
+        return out
+    
+    # Smoothing weights hoisted out of the loop: the update becomes
+    # multiply-adds instead of a division on the loop-carried chain
+    keep = (period - 1.0) / period
+    weight = 1.0 / period
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if i <= period:
+            avg_gain += gain * weight
+            avg_loss += loss * weight
+            if i < period:
+                continue
+        else:
+            avg_gain = avg_gain * keep + gain * weight
+            avg_loss = avg_loss * keep + loss * weight
+        if avg_loss == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def close_pass(close, ema_spans, rsi_periods):
+    """
+    Every close-driven recurrence in one pass: for each bar, update all EMA
+    states (as in ema) and all Wilder RSI states (as in rsi) before moving
+    on, so close is read once and the independent updates overlap.
+    Returns (emas, rsis) with one column per span / period.
+    """
+    n = close.shape[0]
+    n_ema = ema_spans.shape[0]
+    n_rsi = rsi_periods.shape[0]
+    emas = np.empty((n, n_ema), dtype=np.float32)
+    rsis = np.full((n, n_rsi), np.nan, dtype=np.float32)
+    decay = 1.0 - 2.0 / (ema_spans + 1.0)
+    weight = 1.0 / rsi_periods
+    keep = (rsi_periods - 1.0) * weight
+    num = np.zeros(n_ema)
+    den = np.zeros(n_ema)
+    avg_gain = np.zeros(n_rsi)
+    avg_loss = np.zeros(n_rsi)
+    for i in range(n):
+        x = close[i]
+        observed = not np.isnan(x)
+        for j in range(n_ema):
+            num[j] *= decay[j]
+            den[j] *= decay[j]
+            if observed:
+                num[j] += x
+                den[j] += 1.0
+            emas[i, j] = num[j] / den[j] if den[j] > 0 else np.nan
+        
+        if i == 0:
+            continue
+        delta = x - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        for j in range(n_rsi):
+            period = rsi_periods[j]
+            if i <= period:
+                avg_gain[j] += gain * weight[j]
+                avg_loss[j] += loss * weight[j]
+                if i < period:
+                    continue
+            else:
+                avg_gain[j] = avg_gain[j] * keep[j] + gain * weight[j]
+                avg_loss[j] = avg_loss[j] * keep[j] + loss * weight[j]
+            if avg_loss[j] == 0:
+                rsis[i, j] = 100.0
+            else:
+                rsis[i, j] = 100.0 - 100.0 / (1.0 + avg_gain[j] / avg_loss[j])
+    return emas, rsis
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean_std(values, window):
+    """
+    Rolling mean and sample standard deviation (ddof=1, like pandas) in one
+    pass from running sums. Sums are taken around a recent value, re-anchored
+    every 256 bars, to limit cancellation and drift. NaN until the first full
+    window and while a NaN is in it.
+    """
+    n = values.shape[0]
+    mean = np.full(n, np.nan, dtype=np.float32)
+    std = np.full(n, np.nan, dtype=np.float32)
+    shift = 0.0
+    for i in range(n):
+        if not np.isnan(values[i]):
+            shift = values[i]
+            break
+    
+    s = 0.0
+    s2 = 0.0
+    n_nan = 0
+    for i in range(n):
+        x = values[i]
+        if np.isnan(x):
+            n_nan += 1
+        else:
+            d = x - shift
+            s += d
+            s2 += d * d
+        if i >= window:
+            old = values[i - window]
+            if np.isnan(old):
+                n_nan -= 1
+            else:
+                d = old - shift
+                s -= d
+                s2 -= d * d
+        if i % 256 == 255 and not np.isnan(x):
+            # Re-anchor on the current value and recompute the window sums exactly
+            shift = x
+            s = 0.0
+            s2 = 0.0
+            for j in range(max(0, i - window + 1), i + 1):
+                if not np.isnan(values[j]):
+                    d = values[j] - shift
+                    s += d
+                    s2 += d * d
+        if i >= window - 1 and n_nan == 0:
+            m = s / window
+            mean[i] = m + shift
+            var = (s2 - s * m) / (window - 1)
+            std[i] = np.sqrt(var) if var > 0 else 0.0
+    return mean, std
+
+
+@njit(cache=True, nogil=True)
+def wilder_smooth(values, period):
+    """
+    Wilder's moving average (as used for ATR): seeded with the mean of the
+    first `period` values, then avg = (avg * (period - 1) + x) / period.
+    NaN inputs leave the average unchanged.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan, dtype=np.float32)
+    if n < period:
+        return out
+    
+    keep = (period - 1.0) / period
+    weight = 1.0 / period
+    avg = 0.0
+    for i in range(period):
+        avg += values[i]
+    avg /= period
+    out[period - 1] = avg
+    for i in range(period, n):
+        x = values[i]
+        if not np.isnan(x):
+            avg = avg * keep + x * weight
+        out[i] = avg
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_min_max(low, high, window):
+    """
+    Rolling lowest low and highest high in O(n) using monotonic deques.
+    Values are NaN until the first full window and while a NaN is in the window.
+    """
+    n = low.shape[0]
+    lowest = np.full(n, np.nan, dtype=np.float32)
+    highest = np.full(n, np.nan, dtype=np.float32)
+    # Ring buffers of indices; neither deque ever holds more than `window` entries
+    min_q = np.empty(window, dtype=np.int64)
+    max_q = np.empty(window, dtype=np.int64)
+    min_head = 0
+    min_len = 0
+    max_head = 0
+    max_len = 0
+    last_nan_low = -window
+    last_nan_high = -window
+    for i in range(n):
+        # Drop the index that just left the window
+        if min_len > 0 and min_q[min_head] <= i - window:
+            min_head = (min_head + 1) % window
+            min_len -= 1
+        if max_len > 0 and max_q[max_head] <= i - window:
+            max_head = (max_head + 1) % window
+            max_len -= 1
+        
+        lo = low[i]
+        if np.isnan(lo):
+            last_nan_low = i
+        else:
+            while min_len > 0 and low[min_q[(min_head + min_len - 1) % window]] >= lo:
+                min_len -= 1
+            min_q[(min_head + min_len) % window] = i
+            min_len += 1
+        
+        hi = high[i]
+        if np.isnan(hi):
+            last_nan_high = i
+        else:
+            while max_len > 0 and high[max_q[(max_head + max_len - 1) % window]] <= hi:
+                max_len -= 1
+            max_q[(max_head + max_len) % window] = i
+            max_len += 1
+        
+        if i >= window - 1:
+            if i - last_nan_low >= window:
+                lowest[i] = low[min_q[min_head]]
+            if i - last_nan_high >= window:
+                highest[i] = high[max_q[max_head]]
+    return lowest, highest
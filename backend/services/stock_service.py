@@ -3,6 +3,7 @@ Stock data service - integrates with existing scraper
 """
 import sys
 import os
+import tempfile
 import pandas as pd
 from datetime import datetime, date
 from typing import List, Dict, Optional, Any
@@ -17,9 +18,41 @@ from utils.database import get_db_connection
 
 logger = logging.getLogger(__name__)
 
+DAILY_STAGE_COLUMNS = ['symbol_id', 'date', 'open', 'high', 'low', 'close', 'volume']
+
+# Per-connection staging table, so concurrent loads don't collide
+DAILY_STAGE_DDL = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS daily_stock_stage (
+        symbol_id INT, date DATE, open DECIMAL(10,2), high DECIMAL(10,2),
+        low DECIMAL(10,2), close DECIMAL(10,2), volume BIGINT
+    )
+"""
+
+DAILY_STAGE_MERGE_QUERY = """
+    INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
+    SELECT symbol_id, date, open, high, low, close, volume FROM daily_stock_stage
+    ON DUPLICATE KEY UPDATE
+    open = VALUES(open),
+    high = VALUES(high),
+    low = VALUES(low),
+    close = VALUES(close),
+    volume = VALUES(volume)
+"""
+
+def bulk_load_daily_csv(db, csv_path: str) -> Optional[int]:
+    """
+    Load a headerless daily_stock_data CSV (DAILY_STAGE_COLUMNS order) through
+    the staging table and merge it. Returns the rows loaded, or None on failure.
+    """
+    return db.execute_staged_load(csv_path, DAILY_STAGE_DDL, 'daily_stock_stage',
+                                  DAILY_STAGE_COLUMNS, DAILY_STAGE_MERGE_QUERY)
+
 class StockService:
     """Service class for stock data operations"""
     
+    # Backfills at least this large go through LOAD DATA when it is enabled
+    BULK_LOAD_MIN_ROWS = 10000
+    
     def __init__(self):
         self.db = get_db_connection()
         self.scraper = StockDataScraper()  # Use existing scraper
@@ -108,6 +141,12 @@ class StockService:
     
     def _store_daily_data(self, symbol_id: int, df: pd.DataFrame) -> int:
         """Store daily stock data in database"""
+        if self.db.config.MYSQL_LOCAL_INFILE and len(df) >= self.BULK_LOAD_MIN_ROWS:
+            stored_count = self._bulk_load_daily_data(symbol_id, df)
+            if stored_count is not None:
+                return stored_count
+            logger.warning(f"Bulk load failed for symbol_id {symbol_id}, falling back to batched inserts")
+        
         insert_query = """
             INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
@@ -133,6 +172,24 @@ class StockService:
         
         return self.db.execute_many(insert_query, data_to_insert)
     
+    def _bulk_load_daily_data(self, symbol_id: int, df: pd.DataFrame) -> Optional[int]:
+        """
+        Load daily data via LOAD DATA LOCAL INFILE into a staging table, then
+        merge into daily_stock_data with a single INSERT ... SELECT.
+        Returns None if any step fails so the caller can fall back.
+        """
+        fd, csv_path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                df.assign(symbol_id=symbol_id).to_csv(
+                    f, index=False, header=False, na_rep='\\N', lineterminator='\n',
+                    columns=['symbol_id', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+                )
+            
+            return bulk_load_daily_csv(self.db, csv_path)
+        finally:
+            os.remove(csv_path)
+    
     def fetch_all_stocks_data(self, period: str = '1y', delay: float = 1.0) -> Dict[str, Any]:
         """Fetch data for all symbols in database"""
         # Get all symbols from database
@@ -229,12 +286,12 @@ class StockService:
         query = """
             SELECT s.symbol, s.company_name, d.date, d.close, d.volume, d.high, d.low
             FROM stock_symbols s
-            LEFT JOIN daily_stock_data d ON s.id = d.symbol_id
-            WHERE d.date = (
-                SELECT MAX(date) 
-                FROM daily_stock_data 
-                WHERE symbol_id = s.id
-            )
+            JOIN (
+                SELECT symbol_id, MAX(date) AS max_date
+                FROM daily_stock_data
+                GROUP BY symbol_id
+            ) m ON m.symbol_id = s.id
+            JOIN daily_stock_data d ON d.symbol_id = s.id AND d.date = m.max_date
             ORDER BY s.symbol
         """
         return self.db.execute_query(query)
@@ -6,14 +6,72 @@ Analyzes historical data to find optimal stop loss percentages for different tim
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 from dataclasses import dataclass
 from enum import Enum
 
+from utils.numba_compat import njit
+
 logger = logging.getLogger(__name__)
 
+# Integer exit reason codes, mapped to labels only when trade records are built
+REASON_SIGNAL = 0
+REASON_STOP = 1
+REASON_PERIOD_END = 2
+EXIT_REASON_LABELS = ('Signal', 'Stop Loss', 'Period End')
+
+# Return std (in percent) below this is rounding noise from identical trades; Sharpe scores 0
+MIN_RETURNS_STD = 1e-9
+
+# One row per trade; columns are filled straight from the vectorized backtest
+TRADE_DTYPE = np.dtype([
+    ('entry_date', 'datetime64[ns]'),
+    ('exit_date', 'datetime64[ns]'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('shares', 'f8'),
+    ('pnl', 'f8'),
+    ('pnl_percent', 'f8'),
+    ('exit_reason', 'u1'),
+])
+
+@njit(cache=True)
+def _rsi_loop(gain, loss, period):
+    """Wilder-smoothed RSI from per-bar gains and losses (index 0 is ignored)"""
+    n = gain.shape[0]
+    rsi = np.full(n, np.nan)
+    if n <= period:
+        return rsi
+    
+    # Seed with simple averages of the first `period` changes
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        avg_gain += gain[i]
+        avg_loss += loss[i]
+    avg_gain /= period
+    avg_loss /= period
+    
+    for i in range(period, n):
+        if i > period:
+            avg_gain = (avg_gain * (period - 1) + gain[i]) / period
+            avg_loss = (avg_loss * (period - 1) + loss[i]) / period
+        if avg_loss == 0:
+            rsi[i] = 100.0
+        else:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return rsi
+
+def _sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average, NaN until the first full window (like rolling().mean())"""
+    sma = np.full(len(values), np.nan, dtype=values.dtype)
+    if len(values) >= window:
+        sma[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return sma
+
 @dataclass
 class StopLossResult:
     """Stop loss optimization result"""
@@ -30,7 +88,44 @@ class StopLossResult:
     avg_win: float
     avg_loss: float
     profit_factor: float
-    trades: List[Dict]
+    trades: np.ndarray  # structured array of TRADE_DTYPE
+    
+    def trade_records(self) -> List[Dict]:
+        """Trades as a list of dicts (for the API response)"""
+        return [
+            {
+                'entry_date': pd.Timestamp(entry_date),
+                'exit_date': pd.Timestamp(exit_date),
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'shares': shares,
+                'pnl': pnl,
+                'pnl_percent': pnl_percent,
+                'exit_reason': EXIT_REASON_LABELS[exit_reason]
+            }
+            for entry_date, exit_date, entry_price, exit_price, shares, pnl, pnl_percent, exit_reason
+            in self.trades.tolist()
+        ]
+
+@dataclass
+class TradingSignals:
+    """Trading signals as parallel arrays, sorted by date"""
+    dates: np.ndarray    # datetime64[ns]
+    actions: np.ndarray  # int8: 1 = BUY, -1 = SELL
+    prices: np.ndarray   # float64
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def between(self, start: datetime, end: datetime) -> 'TradingSignals':
+        """Signals dated within [start, end], found by binary search"""
+        start_idx = np.searchsorted(self.dates, np.datetime64(start, 'ns'), side='left')
+        end_idx = np.searchsorted(self.dates, np.datetime64(end, 'ns'), side='right')
+        return TradingSignals(
+            dates=self.dates[start_idx:end_idx],
+            actions=self.actions[start_idx:end_idx],
+            prices=self.prices[start_idx:end_idx]
+        )
 
 @dataclass
 class StopLossOptimization:
@@ -44,6 +139,54 @@ class StopLossOptimization:
     stop_loss_range: Tuple[float, float]
     test_intervals: List[float]
 
+@njit(cache=True)
+def _bt_loop(actions):
+    """
+    Walk BUY (1) / SELL (-1) actions with a single long position and return
+    the signal indices where positions were opened and closed.
+    """
+    n = actions.shape[0]
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    n_entries = 0
+    n_exits = 0
+    in_position = False
+    for i in range(n):
+        if actions[i] == 1 and not in_position:
+            entry_idx[n_entries] = i
+            n_entries += 1
+            in_position = True
+        elif actions[i] == -1 and in_position:
+            exit_idx[n_exits] = i
+            n_exits += 1
+            in_position = False
+    return entry_idx[:n_entries], exit_idx[:n_exits]
+
+@njit(cache=True)
+def _bt_loop_by_period(actions, period_ids):
+    """
+    _bt_loop over signals from many periods at once: the position is dropped
+    at every period boundary. Returns entry and exit signal indices per trade,
+    with exit -1 for a position still open when its period ends.
+    """
+    n = actions.shape[0]
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    n_trades = 0
+    in_position = False
+    for i in range(n):
+        if i > 0 and period_ids[i] != period_ids[i - 1]:
+            in_position = False
+        if actions[i] == 1 and not in_position:
+            entry_idx[n_trades] = i
+            exit_idx[n_trades] = -1
+            n_trades += 1
+            in_position = True
+        elif actions[i] == -1 and in_position:
+            exit_idx[n_trades - 1] = i
+            in_position = False
+    return entry_idx[:n_trades], exit_idx[:n_trades]
+
 class StopLossOptimizer:
     """Optimizes stop loss percentages based on historical data"""
     
@@ -51,6 +194,10 @@ class StopLossOptimizer:
         self.initial_capital = initial_capital
         self.stop_loss_range = (0.02, 0.20)  # 2% to 20%
         self.test_intervals = [0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.08, 0.09, 0.10, 0.12, 0.15, 0.18, 0.20]
+        # Array forms used by the vectorized sweep, built once
+        self._sl_arr = np.asarray(self.test_intervals, dtype=np.float64)
+        self._sl_keep = 1 - self._sl_arr  # stop price / entry price
+        self._score_weights = np.array([0.4, 0.3, 0.2, 0.1])  # sharpe, win rate, return, drawdown
         
     def optimize_stop_loss(self, df: pd.DataFrame, symbol: str) -> StopLossOptimization:
         """Run complete stop loss optimization analysis"""
@@ -58,26 +205,29 @@ class StopLossOptimizer:
         
         # Ensure data is sorted by date
         df = df.sort_values('date').reset_index(drop=True)
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df['date'] = pd.to_datetime(df['date'], errors='coerce', cache=True)
         
         # Remove any rows with invalid dates
         df = df.dropna(subset=['date'])
         
-        # Convert decimal columns to float
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in df.columns:
-                df[col] = df[col].astype(float)
+        # Convert decimal columns to float in one cast
+        numeric_cols = df.columns.intersection(['open', 'high', 'low', 'close', 'volume'])
+        df[numeric_cols] = df[numeric_cols].astype(np.float64)
         
         # Generate trading signals (simplified version)
         signals = self._generate_trading_signals(df)
         
+        # Sorted date/close arrays so period slices are binary searches, not frame filters
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        closes = df['close'].to_numpy(dtype=np.float64)
+        
         # Run optimization for different time periods
-        monthly_results = self._optimize_by_period(df, signals, 'monthly')
-        quarterly_results = self._optimize_by_period(df, signals, 'quarterly')
-        yearly_results = self._optimize_by_period(df, signals, 'yearly')
+        monthly_results = self._optimize_by_period(df, signals, 'monthly', dates, closes)
+        quarterly_results = self._optimize_by_period(df, signals, 'quarterly', dates, closes)
+        yearly_results = self._optimize_by_period(df, signals, 'yearly', dates, closes)
         
         # Find overall optimal stop loss
-        overall_optimal = self._find_overall_optimal(df, signals)
+        overall_optimal = self._find_overall_optimal(signals, dates, closes)
         
         return StopLossOptimization(
             symbol=symbol,
@@ -90,245 +240,199 @@ class StopLossOptimizer:
             test_intervals=self.test_intervals
         )
     
-    def _generate_trading_signals(self, df: pd.DataFrame) -> List[Dict]:
+    def _generate_trading_signals(self, df: pd.DataFrame) -> TradingSignals:
         """Generate simplified trading signals based on price action"""
-        signals = []
-        
-        # Simple momentum-based signals
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['rsi'] = self._calculate_rsi(df['close'], 14)
-        
-        for i in range(50, len(df)):  # Start after enough data for indicators
-            current_price = df.iloc[i]['close']
-            sma_20 = df.iloc[i]['sma_20']
-            sma_50 = df.iloc[i]['sma_50']
-            rsi = df.iloc[i]['rsi']
-            
-            # Buy signal: Price above both SMAs, RSI not overbought
-            if (current_price > sma_20 and current_price > sma_50 and 
-                rsi < 70 and rsi > 30):
-                signals.append({
-                    'date': df.iloc[i]['date'],
-                    'action': 'BUY',
-                    'price': current_price,
-                    'volume': df.iloc[i]['volume']
-                })
-            
-            # Sell signal: Price below both SMAs, RSI not oversold
-            elif (current_price < sma_20 and current_price < sma_50 and 
-                  rsi > 30 and rsi < 70):
-                signals.append({
-                    'date': df.iloc[i]['date'],
-                    'action': 'SELL',
-                    'price': current_price,
-                    'volume': df.iloc[i]['volume']
-                })
-        
-        return signals
+        # Simple momentum-based signals, kept in float32 (signal prices stay float64)
+        close = df['close'].astype(np.float32)
+        close_arr = close.to_numpy()
+        df['sma_20'] = _sma(close_arr, 20)
+        df['sma_50'] = _sma(close_arr, 50)
+        df['rsi'] = self._calculate_rsi(close, 14)
+        
+        rsi_in_range = df['rsi'].between(30, 70, inclusive='neither')
+        
+        # Buy signal: Price above both SMAs, RSI not overbought
+        buy_mask = (close > df['sma_20']) & (close > df['sma_50']) & rsi_in_range
+        # Sell signal: Price below both SMAs, RSI not oversold
+        sell_mask = (close < df['sma_20']) & (close < df['sma_50']) & rsi_in_range
+        
+        # Start after enough data for indicators
+        buy_mask.iloc[:50] = False
+        sell_mask.iloc[:50] = False
+        
+        signal_mask = (buy_mask | sell_mask).to_numpy()
+        return TradingSignals(
+            dates=df['date'].to_numpy(dtype='datetime64[ns]')[signal_mask],
+            actions=np.where(buy_mask.to_numpy()[signal_mask], 1, -1).astype(np.int8),
+            prices=df['close'].to_numpy(dtype=np.float64)[signal_mask]
+        )
     
-    def _optimize_by_period(self, df: pd.DataFrame, signals: List[Dict], period_type: str) -> List[StopLossResult]:
+    def _optimize_by_period(self, df: pd.DataFrame, signals: TradingSignals, period_type: str,
+                            dates: np.ndarray, closes: np.ndarray) -> List[StopLossResult]:
         """Optimize stop loss for different time periods"""
-        results = []
+        freq = {'monthly': 'M', 'quarterly': 'Q', 'yearly': 'Y'}.get(period_type)
+        if freq is None:
+            return []
+        periods = self._get_periods(df, freq)
+        if not periods or not len(signals):
+            return []
+        
+        period_starts = np.array([np.datetime64(start, 'ns') for start, _ in periods])
+        period_ends = np.array([np.datetime64(end, 'ns') for _, end in periods])
+        
+        # Tag every signal with its period; only periods with enough signals are optimized
+        signal_period = np.searchsorted(period_starts, signals.dates, side='right') - 1
+        signal_counts = np.bincount(signal_period, minlength=len(periods))
+        keep = signal_counts[signal_period] >= 5  # Need minimum signals for meaningful analysis
+        trade_signal_period = signal_period[keep]
+        prices = signals.prices[keep]
+        
+        # Pair trades for all periods in one pass; open positions close at their period's last close
+        entries, exits = _bt_loop_by_period(signals.actions[keep], trade_signal_period)
+        trade_period = trade_signal_period[entries]
+        closed = exits >= 0
+        period_last_idx = np.searchsorted(dates, period_ends, side='right') - 1
+        entry_prices = prices[entries]
+        exit_prices = np.where(closed, prices[exits], closes[period_last_idx[trade_period]])
+        
+        # Score every (period, stop loss) pair on Sharpe ratio and win rate
+        sharpe_ratio, win_rate = self._backtest_all_sl_by_period(
+            entry_prices, exit_prices, closed, trade_period, len(periods))
+        score = sharpe_ratio * 0.6 + (win_rate / 100) * 0.4
+        best_level = score.argmax(axis=1)
         
-        if period_type == 'monthly':
-            periods = self._get_monthly_periods(df)
-        elif period_type == 'quarterly':
-            periods = self._get_quarterly_periods(df)
-        elif period_type == 'yearly':
-            periods = self._get_yearly_periods(df)
-        else:
-            return results
-        
-        for period_start, period_end in periods:
-            # Filter signals for this period
-            period_signals = [s for s in signals if period_start <= s['date'] <= period_end]
-            
-            if len(period_signals) < 5:  # Need minimum signals for meaningful analysis
-                continue
-            
-            # Test different stop loss percentages
-            best_result = None
-            best_score = -float('inf')
-            
-            for stop_loss_pct in self.test_intervals:
-                result = self._backtest_with_stop_loss(df, period_signals, stop_loss_pct, period_start, period_end)
-                
-                # Score based on Sharpe ratio and win rate
-                score = result.sharpe_ratio * 0.6 + (result.win_rate / 100) * 0.4
-                
-                if score > best_score:
-                    best_score = score
-                    best_result = result
-            
-            if best_result:
-                results.append(best_result)
+        results = []
+        for period in np.flatnonzero(signal_counts >= 5):
+            period_start, period_end = periods[period]
+            start_idx = np.searchsorted(dates, period_starts[period], side='left')
+            end_idx = period_last_idx[period] + 1
+            results.append(self._backtest_with_stop_loss(
+                dates[start_idx:end_idx], closes[start_idx:end_idx],
+                signals.between(period_start, period_end),
+                self.test_intervals[best_level[period]], period_start, period_end))
         
         return results
     
-    def _get_monthly_periods(self, df: pd.DataFrame) -> List[Tuple[datetime, datetime]]:
-        """Get monthly periods from data"""
-        periods = []
+    def _get_periods(self, df: pd.DataFrame, freq: str) -> List[Tuple[datetime, datetime]]:
+        """Calendar periods ('M', 'Q' or 'Y') covering the data, clipped to its date range"""
         start_date = df['date'].min()
         end_date = df['date'].max()
         
-        # Start from beginning of month
-        current = start_date.replace(day=1)
-        while current <= end_date:
-            # Calculate next month
-            if current.month == 12:
-                next_month = current.replace(year=current.year + 1, month=1, day=1)
-            else:
-                next_month = current.replace(month=current.month + 1, day=1)
-            
-            period_start = current
-            period_end = min(next_month - timedelta(days=1), end_date)
-            
-            periods.append((period_start, period_end))
-            current = next_month
-        
-        return periods
+        return [
+            (max(period.start_time, start_date), min(period.end_time.normalize(), end_date))
+            for period in df['date'].dt.to_period(freq).unique()
+        ]
     
-    def _get_quarterly_periods(self, df: pd.DataFrame) -> List[Tuple[datetime, datetime]]:
-        """Get quarterly periods from data"""
-        periods = []
-        start_date = df['date'].min()
-        end_date = df['date'].max()
+    def _pair_signals(self, dates: np.ndarray, closes: np.ndarray, signals: TradingSignals,
+                      period_start: datetime, period_end: datetime) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Pair BUY/SELL signals into trades.
+        
+        Returns entry prices/dates, exit prices/dates and the number of trades
+        closed by a SELL signal. A position still open at the end is closed at
+        the period's last close and comes last.
+        """
+        if not len(signals):
+            empty_dates = np.empty(0, dtype='datetime64[ns]')
+            return np.empty(0), empty_dates, np.empty(0), empty_dates, 0
+        
+        entries, exits = _bt_loop(signals.actions)
+        
+        entry_prices = signals.prices[entries]
+        entry_dates = signals.dates[entries]
+        exit_prices = signals.prices[exits]
+        exit_dates = signals.dates[exits]
+        n_closed = len(exits)
         
-        # Start from beginning of quarter
-        quarter_start_month = ((start_date.month - 1) // 3) * 3 + 1
-        current = start_date.replace(month=quarter_start_month, day=1)
-        
-        while current <= end_date:
-            # Calculate end of quarter
-            if current.month in [1, 2, 3]:
-                quarter_end = current.replace(month=3, day=31)
-            elif current.month in [4, 5, 6]:
-                quarter_end = current.replace(month=6, day=30)
-            elif current.month in [7, 8, 9]:
-                quarter_end = current.replace(month=9, day=30)
-            else:
-                quarter_end = current.replace(month=12, day=31)
-            
-            period_start = current
-            period_end = min(quarter_end, end_date)
-            
-            periods.append((period_start, period_end))
-            
-            # Move to next quarter
-            if current.month >= 10:  # Q4 (Oct, Nov, Dec)
-                current = current.replace(year=current.year + 1, month=1, day=1)
-            elif current.month >= 7:  # Q3 (Jul, Aug, Sep)
-                current = current.replace(month=10, day=1)
-            elif current.month >= 4:  # Q2 (Apr, May, Jun)
-                current = current.replace(month=7, day=1)
-            else:  # Q1 (Jan, Feb, Mar)
-                current = current.replace(month=4, day=1)
-        
-        return periods
-    
-    def _get_yearly_periods(self, df: pd.DataFrame) -> List[Tuple[datetime, datetime]]:
-        """Get yearly periods from data"""
-        periods = []
-        start_date = df['date'].min()
-        end_date = df['date'].max()
+        # Close any remaining position at end of period
+        if len(entries) > n_closed:
+            last_idx = np.searchsorted(dates, np.datetime64(period_end, 'ns'), side='right') - 1
+            exit_prices = np.append(exit_prices, closes[last_idx])
+            exit_dates = np.append(exit_dates, dates[last_idx])
         
-        current_year = start_date.year
-        end_year = end_date.year
-        
-        while current_year <= end_year:
-            period_start = datetime(current_year, 1, 1)
-            period_end = datetime(current_year, 12, 31)
-            
-            # Adjust for actual data range
-            period_start = max(period_start, start_date)
-            period_end = min(period_end, end_date)
-            
-            periods.append((period_start, period_end))
-            current_year += 1
-        
-        return periods
+        return entry_prices, entry_dates, exit_prices, exit_dates, n_closed
+    
+    def _backtest_all_sl(self, entry_prices: np.ndarray, exit_prices: np.ndarray,
+                         n_closed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Backtest every stop loss level in one broadcast pass.
+        
+        Returns (sharpe_ratio, win_rate, total_return, max_drawdown), one entry
+        per level, all zeros when there are no trades. The period-end exit (if
+        any) is never stopped out.
+        """
+        n_levels = len(self._sl_arr)
+        if not len(entry_prices):
+            zeros = np.zeros(n_levels)
+            return zeros, zeros, zeros, zeros
+        
+        # (n_trades, n_levels) exits, in float64 like the final backtest that reports them
+        entry = entry_prices.astype(np.float64)[:, None]
+        exits = np.repeat(exit_prices.astype(np.float64)[:, None], n_levels, axis=1)
+        stop_loss_prices = entry[:n_closed] * self._sl_keep[None, :]
+        # A long position can't exit below its stop
+        exits[:n_closed] = np.maximum(exits[:n_closed], stop_loss_prices)
+        
+        pnl_percent = (exits - entry) / entry * 100
+        win_rate = (pnl_percent > 0).mean(axis=0) * 100
+        
+        mean = pnl_percent.mean(axis=0)
+        std = pnl_percent.std(axis=0)
+        sharpe_ratio = np.divide(mean, std, out=np.zeros_like(mean), where=std > MIN_RETURNS_STD)
+        
+        equity = self.initial_capital * np.cumprod(exits / entry, axis=0)
+        total_return = (equity[-1] - self.initial_capital) / self.initial_capital * 100
+        
+        equity = np.vstack((np.full(n_levels, self.initial_capital), equity))
+        peaks = np.maximum.accumulate(equity, axis=0)
+        max_drawdown = ((peaks - equity) / peaks * 100).max(axis=0)
+        
+        return sharpe_ratio, win_rate, total_return, max_drawdown
     
-    def _backtest_with_stop_loss(self, df: pd.DataFrame, signals: List[Dict], 
+    def _backtest_all_sl_by_period(self, entry_prices: np.ndarray, exit_prices: np.ndarray,
+                                   closed: np.ndarray, trade_period: np.ndarray,
+                                   n_periods: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-period Sharpe ratio and win rate for every stop loss level.
+        
+        Trades must be grouped by period (they are, since signals are sorted by
+        date). Returns two (n_periods, n_levels) arrays, zero for periods
+        without trades. Only trades closed by a signal can be stopped out.
+        """
+        n_levels = len(self._sl_arr)
+        sharpe_ratio = np.zeros((n_periods, n_levels))
+        win_rate = np.zeros((n_periods, n_levels))
+        if not len(entry_prices):
+            return sharpe_ratio, win_rate
+        
+        entry = entry_prices.astype(np.float64)[:, None]
+        exits = exit_prices.astype(np.float64)[:, None]
+        exits = np.where(closed[:, None], np.maximum(exits, entry * self._sl_keep[None, :]), exits)
+        pnl_percent = (exits - entry) / entry * 100
+        
+        # Segment reductions over each period's run of trades
+        traded_periods, first_trade, trade_group, n_trades = np.unique(
+            trade_period, return_index=True, return_inverse=True, return_counts=True)
+        counts = n_trades[:, None]
+        
+        wins = np.add.reduceat(pnl_percent > 0, first_trade, axis=0, dtype=np.int64)
+        mean = np.add.reduceat(pnl_percent, first_trade, axis=0, dtype=np.float64) / counts
+        deviation = pnl_percent - mean[trade_group]
+        std = np.sqrt(np.add.reduceat(deviation * deviation, first_trade, axis=0) / counts)
+        
+        sharpe_ratio[traded_periods] = np.divide(mean, std, out=np.zeros_like(mean), where=std > MIN_RETURNS_STD)
+        win_rate[traded_periods] = wins / counts * 100
+        return sharpe_ratio, win_rate
+    
+    def _backtest_with_stop_loss(self, dates: np.ndarray, closes: np.ndarray, signals: TradingSignals,
                                 stop_loss_pct: float, period_start: datetime, 
                                 period_end: datetime) -> StopLossResult:
         """Run backtest with specific stop loss percentage"""
         
-        capital = self.initial_capital
-        position = None
-        trades = []
-        equity_curve = [capital]
-        
-        # Filter data for this period
-        period_data = df[(df['date'] >= period_start) & (df['date'] <= period_end)].copy()
-        
-        for signal in signals:
-            if signal['action'] == 'BUY' and position is None:
-                # Open long position
-                shares = capital / signal['price']
-                position = {
-                    'shares': shares,
-                    'entry_price': signal['price'],
-                    'entry_date': signal['date'],
-                    'entry_capital': capital
-                }
-            
-            elif signal['action'] == 'SELL' and position is not None:
-                # Close long position
-                exit_price = signal['price']
-                exit_date = signal['date']
-                
-                # Check for stop loss
-                stop_loss_price = position['entry_price'] * (1 - stop_loss_pct)
-                if exit_price <= stop_loss_price:
-                    exit_price = stop_loss_price
-                    exit_reason = 'Stop Loss'
-                else:
-                    exit_reason = 'Signal'
-                
-                # Calculate trade result
-                pnl = (exit_price - position['entry_price']) * position['shares']
-                pnl_percent = (exit_price - position['entry_price']) / position['entry_price'] * 100
-                capital += pnl
-                
-                trades.append({
-                    'entry_date': position['entry_date'],
-                    'exit_date': exit_date,
-                    'entry_price': position['entry_price'],
-                    'exit_price': exit_price,
-                    'shares': position['shares'],
-                    'pnl': pnl,
-                    'pnl_percent': pnl_percent,
-                    'exit_reason': exit_reason
-                })
-                
-                equity_curve.append(capital)
-                position = None
-        
-        # Close any remaining position at end of period
-        if position is not None:
-            last_price = period_data.iloc[-1]['close']
-            exit_date = period_data.iloc[-1]['date']
-            
-            pnl = (last_price - position['entry_price']) * position['shares']
-            pnl_percent = (last_price - position['entry_price']) / position['entry_price'] * 100
-            capital += pnl
-            
-            trades.append({
-                'entry_date': position['entry_date'],
-                'exit_date': exit_date,
-                'entry_price': position['entry_price'],
-                'exit_price': last_price,
-                'shares': position['shares'],
-                'pnl': pnl,
-                'pnl_percent': pnl_percent,
-                'exit_reason': 'Period End'
-            })
-            
-            equity_curve.append(capital)
+        entry_prices, entry_dates, exit_prices, exit_dates, n_closed = self._pair_signals(
+            dates, closes, signals, period_start, period_end)
         
-        # Calculate performance metrics
-        if not trades:
+        if not len(entry_prices):
             return StopLossResult(
                 period_start=period_start,
                 period_end=period_end,
@@ -343,34 +447,56 @@ class StopLossOptimizer:
                 avg_win=0,
                 avg_loss=0,
                 profit_factor=0,
-                trades=[]
+                trades=np.zeros(0, dtype=TRADE_DTYPE)
             )
         
-        winning_trades = [t for t in trades if t['pnl'] > 0]
-        losing_trades = [t for t in trades if t['pnl'] < 0]
+        # Check for stop loss on every signal-closed trade at once
+        stop_loss_prices = entry_prices[:n_closed] * (1 - stop_loss_pct)
+        stopped = exit_prices[:n_closed] <= stop_loss_prices
+        exit_prices[:n_closed] = np.maximum(exit_prices[:n_closed], stop_loss_prices)
+        exit_reasons = np.full(len(exit_prices), REASON_PERIOD_END, dtype=np.uint8)
+        exit_reasons[:n_closed] = np.where(stopped, REASON_STOP, REASON_SIGNAL)
+        
+        # Every trade reinvests the full capital, so equity compounds by exit/entry
+        equity = self.initial_capital * np.cumprod(exit_prices / entry_prices)
+        entry_capital = np.concatenate(([self.initial_capital], equity[:-1]))
+        shares = entry_capital / entry_prices
+        pnl = (exit_prices - entry_prices) * shares
+        pnl_percent = (exit_prices - entry_prices) / entry_prices * 100
+        capital = equity[-1]
+        equity_curve = np.concatenate(([self.initial_capital], equity))
+        
+        # Calculate performance metrics
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
         
         total_return = (capital - self.initial_capital) / self.initial_capital * 100
-        win_rate = len(winning_trades) / len(trades) * 100 if trades else 0
+        win_rate = len(wins) / len(pnl) * 100
         
         # Calculate max drawdown
-        peak = self.initial_capital
-        max_dd = 0
-        for equity in equity_curve:
-            if equity > peak:
-                peak = equity
-            dd = (peak - equity) / peak * 100
-            if dd > max_dd:
-                max_dd = dd
+        peaks = np.maximum.accumulate(equity_curve)
+        max_dd = float(((peaks - equity_curve) / peaks).max() * 100)
         
         # Calculate Sharpe ratio (simplified)
-        returns = [t['pnl_percent'] for t in trades]
-        sharpe_ratio = np.mean(returns) / np.std(returns) if len(returns) > 1 and np.std(returns) > 0 else 0
+        # (a single trade or identical stopped-out trades have ~zero deviation, so they score 0)
+        returns_std = pnl_percent.std()
+        sharpe_ratio = pnl_percent.mean() / returns_std if returns_std > MIN_RETURNS_STD else 0
         
-        avg_win = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0
+        avg_win = wins.mean() if wins.size else 0
+        avg_loss = losses.mean() if losses.size else 0
         
         profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf')
         
+        trades = np.zeros(len(pnl), dtype=TRADE_DTYPE)
+        trades['entry_date'] = entry_dates
+        trades['exit_date'] = exit_dates
+        trades['entry_price'] = entry_prices
+        trades['exit_price'] = exit_prices
+        trades['shares'] = shares
+        trades['pnl'] = pnl
+        trades['pnl_percent'] = pnl_percent
+        trades['exit_reason'] = exit_reasons
+        
         return StopLossResult(
             period_start=period_start,
             period_end=period_end,
@@ -379,44 +505,39 @@ class StopLossOptimizer:
             win_rate=win_rate,
             max_drawdown=max_dd,
             sharpe_ratio=sharpe_ratio,
-            total_trades=len(trades),
-            winning_trades=len(winning_trades),
-            losing_trades=len(losing_trades),
+            total_trades=len(pnl),
+            winning_trades=len(wins),
+            losing_trades=len(losses),
             avg_win=avg_win,
             avg_loss=avg_loss,
             profit_factor=profit_factor,
             trades=trades
         )
     
-    def _find_overall_optimal(self, df: pd.DataFrame, signals: List[Dict]) -> float:
+    def _find_overall_optimal(self, signals: TradingSignals, dates: np.ndarray, closes: np.ndarray) -> float:
         """Find overall optimal stop loss for entire dataset"""
-        best_stop_loss = 0.08  # Default
-        best_score = -float('inf')
-        
-        for stop_loss_pct in self.test_intervals:
-            result = self._backtest_with_stop_loss(df, signals, stop_loss_pct, 
-                                                df['date'].min(), df['date'].max())
-            
-            # Score based on multiple factors
-            score = (result.sharpe_ratio * 0.4 + 
-                    (result.win_rate / 100) * 0.3 + 
-                    (result.total_return / 100) * 0.2 + 
-                    (1 - result.max_drawdown / 100) * 0.1)
-            
-            if score > best_score:
-                best_score = score
-                best_stop_loss = stop_loss_pct
+        entry_prices, _, exit_prices, _, n_closed = self._pair_signals(
+            dates, closes, signals, dates[0], dates[-1])
+        sharpe_ratio, win_rate, total_return, max_drawdown = self._backtest_all_sl(
+            entry_prices, exit_prices, n_closed)
+        
+        # Score based on multiple factors
+        score = self._score_weights @ np.vstack((sharpe_ratio,
+                                                 win_rate / 100,
+                                                 total_return / 100,
+                                                 1 - max_drawdown / 100))
+        best_stop_loss = self.test_intervals[int(np.argmax(score))]
         
         return best_stop_loss
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calculate RSI indicator (Wilder's smoothing)"""
+        values = prices.to_numpy(dtype=np.float64)
+        delta = np.diff(values, prepend=values[:1])
+        # fmax treats a missing change as no gain and no loss
+        gain = np.fmax(delta, 0.0)
+        loss = np.fmax(-delta, 0.0)
+        return pd.Series(_rsi_loop(gain, loss, period).astype(np.float32), index=prices.index)
 
 # Example usage
 if __name__ == "__main__":
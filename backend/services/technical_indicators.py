@@ -5,9 +5,14 @@ Calculates and stores technical indicators using the configuration
 
 import sys
 import os
+import tempfile
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 import logging
 
 # Add the backend directory to the path
@@ -16,48 +21,115 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from config.indicators_config import INDICATOR_CONFIGS, get_enabled_indicators, get_indicator_periods
 from utils.database import get_db_connection
 from models.stock_models import TechnicalIndicator
+from services import indicator_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
+# Rows per executemany call, keeps each batch well under max_allowed_packet
+INSERT_BATCH_SIZE = 50000
+
+# History recalculated ahead of new bars in incremental updates; long enough for the
+# slowest EMA/Wilder state (EMA_200) to forget its seed to well below stored precision
+INCREMENTAL_WARMUP_BARS = 3000
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sum from float64 prefix sums; NaN until the window is full and while it holds a NaN/inf"""
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+    
+    missing = ~np.isfinite(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values), dtype=np.float64)))
+    missing_counts = np.concatenate(([0], np.cumsum(missing)))
+    window_sums = sums[window:] - sums[:-window]
+    window_sums[missing_counts[window:] != missing_counts[:-window]] = np.nan
+    out[window - 1:] = window_sums
+    return out
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Boxcar mean over `window` values (same NaN rules as _rolling_sum)"""
+    return _rolling_sum(values, window) / window
+
+@dataclass
+class IndicatorRecord:
+    """One calculated indicator series and the period it is stored under"""
+    name: str
+    values: np.ndarray
+    period: Optional[int] = None
+
+@dataclass
+class IndicatorArrays:
+    """Price arrays projected once from the input DataFrame and shared by every indicator"""
+    close: np.ndarray       # float32
+    high: np.ndarray        # float32
+    low: np.ndarray         # float32
+    close_prev: np.ndarray  # float32, NaN on the first bar
+    volume: np.ndarray      # float64
+    tp: np.ndarray          # float64 typical price (high + low + close) / 3
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'IndicatorArrays':
+        hlc = df[['high', 'low', 'close']].to_numpy(dtype=np.float64)
+        high, low, close = (np.ascontiguousarray(column, dtype=np.float32) for column in hlc.T)
+        close_prev = np.empty_like(close)
+        close_prev[:1] = np.nan
+        close_prev[1:] = close[:-1]
+        return cls(
+            close=close,
+            high=high,
+            low=low,
+            close_prev=close_prev,
+            volume=df['volume'].to_numpy(dtype=np.float64),
+            tp=hlc.sum(axis=1) / 3
+        )
+
+def _calculate_symbol_indicators(df: pd.DataFrame) -> Dict[str, List[IndicatorRecord]]:
+    """Worker for the batch run: indicators for one symbol (no database access)"""
+    return TechnicalIndicatorsService().calculate_all_indicators(df)
+
 class TechnicalIndicatorsService:
     """Service for calculating and storing technical indicators"""
     
+    # Symbols with at least this many indicator values go through LOAD DATA when it is enabled
+    BULK_LOAD_MIN_ROWS = 10000
+    
     def __init__(self):
         self.db = get_db_connection()
     
-    def calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
+    def calculate_rsi(self, arrays: IndicatorArrays, period: int = 14) -> np.ndarray:
         """Calculate RSI (Relative Strength Index)"""
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return kernels.rsi(arrays.close, period)
     
-    def calculate_ema(self, df: pd.DataFrame, period: int) -> pd.Series:
+    def calculate_ema(self, arrays: IndicatorArrays, period: int) -> np.ndarray:
         """Calculate EMA (Exponential Moving Average)"""
-        return df['close'].ewm(span=period).mean()
+        return kernels.ema(arrays.close, period)
     
-    def calculate_sma(self, df: pd.DataFrame, period: int) -> pd.Series:
+    def calculate_sma(self, arrays: IndicatorArrays, period: int) -> np.ndarray:
         """Calculate SMA (Simple Moving Average)"""
-        return df['close'].rolling(window=period).mean()
+        return _rolling_mean(arrays.close, period)
     
-    def calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
-        """Calculate ATR (Average True Range)"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
+    def calculate_atr(self, arrays: IndicatorArrays, period: int = 14) -> np.ndarray:
+        """Calculate ATR (Average True Range, Wilder smoothing)"""
+        high, low, close_prev = arrays.high, arrays.low, arrays.close_prev
         
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = true_range.rolling(window=period).mean()
-        return atr
+        # Elementwise max of the three ranges, reusing two buffers instead of stacking them;
+        # fmax skips the missing previous close on the first bar (true range = high - low)
+        true_range = high - low
+        gap = np.subtract(high, close_prev)
+        np.fmax(true_range, np.abs(gap, out=gap), out=true_range)
+        np.subtract(low, close_prev, out=gap)
+        np.fmax(true_range, np.abs(gap, out=gap), out=true_range)
+        return kernels.wilder_smooth(true_range, period)
     
-    def calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
+    def calculate_macd(self, arrays: IndicatorArrays, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
         """Calculate MACD (Moving Average Convergence Divergence)"""
-        ema_fast = df['close'].ewm(span=fast).mean()
-        ema_slow = df['close'].ewm(span=slow).mean()
+        emas = kernels.fused_ema(arrays.close, np.array([fast, slow], dtype=np.float64))
+        return self._macd_from_emas(emas[:, 0], emas[:, 1], signal)
+    
+    def _macd_from_emas(self, ema_fast: np.ndarray, ema_slow: np.ndarray, signal: int) -> Dict[str, np.ndarray]:
+        """MACD line, signal and histogram from precomputed fast/slow EMAs"""
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal).mean()
+        signal_line = kernels.ema(macd_line, signal)
         histogram = macd_line - signal_line
         
         return {
@@ -66,165 +138,186 @@ class TechnicalIndicatorsService:
             'histogram': histogram
         }
     
-    def calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: float = 2) -> Dict[str, pd.Series]:
+    def calculate_bollinger_bands(self, arrays: IndicatorArrays, period: int = 20, std_dev: float = 2) -> Dict[str, np.ndarray]:
         """Calculate Bollinger Bands"""
-        sma = df['close'].rolling(window=period).mean()
-        std = df['close'].rolling(window=period).std()
+        sma, std = kernels.rolling_mean_std(arrays.close, period)
         
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
+        band_width = std * std_dev
         
         return {
-            'upper': upper_band,
+            'upper': sma + band_width,
             'middle': sma,
-            'lower': lower_band
+            'lower': sma - band_width
         }
     
-    def calculate_stochastic(self, df: pd.DataFrame, k_period: int = 14, d_period: int = 3, smooth_k: int = 3) -> Dict[str, pd.Series]:
-        """Calculate Stochastic Oscillator"""
-        # Convert to float to avoid decimal type issues
-        df_numeric = df[['high', 'low', 'close']].astype(float)
-        
-        lowest_low = df_numeric['low'].rolling(window=k_period).min()
-        highest_high = df_numeric['high'].rolling(window=k_period).max()
+    def calculate_stochastic(self, arrays: IndicatorArrays, k_period: int = 14, d_period: int = 3, smooth_k: int = 3,
+                             extremes: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Calculate Stochastic Oscillator (extremes: precomputed rolling lowest low / highest high)"""
+        if extremes is None:
+            extremes = kernels.rolling_min_max(arrays.low, arrays.high, k_period)
+        lowest_low, highest_high = extremes
         
-        k_percent = 100 * ((df_numeric['close'] - lowest_low) / (highest_high - lowest_low))
-        k_percent_smooth = k_percent.rolling(window=smooth_k).mean()
-        d_percent = k_percent_smooth.rolling(window=d_period).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_percent = 100 * ((arrays.close - lowest_low) / (highest_high - lowest_low))
+        k_percent_smooth = _rolling_mean(k_percent, smooth_k)
+        d_percent = _rolling_mean(k_percent_smooth, d_period)
         
         return {
             'k': k_percent_smooth,
             'd': d_percent
         }
     
-    def calculate_williams_r(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
-        """Calculate Williams %R"""
-        # Convert to float to avoid decimal type issues
-        df_numeric = df[['high', 'low', 'close']].astype(float)
-        
-        highest_high = df_numeric['high'].rolling(window=period).max()
-        lowest_low = df_numeric['low'].rolling(window=period).min()
-        williams_r = -100 * ((highest_high - df_numeric['close']) / (highest_high - lowest_low))
-        return williams_r
+    def calculate_williams_r(self, arrays: IndicatorArrays, period: int = 14,
+                             extremes: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+        """Calculate Williams %R (extremes: precomputed rolling lowest low / highest high)"""
+        if extremes is None:
+            extremes = kernels.rolling_min_max(arrays.low, arrays.high, period)
+        lowest_low, highest_high = extremes
+        return -100 * ((highest_high - arrays.close) / (highest_high - lowest_low))
     
-    def calculate_cci(self, df: pd.DataFrame, period: int = 20) -> pd.Series:
+    def calculate_cci(self, arrays: IndicatorArrays, period: int = 20) -> np.ndarray:
         """Calculate Commodity Channel Index"""
-        # Convert to float to avoid decimal type issues
-        df_numeric = df[['high', 'low', 'close']].astype(float)
+        tp = arrays.tp
+        cci = np.full(len(tp), np.nan)
+        if len(tp) < period:
+            return cci
         
-        typical_price = (df_numeric['high'] + df_numeric['low'] + df_numeric['close']) / 3
-        sma_tp = typical_price.rolling(window=period).mean()
-        mean_deviation = typical_price.rolling(window=period).apply(lambda x: np.mean(np.abs(x - x.mean())))
-        cci = (typical_price - sma_tp) / (0.015 * mean_deviation)
+        # SMA and mean absolute deviation over every window at once
+        windows = sliding_window_view(tp, period)
+        sma_tp = windows.mean(axis=1, keepdims=True)
+        mean_deviation = np.abs(windows - sma_tp).mean(axis=1)
+        cci[period - 1:] = (tp[period - 1:] - sma_tp[:, 0]) / (0.015 * mean_deviation)
         return cci
     
-    def calculate_mfi(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
+    def calculate_mfi(self, arrays: IndicatorArrays, period: int = 14) -> np.ndarray:
         """Calculate Money Flow Index"""
-        # Convert to float to avoid decimal type issues
-        df_numeric = df[['high', 'low', 'close', 'volume']].astype(float)
+        money_flow = arrays.tp * arrays.volume
+        tp_change = np.diff(arrays.tp, prepend=np.nan)
         
-        typical_price = (df_numeric['high'] + df_numeric['low'] + df_numeric['close']) / 3
-        money_flow = typical_price * df_numeric['volume']
+        positive_flow = _rolling_sum(np.where(tp_change > 0, money_flow, 0.0), period)
+        negative_flow = _rolling_sum(np.where(tp_change < 0, money_flow, 0.0), period)
         
-        positive_flow = money_flow.where(typical_price > typical_price.shift(1), 0).rolling(window=period).sum()
-        negative_flow = money_flow.where(typical_price < typical_price.shift(1), 0).rolling(window=period).sum()
-        
-        mfi = 100 - (100 / (1 + (positive_flow / negative_flow)))
-        return mfi
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + (positive_flow / negative_flow)))
     
-    def calculate_all_indicators(self, df: pd.DataFrame) -> Dict[str, Dict[str, pd.Series]]:
+    def calculate_all_indicators(self, df: pd.DataFrame) -> Dict[str, List[IndicatorRecord]]:
         """Calculate all enabled indicators"""
         indicators = {}
         
         # Sort dataframe by date to ensure proper calculation
         df = df.sort_values('date').reset_index(drop=True)
         
+        # One conversion per column; every indicator works on these arrays
+        arrays = IndicatorArrays.from_dataframe(df)
+        
+        # Every EMA (configured periods plus MACD fast/slow) and every RSI comes from one pass over close
+        ema_spans = []
+        if INDICATOR_CONFIGS['EMA'].get('enabled', False):
+            ema_spans.extend(get_indicator_periods('EMA'))
+        if INDICATOR_CONFIGS['MACD'].get('enabled', False):
+            ema_spans.extend([INDICATOR_CONFIGS['MACD']['fast_period'], INDICATOR_CONFIGS['MACD']['slow_period']])
+        ema_spans = list(dict.fromkeys(ema_spans))
+        rsi_periods = get_indicator_periods('RSI') if INDICATOR_CONFIGS['RSI'].get('enabled', False) else []
+        
+        ema_values, rsi_values = kernels.close_pass(arrays.close,
+                                                    np.asarray(ema_spans, dtype=np.float64),
+                                                    np.asarray(rsi_periods, dtype=np.int64))
+        emas = {span: ema_values[:, i] for i, span in enumerate(ema_spans)}
+        
+        # Rolling lowest low / highest high per window, shared by Stochastic and Williams %R
+        extremes = {}
+        
+        def rolling_extremes(window: int) -> Tuple[np.ndarray, np.ndarray]:
+            if window not in extremes:
+                extremes[window] = kernels.rolling_min_max(arrays.low, arrays.high, window)
+            return extremes[window]
+        
         for indicator_name, config in INDICATOR_CONFIGS.items():
             if not config.get('enabled', False):
                 continue
                 
             try:
                 if indicator_name == 'RSI':
-                    periods = get_indicator_periods('RSI')
-                    indicators['RSI'] = {}
-                    for period in periods:
-                        indicators['RSI'][f'RSI_{period}'] = self.calculate_rsi(df, period)
+                    indicators['RSI'] = [
+                        IndicatorRecord(f'RSI_{period}', rsi_values[:, i], period)
+                        for i, period in enumerate(rsi_periods)
+                    ]
                 
                 elif indicator_name == 'EMA':
                     periods = get_indicator_periods('EMA')
-                    indicators['EMA'] = {}
+                    indicators['EMA'] = []
                     for period in periods:
-                        indicators['EMA'][f'EMA_{period}'] = self.calculate_ema(df, period)
+                        indicators['EMA'].append(IndicatorRecord(f'EMA_{period}', emas[period], period))
                 
                 elif indicator_name == 'SMA':
                     periods = get_indicator_periods('SMA')
-                    indicators['SMA'] = {}
+                    indicators['SMA'] = []
                     for period in periods:
-                        indicators['SMA'][f'SMA_{period}'] = self.calculate_sma(df, period)
+                        indicators['SMA'].append(IndicatorRecord(f'SMA_{period}', self.calculate_sma(arrays, period), period))
                 
                 elif indicator_name == 'ATR':
                     periods = get_indicator_periods('ATR')
-                    indicators['ATR'] = {}
+                    indicators['ATR'] = []
                     for period in periods:
-                        indicators['ATR'][f'ATR_{period}'] = self.calculate_atr(df, period)
+                        indicators['ATR'].append(IndicatorRecord(f'ATR_{period}', self.calculate_atr(arrays, period), period))
                 
                 elif indicator_name == 'MACD':
                     macd_config = config
-                    macd_result = self.calculate_macd(
-                        df, 
-                        macd_config['fast_period'], 
-                        macd_config['slow_period'], 
+                    macd_result = self._macd_from_emas(
+                        emas[macd_config['fast_period']],
+                        emas[macd_config['slow_period']],
                         macd_config['signal_period']
                     )
-                    indicators['MACD'] = {
-                        'MACD': macd_result['macd'],
-                        'MACD_Signal': macd_result['signal'],
-                        'MACD_Histogram': macd_result['histogram']
-                    }
+                    indicators['MACD'] = [
+                        IndicatorRecord('MACD', macd_result['macd']),
+                        IndicatorRecord('MACD_Signal', macd_result['signal']),
+                        IndicatorRecord('MACD_Histogram', macd_result['histogram'])
+                    ]
                 
                 elif indicator_name == 'BOLLINGER_BANDS':
                     bb_config = config
                     bb_result = self.calculate_bollinger_bands(
-                        df, 
+                        arrays, 
                         bb_config['period'], 
                         bb_config['std_dev']
                     )
-                    indicators['BOLLINGER_BANDS'] = {
-                        'BB_Upper': bb_result['upper'],
-                        'BB_Middle': bb_result['middle'],
-                        'BB_Lower': bb_result['lower']
-                    }
+                    indicators['BOLLINGER_BANDS'] = [
+                        IndicatorRecord('BB_Upper', bb_result['upper']),
+                        IndicatorRecord('BB_Middle', bb_result['middle']),
+                        IndicatorRecord('BB_Lower', bb_result['lower'])
+                    ]
                 
                 elif indicator_name == 'STOCHASTIC':
                     stoch_config = config
                     stoch_result = self.calculate_stochastic(
-                        df,
+                        arrays,
                         stoch_config['k_period'],
                         stoch_config['d_period'],
-                        stoch_config['smooth_k']
+                        stoch_config['smooth_k'],
+                        rolling_extremes(stoch_config['k_period'])
                     )
-                    indicators['STOCHASTIC'] = {
-                        'Stoch_K': stoch_result['k'],
-                        'Stoch_D': stoch_result['d']
-                    }
+                    indicators['STOCHASTIC'] = [
+                        IndicatorRecord('Stoch_K', stoch_result['k']),
+                        IndicatorRecord('Stoch_D', stoch_result['d'])
+                    ]
                 
                 elif indicator_name == 'WILLIAMS_R':
                     period = config['period']
-                    indicators['WILLIAMS_R'] = {
-                        f'Williams_R_{period}': self.calculate_williams_r(df, period)
-                    }
+                    indicators['WILLIAMS_R'] = [
+                        IndicatorRecord(f'Williams_R_{period}', self.calculate_williams_r(arrays, period, rolling_extremes(period)), period)
+                    ]
                 
                 elif indicator_name == 'CCI':
                     period = config['period']
-                    indicators['CCI'] = {
-                        f'CCI_{period}': self.calculate_cci(df, period)
-                    }
+                    indicators['CCI'] = [
+                        IndicatorRecord(f'CCI_{period}', self.calculate_cci(arrays, period), period)
+                    ]
                 
                 elif indicator_name == 'MFI':
                     period = config['period']
-                    indicators['MFI'] = {
-                        f'MFI_{period}': self.calculate_mfi(df, period)
-                    }
+                    indicators['MFI'] = [
+                        IndicatorRecord(f'MFI_{period}', self.calculate_mfi(arrays, period), period)
+                    ]
                     
             except Exception as e:
                 logger.error(f"Error calculating {indicator_name}: {e}")
@@ -232,48 +325,53 @@ class TechnicalIndicatorsService:
         
         return indicators
     
-    def store_indicators_in_database(self, symbol_id: int, df: pd.DataFrame, indicators: Dict[str, Dict[str, pd.Series]]):
-        """Store calculated indicators in database"""
-        if not self.db.connect():
+    def store_indicators_in_database(self, symbol_id: int, df: pd.DataFrame, indicators: Dict[str, List[IndicatorRecord]]):
+        """Store calculated indicators in database (reuses the service's connection when one is open)"""
+        owns_connection = self.db.connection is None
+        if owns_connection and not self.db.connect():
             logger.error("Failed to connect to database")
             return False
         
+        insert_query = """
+            INSERT INTO technical_indicators (symbol_id, date, indicator_name, value, period)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            value = VALUES(value)
+        """
+        
         try:
-            stored_count = 0
+            # Dates extracted once as Python objects, in row order
+            dates = df['date'].astype(object).to_numpy()
             
-            for indicator_type, indicator_data in indicators.items():
-                for indicator_name, values in indicator_data.items():
-                    # Extract period from indicator name if present
-                    period = None
-                    if '_' in indicator_name:
-                        try:
-                            period = int(indicator_name.split('_')[-1])
-                        except ValueError:
-                            period = None
-                    
-                    # Prepare data for insertion
-                    insert_query = """
-                        INSERT INTO technical_indicators (symbol_id, date, indicator_name, value, period)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        value = VALUES(value)
-                    """
-                    
-                    data_to_insert = []
-                    for idx, row in df.iterrows():
-                        if pd.notna(values.iloc[idx]):
-                            data_to_insert.append((
-                                symbol_id,
-                                row['date'],
-                                indicator_name,
-                                float(values.iloc[idx]),
-                                period
-                            ))
-                    
-                    if data_to_insert:
-                        rows_inserted = self.db.execute_many(insert_query, data_to_insert)
-                        stored_count += rows_inserted
-                        logger.info(f"Stored {rows_inserted} {indicator_name} values for symbol_id {symbol_id}")
+            # Non-missing values of every indicator, with the mask selecting their dates
+            present = []
+            for records in indicators.values():
+                for record in records:
+                    vals = record.values.astype(np.float64)
+                    mask = ~np.isnan(vals)
+                    present.append((record, vals[mask], mask))
+            
+            if self.db.config.MYSQL_LOCAL_INFILE and sum(len(vals) for _, vals, _ in present) >= self.BULK_LOAD_MIN_ROWS:
+                stored_count = self._bulk_load_indicators(symbol_id, dates, present)
+                if stored_count is not None:
+                    logger.info(f"Total indicators stored: {stored_count}")
+                    return True
+                logger.warning(f"Bulk load failed for symbol_id {symbol_id}, falling back to batched inserts")
+            
+            # Collect the rows of every indicator, then write them in as few batches as possible
+            all_rows = []
+            for record, vals, mask in present:
+                all_rows.extend(zip(
+                    repeat(symbol_id),
+                    dates[mask].tolist(),
+                    repeat(record.name),
+                    vals.tolist(),
+                    repeat(record.period)
+                ))
+            
+            stored_count = 0
+            for start in range(0, len(all_rows), INSERT_BATCH_SIZE):
+                stored_count += self.db.execute_many(insert_query, all_rows[start:start + INSERT_BATCH_SIZE])
             
             logger.info(f"Total indicators stored: {stored_count}")
             return True
@@ -282,7 +380,48 @@ class TechnicalIndicatorsService:
             logger.error(f"Error storing indicators: {e}")
             return False
         finally:
-            self.db.disconnect()
+            if owns_connection:
+                self.db.disconnect()
+    
+    def _bulk_load_indicators(self, symbol_id: int, dates: np.ndarray,
+                              present: List[Tuple[IndicatorRecord, np.ndarray, np.ndarray]]) -> Optional[int]:
+        """
+        Load indicator values via LOAD DATA LOCAL INFILE into a staging table,
+        then merge into technical_indicators with a single INSERT ... SELECT.
+        Returns None if any step fails so the caller can fall back.
+        """
+        columns = ['symbol_id', 'date', 'indicator_name', 'value', 'period']
+        # Per-connection staging table, so concurrent loads don't collide
+        stage_ddl = """
+            CREATE TEMPORARY TABLE IF NOT EXISTS technical_indicators_stage (
+                symbol_id INT, date DATE, indicator_name VARCHAR(50), value DECIMAL(15,6), period INT
+            )
+        """
+        merge_query = """
+            INSERT INTO technical_indicators (symbol_id, date, indicator_name, value, period)
+            SELECT symbol_id, date, indicator_name, value, period FROM technical_indicators_stage
+            ON DUPLICATE KEY UPDATE
+            value = VALUES(value)
+        """
+        counts = [len(vals) for _, vals, _ in present]
+        rows = pd.DataFrame({
+            'symbol_id': symbol_id,
+            'date': np.concatenate([dates[mask] for _, _, mask in present]),
+            'indicator_name': np.repeat([record.name for record, _, _ in present], counts),
+            'value': np.concatenate([vals for _, vals, _ in present]),
+            'period': pd.array(np.repeat(np.array([record.period for record, _, _ in present], dtype=object), counts),
+                               dtype='Int64')
+        })
+        
+        fd, csv_path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                rows.to_csv(f, index=False, header=False, na_rep='\\N', lineterminator='\n')
+            
+            return self.db.execute_staged_load(csv_path, stage_ddl, 'technical_indicators_stage',
+                                               columns, merge_query)
+        finally:
+            os.remove(csv_path)
     
     def calculate_and_store_indicators(self, symbol_id: int, df: pd.DataFrame):
         """Calculate and store all indicators for a symbol"""
@@ -300,6 +439,81 @@ class TechnicalIndicatorsService:
             logger.error(f"Failed to store indicators for symbol_id {symbol_id}")
         
         return success
+    
+    def update_indicators(self, symbol_id: int, df: pd.DataFrame) -> bool:
+        """
+        Calculate and store indicators only for bars newer than the symbol's
+        latest stored indicator date. Only the last INCREMENTAL_WARMUP_BARS of
+        history are recalculated ahead of them. Falls back to a full run when
+        nothing is stored yet.
+        """
+        owns_connection = self.db.connection is None
+        try:
+            result = self.db.execute_query(
+                "SELECT MAX(date) AS last_date FROM technical_indicators WHERE symbol_id = %s",
+                (symbol_id,)
+            )
+            if result is None:
+                logger.error(f"Failed to read latest indicator date for symbol_id {symbol_id}")
+                return False
+            
+            last_date = result[0]['last_date'] if result else None
+            if last_date is None:
+                return self.calculate_and_store_indicators(symbol_id, df)
+            
+            df = df.sort_values('date').reset_index(drop=True)
+            new_bars = int((pd.to_datetime(df['date']) > pd.Timestamp(last_date)).sum())
+            if new_bars == 0:
+                logger.info(f"Indicators for symbol_id {symbol_id} are up to date")
+                return True
+            
+            logger.info(f"Updating indicators for symbol_id {symbol_id}: {new_bars} new bars")
+            tail = df.iloc[-(new_bars + INCREMENTAL_WARMUP_BARS):].reset_index(drop=True)
+            indicators = {
+                indicator_type: [IndicatorRecord(record.name, record.values[-new_bars:], record.period)
+                                 for record in records]
+                for indicator_type, records in self.calculate_all_indicators(tail).items()
+            }
+            return self.store_indicators_in_database(symbol_id, tail.iloc[-new_bars:].reset_index(drop=True), indicators)
+        finally:
+            if owns_connection:
+                self.db.disconnect()
+    
+    def calculate_and_store_indicators_batch(self, symbol_dfs: Dict[int, pd.DataFrame],
+                                             max_workers: Optional[int] = None) -> Dict[int, bool]:
+        """
+        Calculate and store indicators for many symbols. Calculation runs across
+        worker processes; results are written from this process as they complete,
+        over a single database connection shared by the whole batch.
+        Returns {symbol_id: success}.
+        """
+        if not self.db.connect():
+            logger.error("Failed to connect to database")
+            return {symbol_id: False for symbol_id in symbol_dfs}
+        
+        results = {}
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                futures = {
+                    executor.submit(_calculate_symbol_indicators, df): symbol_id
+                    for symbol_id, df in symbol_dfs.items()
+                }
+                for future in as_completed(futures):
+                    symbol_id = futures[future]
+                    try:
+                        indicators = future.result()
+                    except Exception as e:
+                        logger.error(f"Error calculating indicators for symbol_id {symbol_id}: {e}")
+                        results[symbol_id] = False
+                        continue
+                    
+                    results[symbol_id] = self.store_indicators_in_database(symbol_id, symbol_dfs[symbol_id], indicators)
+                    if not results[symbol_id]:
+                        logger.error(f"Failed to store indicators for symbol_id {symbol_id}")
+        finally:
+            self.db.disconnect()
+        
+        return results
 
 # Example usage
 if __name__ == "__main__":
@@ -322,7 +536,7 @@ if __name__ == "__main__":
     print("\nCalculating indicators for sample data...")
     indicators = service.calculate_all_indicators(sample_data)
     
-    for indicator_type, data in indicators.items():
+    for indicator_type, records in indicators.items():
         print(f"\n{indicator_type}:")
-        for name, values in data.items():
-            print(f"  {name}: {len(values.dropna())} valid values")
+        for record in records:
+            print(f"  {record.name}: {np.count_nonzero(~np.isnan(record.values))} valid values")
@@ -4,14 +4,448 @@ Wyckoff Method Analysis Service
 Analyzes price action and volume patterns for Wyckoff phase identification
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import threading
 import logging
 
+from utils.numba_compat import njit, NUMBA_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
+# Default thresholds. Kept at module level so vectorized checks and jitted kernels can use
+# them as fixed values (numba folds globals in as compile-time constants); the service
+# copies the ones it exposes as attributes in __init__, so an instance can still override them.
+VOLUME_THRESHOLD_MULTIPLIER = 2.0  # Volume must be 2x average for significance
+SPRING_THRESHOLD = 0.05  # 5% below support for spring detection
+UPTHRUST_THRESHOLD = 0.05  # 5% above resistance for upthrust detection
+TRADING_RANGE_MAX_VOLATILITY = 0.15  # Close std / mean over the window
+TRADING_RANGE_MAX_RANGE = 0.25  # (Highest high - lowest low) / mean close over the window
+
+# Indicator-frame columns kept for reference only (no analysis step reads them), stored as float32
+REFERENCE_COLUMNS = (
+    'price_change_abs', 'sma_50', 'ema_12', 'ema_26', 'price_vs_sma20', 'price_vs_sma50',
+    'volatility', 'daily_range', 'close_position'
+)
+
+
+@njit(cache=True)
+def _ewm_mean(values, span):
+    """EWM mean matching pandas ewm(span=span).mean() (adjust=True), NaN-aware"""
+    n = values.shape[0]
+    out = np.empty(n)
+    decay = 1.0 - 2.0 / (span + 1.0)
+    num = 0.0
+    den = 0.0
+    for i in range(n):
+        num *= decay
+        den *= decay
+        x = values[i]
+        if not np.isnan(x):
+            num += x
+            den += 1.0
+        out[i] = num / den if den > 0 else np.nan
+    return out
+
+
+@njit(cache=True)
+def _rolling_mean_std(values, window):
+    """
+    Rolling mean and sample std (ddof=1, like pandas rolling(window)) in one
+    O(N) pass with a sliding Welford update. NaN until the window is full and
+    while it holds a NaN.
+    """
+    n = values.shape[0]
+    out_mean = np.full(n, np.nan)
+    out_std = np.full(n, np.nan)
+    run = 0  # consecutive non-NaN values seen, capped at window
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        x = values[i]
+        if np.isnan(x):
+            run = 0
+            mean = 0.0
+            m2 = 0.0
+            continue
+        if run < window:
+            run += 1
+            delta = x - mean
+            mean += delta / run
+            m2 += delta * (x - mean)
+        else:
+            # Replace the value leaving the window (known to be non-NaN)
+            old = values[i - window]
+            delta = x - old
+            old_mean = mean
+            mean += delta / window
+            m2 += delta * (x - mean + old - old_mean)
+        if run == window:
+            out_mean[i] = mean
+            if window > 1:
+                out_std[i] = np.sqrt(max(m2, 0.0) / (window - 1))
+    return out_mean, out_std
+
+
+def _window_means(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of every full `window`-value window (len - window + 1 of them) from prefix sums,
+    so each window costs O(1). NaNs are skipped like pandas' mean; all-NaN windows are NaN.
+    """
+    missing = np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    counts = np.concatenate(([0], np.cumsum(~missing)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums[window:] - sums[:-window]) / (counts[window:] - counts[:-window])
+
+
+def _nan_mean(values: np.ndarray) -> float:
+    """Mean skipping NaNs like pandas' Series.mean (NaN when none are left), without warnings"""
+    missing = np.isnan(values)
+    count = values.size - np.count_nonzero(missing)
+    return np.where(missing, 0.0, values).sum() / count if count else np.nan
+
+
+@njit(cache=True)
+def _rolling_min_max(low, high, window):
+    """
+    Rolling lowest low and highest high in O(N) with monotonic index deques
+    (ring buffers). NaN until the window is full and while it holds a NaN.
+    """
+    n = low.shape[0]
+    lowest = np.full(n, np.nan)
+    highest = np.full(n, np.nan)
+    min_q = np.empty(window, dtype=np.int64)
+    max_q = np.empty(window, dtype=np.int64)
+    min_head = 0
+    min_len = 0
+    max_head = 0
+    max_len = 0
+    last_nan_low = -window
+    last_nan_high = -window
+    for i in range(n):
+        # Drop the index that just left the window
+        if min_len > 0 and min_q[min_head] <= i - window:
+            min_head = (min_head + 1) % window
+            min_len -= 1
+        if max_len > 0 and max_q[max_head] <= i - window:
+            max_head = (max_head + 1) % window
+            max_len -= 1
+        
+        lo = low[i]
+        if np.isnan(lo):
+            last_nan_low = i
+        else:
+            while min_len > 0 and low[min_q[(min_head + min_len - 1) % window]] >= lo:
+                min_len -= 1
+            min_q[(min_head + min_len) % window] = i
+            min_len += 1
+        
+        hi = high[i]
+        if np.isnan(hi):
+            last_nan_high = i
+        else:
+            while max_len > 0 and high[max_q[(max_head + max_len - 1) % window]] <= hi:
+                max_len -= 1
+            max_q[(max_head + max_len) % window] = i
+            max_len += 1
+        
+        if i >= window - 1:
+            if i - last_nan_low >= window:
+                lowest[i] = low[min_q[min_head]]
+            if i - last_nan_high >= window:
+                highest[i] = high[max_q[max_head]]
+    return lowest, highest
+
+
+@njit(cache=True)
+def _wyckoff_indicator_pass(high, low, close, volume):
+    """
+    All rolling/EWM Wyckoff indicators in a single pass over the bars. Each
+    rolling stream keeps its own sliding Welford state (the same update as
+    _rolling_mean_std) and the EMAs follow _ewm_mean, so values match the
+    per-indicator kernels exactly.
+    
+    Returns (volume_sma_20, sma_20, std_20, sma_50, ema_12, ema_26, atr_14).
+    """
+    n = close.shape[0]
+    # Rolling streams: volume/20, close/20, close/50, true range/14
+    windows = np.array([20, 20, 50, 14])
+    k = windows.shape[0]
+    inputs = np.empty((k, n))
+    means = np.full((k, n), np.nan)
+    std_20 = np.full(n, np.nan)
+    run = np.zeros(k, dtype=np.int64)
+    mean = np.zeros(k)
+    m2 = np.zeros(k)
+    
+    spans = np.array([12.0, 26.0])
+    decay = 1.0 - 2.0 / (spans + 1.0)
+    num = np.zeros(2)
+    den = np.zeros(2)
+    emas = np.empty((2, n))
+    
+    for i in range(n):
+        c = close[i]
+        # True range; NaN on the first bar, where there is no previous close
+        if i == 0:
+            tr = np.nan
+        else:
+            tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+            if np.isnan(high[i] - low[i]) or np.isnan(close[i - 1]):
+                tr = np.nan
+        inputs[0, i] = volume[i]
+        inputs[1, i] = c
+        inputs[2, i] = c
+        inputs[3, i] = tr
+        
+        for j in range(k):
+            window = windows[j]
+            x = inputs[j, i]
+            if np.isnan(x):
+                run[j] = 0
+                mean[j] = 0.0
+                m2[j] = 0.0
+                continue
+            if run[j] < window:
+                run[j] += 1
+                delta = x - mean[j]
+                mean[j] += delta / run[j]
+                m2[j] += delta * (x - mean[j])
+            else:
+                old = inputs[j, i - window]
+                delta = x - old
+                old_mean = mean[j]
+                mean[j] += delta / window
+                m2[j] += delta * (x - mean[j] + old - old_mean)
+            if run[j] == window:
+                means[j, i] = mean[j]
+                if j == 1:
+                    std_20[i] = np.sqrt(max(m2[j], 0.0) / (window - 1))
+        
+        for j in range(2):
+            num[j] *= decay[j]
+            den[j] *= decay[j]
+            if not np.isnan(c):
+                num[j] += c
+                den[j] += 1.0
+            emas[j, i] = num[j] / den[j] if den[j] > 0 else np.nan
+    
+    return means[0], means[1], std_20, means[2], emas[0], emas[1], means[3]
+
+
+@njit(cache=True, error_model='numpy')
+def _scan_trend_periods(close, sma_20, high_volume_days, window):
+    """
+    Markup/markdown scan over every `window`-bar period k (rows k .. k+window-1, for the
+    len - window - 10 periods the finders look at). high_volume_days[k] is the period's
+    high-volume day count. Returns per-period phase codes (PHASE_NAMES: 1 markup,
+    2 markdown, 0 neither), price change and trend strength (% above SMA 20).
+    """
+    n_periods = max(close.shape[0] - window - 10, 0)
+    codes = np.zeros(n_periods, dtype=np.int8)
+    price_change = np.empty(n_periods)
+    trend_strength = np.empty(n_periods)
+    
+    for k in range(n_periods):
+        last = k + window - 1
+        change = (close[last] - close[k]) / close[k]
+        price_change[k] = change
+        trend_strength[k] = (close[last] / sma_20[last] - 1) * 100
+        
+        # Markup: significant uptrend + volume confirmation (more than 5 high volume days);
+        # markdown: significant downtrend
+        if change > 0.15 and high_volume_days[k] > 5 and close[last] > sma_20[last]:
+            codes[k] = 1
+        elif change < -0.15 and close[last] < sma_20[last]:
+            codes[k] = 2
+    return codes, price_change, trend_strength
+
+
+# Phase names indexed by the codes returned from _classify_phase_codes
+PHASE_NAMES = (None, 'markup', 'markdown', 'accumulation', 'distribution')
+
+
+@njit(cache=True)
+def _classify_phase_codes(price_change_pct, price_range_pct, volume_ratio, volume_trend, price_vs_sma):
+    """
+    Vectorized WyckoffAnalysisService._classify_phase: classify every element
+    of the metric arrays in one call. Returns codes indexing PHASE_NAMES
+    (0 = no clear phase).
+    """
+    n = price_change_pct.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        pc = price_change_pct[i]
+        pr = price_range_pct[i]
+        vr = volume_ratio[i]
+        vt = volume_trend[i]
+        ps = price_vs_sma[i]
+        if pc > 0.08 and ps > 0.02 and vr > 1.1:
+            out[i] = 1
+        elif pc < -0.08 and ps < -0.02:
+            out[i] = 2
+        elif abs(pc) < 0.05 and pr < 0.15 and vr > 1.0 and vt > 1.05:
+            out[i] = 3
+        elif abs(pc) < 0.05 and pr < 0.15 and vr > 1.0 and vt < 0.95:
+            out[i] = 4
+        elif pc > 0.03 and ps > 0.01:
+            out[i] = 1
+        elif pc < -0.03 and ps < -0.01:
+            out[i] = 2
+    return out
+
+
+# Category of every phase name the phase pipeline produces
+PHASE_CATEGORIES = {
+    'Phase A - Selling Climax': 'accumulation',
+    'Phase B - Building Cause': 'accumulation',
+    'Phase C - Spring Test': 'accumulation',
+    'Phase D - Markup': 'markup',
+    'Markup Trend': 'markup',
+    'Markdown Trend': 'markdown',
+}
+
+
+# Phase confidence table: phase -> (price metric, thresholds, bonuses,
+# volume metric, thresholds, bonuses). Each bonus is picked by how many of its
+# (ascending) thresholds the metric exceeds; metrics are oriented so that
+# "exceeds" matches the original comparisons (see _confidence_metrics).
+CONFIDENCE_TABLE = {
+    'markup': ('rise', np.array([0.08, 0.15]), (0.1, 0.2, 0.3),
+               'volume_ratio', np.array([1.0, 1.2]), (0.0, 0.05, 0.1)),
+    'markdown': ('drop', np.array([0.08, 0.15]), (0.1, 0.2, 0.3),
+                 'volume_ratio', np.array([]), (0.0,)),
+    'accumulation': ('flatness', np.array([-0.05, -0.02]), (0.0, 0.1, 0.2),
+                     'volume_trend', np.array([1.1]), (0.0, 0.1)),
+    'distribution': ('flatness', np.array([-0.05, -0.02]), (0.0, 0.1, 0.2),
+                     'volume_fade', np.array([-0.9]), (0.0, 0.1)),
+}
+
+
+def _confidence_metrics(price_change_pct: float, volume_ratio: float, volume_trend: float) -> Dict[str, float]:
+    """Signed metrics for CONFIDENCE_TABLE (x < -t is -x > t, abs(x) < t is -abs(x) > -t)"""
+    return {
+        'rise': price_change_pct,
+        'drop': -price_change_pct,
+        'flatness': -abs(price_change_pct),
+        'volume_ratio': volume_ratio,
+        'volume_trend': volume_trend,
+        'volume_fade': -volume_trend,
+    }
+
+
+@dataclass
+class WyckoffArrays:
+    """Columns of the date-sorted analysis frame as contiguous arrays, shared by the phase pipeline"""
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    date: np.ndarray  # datetime64[ns]
+    date_strs: List[str]  # 'YYYY-MM-DD' per row, formatted once for the phase dicts
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'WyckoffArrays':
+        date = df['date'].to_numpy(dtype='datetime64[ns]')
+        return cls(
+            open=df['open'].to_numpy(dtype=np.float64),
+            high=df['high'].to_numpy(dtype=np.float64),
+            low=df['low'].to_numpy(dtype=np.float64),
+            close=df['close'].to_numpy(dtype=np.float64),
+            volume=df['volume'].to_numpy(dtype=np.float64),
+            date=date,
+            date_strs=np.datetime_as_string(date, unit='D').tolist()
+        )
+    
+    def __len__(self) -> int:
+        return len(self.close)
+    
+    def timestamp(self, i: int) -> pd.Timestamp:
+        return pd.Timestamp(self.date[i])
+    
+    def date_str(self, i: int) -> str:
+        return self.date_strs[i]
+
+@dataclass
+class PhaseArray:
+    """
+    Phase periods as parallel arrays (one entry per period); dicts are only built at the
+    output boundary by to_dicts, which also rounds the float columns to DECIMALS places
+    (so columns can hold raw values). Dates are datetime64[D]; columns holds the remaining
+    output fields, in output order.
+    """
+    start_date: np.ndarray
+    end_date: np.ndarray
+    columns: Dict[str, np.ndarray]
+    phase: Optional[np.ndarray] = None  # per-period phase label, emitted first when set
+    
+    DECIMALS = 2
+    
+    # Fields of the window-phase dicts (see _analyze_window_for_phase), after the dates
+    WINDOW_FIELDS = (
+        'duration_days', 'price_change_pct', 'price_range_pct', 'volume_ratio',
+        'volume_trend', 'price_vs_sma', 'start_price', 'end_price'
+    )
+    
+    @classmethod
+    def from_rows(cls, dates: np.ndarray, start_idx: np.ndarray, end_idx: np.ndarray,
+                  columns: Dict[str, np.ndarray]) -> 'PhaseArray':
+        """Periods given as row positions (inclusive) into a datetime64 date column"""
+        return cls(
+            start_date=dates[start_idx].astype('datetime64[D]'),
+            end_date=dates[end_idx].astype('datetime64[D]'),
+            columns=columns
+        )
+    
+    @classmethod
+    def from_window_phases(cls, phases: List[Dict]) -> 'PhaseArray':
+        """Collect window-phase dicts into arrays"""
+        return cls(
+            start_date=np.array([p['start_date'] for p in phases], dtype='datetime64[D]'),
+            end_date=np.array([p['end_date'] for p in phases], dtype='datetime64[D]'),
+            columns={
+                field: np.array([p[field] for p in phases], dtype=np.int64 if field == 'duration_days' else np.float64)
+                for field in cls.WINDOW_FIELDS
+            },
+            phase=np.array([p['phase'] for p in phases], dtype=object)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.start_date)
+    
+    def to_dicts(self) -> List[Dict]:
+        start_dates = np.datetime_as_string(self.start_date, unit='D').tolist()
+        end_dates = np.datetime_as_string(self.end_date, unit='D').tolist()
+        columns = {
+            field: (values.round(self.DECIMALS) if values.dtype.kind == 'f' else values).tolist()
+            for field, values in self.columns.items()
+        }
+        
+        periods = []
+        for k in range(len(self)):
+            period = {} if self.phase is None else {'phase': self.phase[k]}
+            period['start_date'] = start_dates[k]
+            period['end_date'] = end_dates[k]
+            for field, values in columns.items():
+                period[field] = values[k]
+            periods.append(period)
+        return periods
+
+
+def _analyze_symbol(symbol: str, df: pd.DataFrame) -> Dict:
+    """Worker for batch_analyze: Wyckoff analysis of one symbol"""
+    return WyckoffAnalysisService().analyze_wyckoff_phases(df, symbol)
+
+
 class WyckoffAnalysisService:
     """
     Wyckoff Method Analysis Service
@@ -26,9 +460,21 @@ class WyckoffAnalysisService:
     - Trend identification and market structure
     """
     
+    # Indicator frames of recently analyzed data, shared by all instances (routes create
+    # a service per request); least recently used entries are evicted past this size
+    INDICATOR_CACHE_SIZE = 64
+    _indicator_cache: OrderedDict = OrderedDict()
+    _indicator_cache_lock = threading.Lock()
+    
+    # Results that depend only on the indicator frame (volume analysis, support/resistance,
+    # score), under the same data keys; the cached dicts are shared, so treat them as read-only
+    RESULT_CACHE_SIZE = 192  # three results per data set
+    _result_cache: OrderedDict = OrderedDict()
+    _result_cache_lock = threading.Lock()
+    
     def __init__(self):
         # Volume analysis thresholds (based on Wyckoff principles)
-        self.volume_threshold_multiplier = 2.0  # Volume must be 2x average for significance
+        self.volume_threshold_multiplier = VOLUME_THRESHOLD_MULTIPLIER
         self.price_change_threshold = 0.03  # 3% price change threshold for phase transitions
         
         # Wyckoff phase identification parameters
@@ -38,8 +484,8 @@ class WyckoffAnalysisService:
         self.markdown_volume_threshold = 1.3  # Volume threshold for markdown
         
         # Support/Resistance and Spring detection
-        self.spring_threshold = 0.05  # 5% below support for spring detection
-        self.upthrust_threshold = 0.05  # 5% above resistance for upthrust detection
+        self.spring_threshold = SPRING_THRESHOLD
+        self.upthrust_threshold = UPTHRUST_THRESHOLD
         
     def analyze_wyckoff_phases(self, df: pd.DataFrame, symbol: str) -> Dict:
         """
@@ -61,24 +507,35 @@ class WyckoffAnalysisService:
                     'analysis_date': datetime.now().isoformat()
                 }
             
-            # Ensure data is sorted by date
-            df = df.sort_values('date').reset_index(drop=True)
+            # Ensure data is sorted by date (callers usually pass it sorted already);
+            # the rest of the analysis relies on this order
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date')
+            df = df.reset_index(drop=True)
             
             # Calculate technical indicators needed for Wyckoff analysis
-            df = self._calculate_wyckoff_indicators(df)
+            data_key = self._data_key(df, symbol)
+            df = self._get_wyckoff_indicators(df, data_key)
+            arrays = WyckoffArrays.from_dataframe(df)
+            
+            # Trading ranges feed both the phase detection and the price targets
+            trading_ranges = self._identify_trading_ranges(arrays)
             
             # Analyze Wyckoff phases using authentic methodology
-            phases = self._identify_wyckoff_phases(df)
+            phases = self._identify_wyckoff_phases(arrays, trading_ranges)
             
             # Calculate price targets using Point-and-Figure methodology
-            trading_ranges = self._identify_trading_ranges(df)
-            price_targets = self.calculate_wyckoff_price_targets(df, trading_ranges)
+            price_targets = self.calculate_wyckoff_price_targets(arrays, trading_ranges)
             
             # Volume-Price Analysis
-            volume_analysis = self._analyze_volume_price_relationships(df)
+            volume_analysis = self._get_cached_result(
+                data_key, 'volume_analysis', lambda: self._analyze_volume_price_relationships(df)
+            )
             
             # Support and Resistance levels
-            support_resistance = self._identify_support_resistance(df)
+            support_resistance = self._get_cached_result(
+                data_key, 'support_resistance', lambda: self._identify_support_resistance(df)
+            )
             
             # Current phase assessment
             current_phase = self._assess_current_phase(df, phases)
@@ -87,7 +544,9 @@ class WyckoffAnalysisService:
             signals = self._generate_wyckoff_signals(df, current_phase)
             
             # Calculate Wyckoff score
-            wyckoff_score = self._calculate_wyckoff_score(df, phases, volume_analysis)
+            wyckoff_score = self._get_cached_result(
+                data_key, 'wyckoff_score', lambda: self._calculate_wyckoff_score(df, phases, volume_analysis)
+            )
             
             return {
                 'symbol': symbol,
@@ -126,43 +585,126 @@ class WyckoffAnalysisService:
                 'analysis_date': datetime.now().isoformat()
             }
     
+    def batch_analyze(self, symbol_dfs: Dict[str, pd.DataFrame], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Analyze many symbols across worker processes; returns the analyses in the order of
+        symbol_dfs, ready for generate_wyckoff_report. The indicator and result caches are
+        per process, so the workers neither use nor fill this process's caches.
+        """
+        if not symbol_dfs:
+            return []
+        
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_analyze_symbol, symbol_dfs.keys(), symbol_dfs.values()))
+    
+    def _data_key(self, df: pd.DataFrame, symbol: str) -> Tuple:
+        """Cache key identifying the sorted input data: symbol, length, first/last dates and last bar"""
+        return (
+            symbol, len(df), df['date'].iloc[0], df['date'].iloc[-1],
+            float(df['close'].iloc[-1]), float(df['volume'].iloc[-1])
+        )
+    
+    def _get_wyckoff_indicators(self, df: pd.DataFrame, key: Tuple) -> pd.DataFrame:
+        """Indicators for the sorted df, reused when the same data was analyzed recently"""
+        with self._indicator_cache_lock:
+            cached = self._indicator_cache.get(key)
+            if cached is not None:
+                self._indicator_cache.move_to_end(key)
+                return cached
+        
+        df = self._calculate_wyckoff_indicators(df)
+        
+        with self._indicator_cache_lock:
+            self._indicator_cache[key] = df
+            while len(self._indicator_cache) > self.INDICATOR_CACHE_SIZE:
+                self._indicator_cache.popitem(last=False)
+        return df
+    
+    def _get_cached_result(self, key: Tuple, name: str, compute):
+        """Result `name` for the data identified by key, computed on a miss (LRU like the indicator cache)"""
+        key = key + (name,)
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+                return cached
+        
+        result = compute()
+        
+        with self._result_cache_lock:
+            self._result_cache[key] = result
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+    
     def _calculate_wyckoff_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate indicators needed for Wyckoff analysis"""
         
-        # Convert to float to avoid decimal issues
+        # Convert to float to avoid decimal issues; columns that are float64 already are left as is
         for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].astype(float)
-        
-        # Price change and percentage change
-        df['price_change'] = df['close'].pct_change()
-        df['price_change_abs'] = df['price_change'].abs()
+            if df[col].dtype != np.float64:
+                df[col] = df[col].to_numpy(dtype=np.float64)
+        
+        # Price change and percentage change (close.pct_change() and its absolute value)
+        close = df['close'].to_numpy()
+        price_change = np.empty_like(close)
+        price_change[:1] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(close[1:], close[:-1], out=price_change[1:])
+        price_change[1:] -= 1
+        df['price_change'] = price_change
+        df['price_change_abs'] = np.abs(price_change)
+        
+        if NUMBA_AVAILABLE and len(df) >= 50:
+            # One fused pass for every rolling/EWM indicator
+            (volume_sma_20, close_sma_20, close_std_20, sma_50,
+             ema_12, ema_26, atr_14) = _wyckoff_indicator_pass(
+                df['high'].to_numpy(dtype=np.float64),
+                df['low'].to_numpy(dtype=np.float64),
+                df['close'].to_numpy(dtype=np.float64),
+                df['volume'].to_numpy(dtype=np.float64)
+            )
+            close_sma_20 = pd.Series(close_sma_20, index=df.index)
+            close_std_20 = pd.Series(close_std_20, index=df.index)
+        else:
+            volume_sma_20 = self._rolling_mean_std(df['volume'], 20)[0]
+            close_sma_20, close_std_20 = self._rolling_mean_std(df['close'], 20)
+            sma_50 = self._rolling_mean_std(df['close'], 50)[0]
+            ema_12 = self._calculate_ema(df['close'], 12)
+            ema_26 = self._calculate_ema(df['close'], 26)
+            atr_14 = self._calculate_atr(df, 14)
         
         # Volume indicators
-        df['volume_sma_20'] = df['volume'].rolling(window=20).mean()
+        df['volume_sma_20'] = volume_sma_20
         df['volume_ratio'] = df['volume'] / df['volume_sma_20']
         df['high_volume'] = df['volume_ratio'] > self.volume_threshold_multiplier
         
         # Moving averages for trend identification
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
+        df['sma_20'] = close_sma_20
+        df['sma_50'] = sma_50
+        df['ema_12'] = ema_12
+        df['ema_26'] = ema_26
         
         # Price relative to moving averages
         df['price_vs_sma20'] = (df['close'] / df['sma_20'] - 1) * 100
         df['price_vs_sma50'] = (df['close'] / df['sma_50'] - 1) * 100
         
         # Volatility indicators
-        df['atr_14'] = self._calculate_atr(df, 14)
-        df['volatility'] = df['close'].rolling(window=20).std() / df['close'].rolling(window=20).mean()
+        df['atr_14'] = atr_14
+        df['volatility'] = close_std_20 / close_sma_20
         
         # Range analysis (High-Low range)
         df['daily_range'] = (df['high'] - df['low']) / df['close']
         df['close_position'] = (df['close'] - df['low']) / (df['high'] - df['low'])
         
+        # Columns nothing in the analysis reads are kept in float32 (halves their share of
+        # the cached frames); every column that feeds a threshold or an output stays float64
+        for col in REFERENCE_COLUMNS:
+            df[col] = df[col].to_numpy(dtype=np.float32)
+        
         return df
     
-    def _identify_trading_ranges(self, df: pd.DataFrame) -> List[Dict]:
+    def _identify_trading_ranges(self, arrays: WyckoffArrays) -> List[Dict]:
         """
         Identify trading ranges (consolidation periods) in the data
         
@@ -173,71 +715,83 @@ class WyckoffAnalysisService:
         
         # Look for periods of low volatility and sideways movement
         window_size = 30  # Minimum 30 days for a trading range
-        
-        for i in range(window_size, len(df) - window_size):
-            window_data = df.iloc[i-window_size:i+window_size]
+        span = 2 * window_size
+        n_windows = len(arrays) - span
+        if n_windows <= 0:
+            return trading_ranges
+        
+        # Statistics of the window around every candidate center i (rows i-30 .. i+29) at once;
+        # window j is centered on i = j + window_size
+        high, low = arrays.high, arrays.low
+        if NUMBA_AVAILABLE:
+            # O(N) running reductions; the window starting at j ends at row j + span - 1
+            support, resistance = _rolling_min_max(low, high, span)
+            mean_close, std_close = _rolling_mean_std(arrays.close, span)
+            tail = slice(span - 1, span - 1 + n_windows)
+            support, resistance = support[tail], resistance[tail]
+            mean_close, std_close = mean_close[tail], std_close[tail]
+        else:
+            win_close = sliding_window_view(arrays.close, span)[:n_windows]
+            resistance = sliding_window_view(high, span)[:n_windows].max(axis=1)
+            support = sliding_window_view(low, span)[:n_windows].min(axis=1)
+            mean_close = win_close.mean(axis=1)
+            std_close = win_close.std(axis=1, ddof=1)
+        
+        price_range = (resistance - support) / mean_close
+        volatility = std_close / mean_close
+        
+        for j in np.flatnonzero(self._is_trading_range(price_range, volatility)):
+            # Find the full extent of this trading range
+            start_idx, end_idx = self._find_trading_range_bounds(low, high, int(j) + window_size)
             
-            # Check if this is a trading range
-            if self._is_trading_range(window_data):
-                # Find the full extent of this trading range
-                start_idx, end_idx = self._find_trading_range_bounds(df, i)
-                
-                if end_idx - start_idx >= window_size:
-                    trading_ranges.append({
-                        'start_idx': start_idx,
-                        'end_idx': end_idx,
-                        'start_date': df.iloc[start_idx]['date'],
-                        'end_date': df.iloc[end_idx]['date'],
-                        'support': window_data['low'].min(),
-                        'resistance': window_data['high'].max()
-                    })
+            if end_idx - start_idx >= window_size:
+                trading_ranges.append({
+                    'start_idx': start_idx,
+                    'end_idx': end_idx,
+                    'start_date': arrays.timestamp(start_idx),
+                    'end_date': arrays.timestamp(end_idx),
+                    'support': support[j],
+                    'resistance': resistance[j]
+                })
         
         return trading_ranges
     
-    def _is_trading_range(self, window_data: pd.DataFrame) -> bool:
-        """Determine if a time window represents a trading range"""
-        
-        # Calculate volatility and price range
-        price_range = (window_data['high'].max() - window_data['low'].min()) / window_data['close'].mean()
-        volatility = window_data['close'].std() / window_data['close'].mean()
+    def _is_trading_range(self, price_range: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+        """Determine which windows represent a trading range, from each window's price range and volatility"""
         
         # Trading range criteria:
         # 1. Low volatility (price not trending strongly)
         # 2. Price oscillating between support and resistance
         # 3. Volume patterns consistent with consolidation
         
-        is_low_volatility = volatility < 0.15  # Less than 15% volatility
-        is_sideways = price_range < 0.25  # Less than 25% total range
+        is_low_volatility = volatility < TRADING_RANGE_MAX_VOLATILITY  # Less than 15% volatility
+        is_sideways = price_range < TRADING_RANGE_MAX_RANGE  # Less than 25% total range
         
-        return is_low_volatility and is_sideways
+        return is_low_volatility & is_sideways
     
-    def _find_trading_range_bounds(self, df: pd.DataFrame, center_idx: int) -> Tuple[int, int]:
+    def _find_trading_range_bounds(self, low: np.ndarray, high: np.ndarray, center_idx: int) -> Tuple[int, int]:
         """Find the start and end bounds of a trading range"""
         
         # Find support and resistance levels
-        window_data = df.iloc[center_idx-15:center_idx+15]
-        support = window_data['low'].min()
-        resistance = window_data['high'].max()
-        
-        # Expand backwards to find start
-        start_idx = center_idx
-        for i in range(center_idx - 1, -1, -1):
-            if df.iloc[i]['low'] < support * 0.95 or df.iloc[i]['high'] > resistance * 1.05:
-                start_idx = i + 1
-                break
-        
-        # Expand forwards to find end
-        end_idx = center_idx
-        for i in range(center_idx + 1, len(df)):
-            if df.iloc[i]['low'] < support * 0.95 or df.iloc[i]['high'] > resistance * 1.05:
-                end_idx = i - 1
-                break
+        support = low[center_idx-15:center_idx+15].min()
+        resistance = high[center_idx-15:center_idx+15].max()
+        
+        # Bars that break out of the range on either side
+        breach = (low < support * 0.95) | (high > resistance * 1.05)
+        
+        # Expand backwards to find start: just after the last breach before the center
+        before = np.flatnonzero(breach[:center_idx])
+        start_idx = int(before[-1]) + 1 if len(before) else center_idx
+        
+        # Expand forwards to find end: just before the first breach after the center
+        after = np.flatnonzero(breach[center_idx + 1:])
+        end_idx = center_idx + int(after[0]) if len(after) else center_idx
         
         return start_idx, end_idx
     
-    def _analyze_trading_range_phases(self, tr_data: pd.DataFrame, tr_info: Dict) -> List[Dict]:
+    def _analyze_trading_range_phases(self, arrays: WyckoffArrays, start: int, end: int, tr_info: Dict) -> List[Dict]:
         """
-        Analyze a trading range for Wyckoff A-E phases
+        Analyze a trading range (rows start..end-1) for Wyckoff A-E phases
         
         Based on the official Wyckoff Method phases:
         - Phase A: Preliminary Support (PS) and Selling Climax (SC)
@@ -249,29 +803,32 @@ class WyckoffAnalysisService:
         phases = []
         
         # Determine if this is accumulation or distribution
-        tr_type = self._determine_trading_range_type(tr_data)
+        tr_type = self._determine_trading_range_type(arrays, start, end)
         
         if tr_type == 'accumulation':
-            phases = self._identify_accumulation_phases(tr_data, tr_info)
+            phases = self._identify_accumulation_phases(arrays, start, end, tr_info)
         elif tr_type == 'distribution':
-            phases = self._identify_distribution_phases(tr_data, tr_info)
+            phases = self._identify_distribution_phases(arrays, start, end, tr_info)
         
         return phases
     
-    def _determine_trading_range_type(self, tr_data: pd.DataFrame) -> str:
+    def _determine_trading_range_type(self, arrays: WyckoffArrays, start: int, end: int) -> str:
         """Determine if a trading range is accumulation or distribution"""
+        volume = arrays.volume[start:end]
+        close = arrays.close[start:end]
+        open_ = arrays.open[start:end]
         
-        # Analyze volume and price patterns
-        avg_volume = tr_data['volume'].mean()
-        high_volume_days = tr_data[tr_data['volume'] > avg_volume * 1.5]
+        # Analyze volume and price patterns (NaN volumes skipped, as in pandas' mean)
+        avg_volume = np.nanmean(volume)
+        high_volume_days = volume > avg_volume * 1.5
         
         # Look for volume patterns
-        if len(high_volume_days) > 0:
+        if high_volume_days.any():
             # Check if high volume occurs on down days (accumulation) or up days (distribution)
-            down_volume = high_volume_days[high_volume_days['close'] < high_volume_days['open']]
-            up_volume = high_volume_days[high_volume_days['close'] > high_volume_days['open']]
+            down_volume = np.count_nonzero(high_volume_days & (close < open_))
+            up_volume = np.count_nonzero(high_volume_days & (close > open_))
             
-            if len(down_volume) > len(up_volume):
+            if down_volume > up_volume:
                 return 'accumulation'  # High volume on down days suggests accumulation
             else:
                 return 'distribution'  # High volume on up days suggests distribution
@@ -279,53 +836,52 @@ class WyckoffAnalysisService:
         # Default to accumulation if unclear
         return 'accumulation'
     
-    def _identify_accumulation_phases(self, tr_data: pd.DataFrame, tr_info: Dict) -> List[Dict]:
+    def _identify_accumulation_phases(self, arrays: WyckoffArrays, start: int, end: int, tr_info: Dict) -> List[Dict]:
         """Identify Wyckoff accumulation phases (A-E)"""
         phases = []
         
         # Phase A: Preliminary Support and Selling Climax
-        phase_a = self._identify_phase_a_accumulation(tr_data)
+        phase_a = self._identify_phase_a_accumulation(arrays, start, end)
         if phase_a:
             phases.append(phase_a)
         
         # Phase B: Building the Cause
-        phase_b = self._identify_phase_b_accumulation(tr_data)
+        phase_b = self._identify_phase_b_accumulation(arrays, start, end)
         if phase_b:
             phases.append(phase_b)
         
         # Phase C: The Test (Spring)
-        phase_c = self._identify_phase_c_accumulation(tr_data)
+        phase_c = self._identify_phase_c_accumulation(arrays, start, end)
         if phase_c:
             phases.append(phase_c)
         
         # Phase D: Markup
-        phase_d = self._identify_phase_d_accumulation(tr_data)
+        phase_d = self._identify_phase_d_accumulation(arrays, start, end)
         if phase_d:
             phases.append(phase_d)
         
         return phases
     
-    def _identify_phase_a_accumulation(self, tr_data: pd.DataFrame) -> Dict:
+    def _identify_phase_a_accumulation(self, arrays: WyckoffArrays, start: int, end: int) -> Dict:
         """Identify Phase A of accumulation: Preliminary Support and Selling Climax"""
+        volume = arrays.volume[start:end]
         
         # Look for selling climax - high volume with sharp price decline
-        high_volume_threshold = tr_data['volume'].quantile(0.8)
-        potential_sc = tr_data[
-            (tr_data['volume'] > high_volume_threshold) & 
-            (tr_data['close'] < tr_data['open'])
-        ]
-        
-        if len(potential_sc) > 0:
-            # Get the first row from the filtered DataFrame
-            first_sc = potential_sc.iloc[0]
-            sc_idx = potential_sc.index[0] - tr_data.index[0]  # Convert to relative index
+        # (NaN volumes are skipped, as in pandas' quantile)
+        high_volume_threshold = np.nanquantile(volume, 0.8)
+        potential_sc = volume > high_volume_threshold
+        potential_sc &= arrays.close[start:end] < arrays.open[start:end]
+        
+        # First selling climax candidate, without materializing the index list
+        sc_idx = int(np.argmax(potential_sc))  # Relative to the start of the range
+        if potential_sc[sc_idx]:
             
             return {
                 'phase': 'Phase A - Selling Climax',
-                'start_date': tr_data.iloc[0]['date'].strftime('%Y-%m-%d'),
-                'end_date': first_sc['date'].strftime('%Y-%m-%d'),
-                'start_price': tr_data.iloc[0]['close'],
-                'end_price': first_sc['close'],
+                'start_date': arrays.date_str(start),
+                'end_date': arrays.date_str(start + sc_idx),
+                'start_price': arrays.close[start],
+                'end_price': arrays.close[start + sc_idx],
                 'duration_days': sc_idx + 1,
                 'wyckoff_phase': 'A',
                 'description': 'Preliminary Support and Selling Climax'
@@ -333,40 +889,42 @@ class WyckoffAnalysisService:
         
         return None
     
-    def _identify_phase_b_accumulation(self, tr_data: pd.DataFrame) -> Dict:
+    def _identify_phase_b_accumulation(self, arrays: WyckoffArrays, start: int, end: int) -> Dict:
         """Identify Phase B of accumulation: Building the Cause"""
         
         # Phase B typically shows decreasing volume and sideways movement
-        mid_point = len(tr_data) // 2
+        mid_point = (end - start) // 2
         
         return {
             'phase': 'Phase B - Building Cause',
-            'start_date': tr_data.iloc[0]['date'].strftime('%Y-%m-%d'),
-            'end_date': tr_data.iloc[mid_point]['date'].strftime('%Y-%m-%d'),
-            'start_price': tr_data.iloc[0]['close'],
-            'end_price': tr_data.iloc[mid_point]['close'],
+            'start_date': arrays.date_str(start),
+            'end_date': arrays.date_str(start + mid_point),
+            'start_price': arrays.close[start],
+            'end_price': arrays.close[start + mid_point],
             'duration_days': mid_point,
             'wyckoff_phase': 'B',
             'description': 'Building the Cause - Accumulation'
         }
     
-    def _identify_phase_c_accumulation(self, tr_data: pd.DataFrame) -> Dict:
+    def _identify_phase_c_accumulation(self, arrays: WyckoffArrays, start: int, end: int) -> Dict:
         """Identify Phase C of accumulation: The Test (Spring)"""
+        low = arrays.low[start:end]
         
         # Look for spring - price breaks below support then recovers
-        support_level = tr_data['low'].min()
+        support_level = low.min()
         spring_threshold = support_level * (1 - self.spring_threshold)
         
-        spring_candidates = tr_data[tr_data['low'] <= spring_threshold]
+        spring_candidates = np.flatnonzero(low <= spring_threshold)
         
         if len(spring_candidates) > 0:
-            spring_idx = spring_candidates.index[0]
+            spring_idx = start + int(spring_candidates[0])
+            test_end_idx = min(spring_idx + 5, end - 1)
             return {
                 'phase': 'Phase C - Spring Test',
-                'start_date': tr_data.iloc[spring_idx]['date'].strftime('%Y-%m-%d'),
-                'end_date': tr_data.iloc[spring_idx + 5]['date'].strftime('%Y-%m-%d') if spring_idx + 5 < len(tr_data) else tr_data.iloc[-1]['date'].strftime('%Y-%m-%d'),
-                'start_price': tr_data.iloc[spring_idx]['close'],
-                'end_price': tr_data.iloc[min(spring_idx + 5, len(tr_data) - 1)]['close'],
+                'start_date': arrays.date_str(spring_idx),
+                'end_date': arrays.date_str(test_end_idx),
+                'start_price': arrays.close[spring_idx],
+                'end_price': arrays.close[test_end_idx],
                 'duration_days': 5,
                 'wyckoff_phase': 'C',
                 'description': 'The Test - Spring below support'
@@ -374,31 +932,31 @@ class WyckoffAnalysisService:
         
         return None
     
-    def _identify_phase_d_accumulation(self, tr_data: pd.DataFrame) -> Dict:
+    def _identify_phase_d_accumulation(self, arrays: WyckoffArrays, start: int, end: int) -> Dict:
         """Identify Phase D of accumulation: Markup"""
         
         # Phase D shows increasing volume and price breaking above resistance
-        resistance_level = tr_data['high'].max()
+        resistance_level = arrays.high[start:end].max()
         
         # Look for breakout above resistance
-        breakout_candidates = tr_data[tr_data['close'] > resistance_level * 1.02]
+        breakout_candidates = np.flatnonzero(arrays.close[start:end] > resistance_level * 1.02)
         
         if len(breakout_candidates) > 0:
-            breakout_idx = breakout_candidates.index[0]
+            breakout_idx = start + int(breakout_candidates[0])
             return {
                 'phase': 'Phase D - Markup',
-                'start_date': tr_data.iloc[breakout_idx]['date'].strftime('%Y-%m-%d'),
-                'end_date': tr_data.iloc[-1]['date'].strftime('%Y-%m-%d'),
-                'start_price': tr_data.iloc[breakout_idx]['close'],
-                'end_price': tr_data.iloc[-1]['close'],
-                'duration_days': len(tr_data) - breakout_idx,
+                'start_date': arrays.date_str(breakout_idx),
+                'end_date': arrays.date_str(end - 1),
+                'start_price': arrays.close[breakout_idx],
+                'end_price': arrays.close[end - 1],
+                'duration_days': end - breakout_idx,
                 'wyckoff_phase': 'D',
                 'description': 'Markup - Breakout above resistance'
             }
         
         return None
     
-    def _identify_distribution_phases(self, tr_data: pd.DataFrame, tr_info: Dict) -> List[Dict]:
+    def _identify_distribution_phases(self, arrays: WyckoffArrays, start: int, end: int, tr_info: Dict) -> List[Dict]:
         """Identify Wyckoff distribution phases (A-E)"""
         phases = []
         
@@ -410,7 +968,7 @@ class WyckoffAnalysisService:
         
         return phases
     
-    def _identify_trend_phases(self, df: pd.DataFrame, trading_ranges: List[Dict]) -> List[Dict]:
+    def _identify_trend_phases(self, arrays: WyckoffArrays, trading_ranges: List[Dict]) -> List[Dict]:
         """Identify trend phases between trading ranges"""
         trend_phases = []
         
@@ -420,27 +978,26 @@ class WyckoffAnalysisService:
             end_idx = trading_ranges[i + 1]['start_idx'] - 1
             
             if end_idx > start_idx:
-                trend_data = df.iloc[start_idx:end_idx+1]
-                trend_type = self._determine_trend_type(trend_data)
+                trend_type = self._determine_trend_type(arrays, start_idx, end_idx)
                 
                 if trend_type:
                     trend_phases.append({
                         'phase': f'{trend_type} Trend',
-                        'start_date': trend_data.iloc[0]['date'].strftime('%Y-%m-%d'),
-                        'end_date': trend_data.iloc[-1]['date'].strftime('%Y-%m-%d'),
-                        'start_price': trend_data.iloc[0]['close'],
-                        'end_price': trend_data.iloc[-1]['close'],
-                        'duration_days': len(trend_data),
+                        'start_date': arrays.date_str(start_idx),
+                        'end_date': arrays.date_str(end_idx),
+                        'start_price': arrays.close[start_idx],
+                        'end_price': arrays.close[end_idx],
+                        'duration_days': end_idx - start_idx + 1,
                         'wyckoff_phase': 'Trend',
                         'description': f'{trend_type} trend between trading ranges'
                     })
         
         return trend_phases
     
-    def _determine_trend_type(self, trend_data: pd.DataFrame) -> str:
-        """Determine if a trend is markup or markdown"""
+    def _determine_trend_type(self, arrays: WyckoffArrays, start_idx: int, end_idx: int) -> str:
+        """Determine if the trend over rows start_idx..end_idx is markup or markdown"""
         
-        price_change = (trend_data.iloc[-1]['close'] - trend_data.iloc[0]['close']) / trend_data.iloc[0]['close']
+        price_change = (arrays.close[end_idx] - arrays.close[start_idx]) / arrays.close[start_idx]
         
         if price_change > 0.05:  # 5% or more increase
             return 'Markup'
@@ -449,7 +1006,7 @@ class WyckoffAnalysisService:
         
         return None
     
-    def calculate_wyckoff_price_targets(self, df: pd.DataFrame, trading_ranges: List[Dict]) -> Dict:
+    def calculate_wyckoff_price_targets(self, arrays: WyckoffArrays, trading_ranges: List[Dict]) -> Dict:
         """
         Calculate Wyckoff price targets using Point-and-Figure methodology
         
@@ -460,10 +1017,8 @@ class WyckoffAnalysisService:
         price_targets = {}
         
         for tr in trading_ranges:
-            tr_data = df.iloc[tr['start_idx']:tr['end_idx']+1]
-            
             # Calculate horizontal count (Cause)
-            horizontal_count = self._calculate_horizontal_count(tr_data)
+            horizontal_count = self._calculate_horizontal_count(arrays, tr['start_idx'], tr['end_idx'] + 1)
             
             if horizontal_count > 0:
                 # Calculate price targets (Effect)
@@ -479,10 +1034,12 @@ class WyckoffAnalysisService:
                 # Aggressive target (maximum)
                 aggressive_target = support_level + (horizontal_count * 0.03)  # 3% per count unit
                 
-                price_targets[f"{tr['start_date'].strftime('%Y-%m-%d')}_to_{tr['end_date'].strftime('%Y-%m-%d')}"] = {
+                start_date = arrays.date_str(tr['start_idx'])
+                end_date = arrays.date_str(tr['end_idx'])
+                price_targets[f"{start_date}_to_{end_date}"] = {
                     'trading_range': {
-                        'start_date': tr['start_date'].strftime('%Y-%m-%d'),
-                        'end_date': tr['end_date'].strftime('%Y-%m-%d'),
+                        'start_date': start_date,
+                        'end_date': end_date,
                         'support': support_level,
                         'resistance': resistance_level,
                         'duration_days': tr['end_idx'] - tr['start_idx']
@@ -498,7 +1055,7 @@ class WyckoffAnalysisService:
         
         return price_targets
     
-    def _calculate_horizontal_count(self, tr_data: pd.DataFrame) -> int:
+    def _calculate_horizontal_count(self, arrays: WyckoffArrays, start: int, end: int) -> int:
         """
         Calculate horizontal count for Point-and-Figure price targets
         
@@ -508,37 +1065,54 @@ class WyckoffAnalysisService:
         # In a full implementation, this would use actual P&F charting
         
         # Count the number of significant price swings within the trading range
-        support = tr_data['low'].min()
-        resistance = tr_data['high'].max()
+        support = arrays.low[start:end].min()
+        resistance = arrays.high[start:end].max()
         range_size = resistance - support
+        close = arrays.close[start:end]
         
-        # Count significant price movements (swings)
-        swing_count = 0
-        current_trend = None
-        
-        for i in range(1, len(tr_data)):
-            price_change = tr_data.iloc[i]['close'] - tr_data.iloc[i-1]['close']
-            
-            if abs(price_change) > range_size * 0.05:  # 5% of range size
-                if price_change > 0 and current_trend != 'up':
-                    swing_count += 1
-                    current_trend = 'up'
-                elif price_change < 0 and current_trend != 'down':
-                    swing_count += 1
-                    current_trend = 'down'
+        # Count significant price movements (swings): every significant move
+        # (more than 5% of range size) whose direction differs from the last one
+        price_change = np.diff(close)
+        significant = price_change[np.abs(price_change) > range_size * 0.05]
+        # Significant moves are never zero, so the direction is one bit (up or not);
+        # a swing starts wherever that bit flips
+        is_up = significant > 0
+        swing_count = min(len(is_up), 1) + int(np.count_nonzero(is_up[1:] ^ is_up[:-1]))
         
         return max(swing_count, 1)  # Minimum count of 1
     
+    def _rolling_mean_std(self, values: pd.Series, window: int) -> Tuple[pd.Series, pd.Series]:
+        """Rolling mean and std over `window` bars (same values as values.rolling(window).mean()/.std())"""
+        if NUMBA_AVAILABLE and len(values) >= 50:
+            mean, std = _rolling_mean_std(values.to_numpy(dtype=np.float64), window)
+            return pd.Series(mean, index=values.index), pd.Series(std, index=values.index)
+        rolling = values.rolling(window=window)
+        return rolling.mean(), rolling.std()
+    
+    def _calculate_ema(self, close: pd.Series, span: int) -> pd.Series:
+        """Calculate Exponential Moving Average (same values as close.ewm(span=span).mean())"""
+        if NUMBA_AVAILABLE:
+            return pd.Series(_ewm_mean(close.to_numpy(dtype=np.float64), span), index=close.index)
+        return close.ewm(span=span).mean()
+    
     def _calculate_atr(self, df: pd.DataFrame, period: int) -> pd.Series:
         """Calculate Average True Range"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        
-        true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        return true_range.rolling(window=period).mean()
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close_prev = np.empty_like(high)
+        close_prev[:1] = np.nan
+        close_prev[1:] = df['close'].to_numpy(dtype=np.float64)[:-1]
+        
+        # True range = max(high - low, |high - prev close|, |low - prev close|), built in place;
+        # NaN on the first bar, where there is no previous close
+        true_range = high - low
+        gap = np.subtract(high, close_prev)
+        np.maximum(true_range, np.abs(gap, out=gap), out=true_range)
+        np.subtract(low, close_prev, out=gap)
+        np.maximum(true_range, np.abs(gap, out=gap), out=true_range)
+        return self._rolling_mean_std(pd.Series(true_range, index=df.index), period)[0]
     
-    def _identify_wyckoff_phases(self, df: pd.DataFrame) -> Dict:
+    def _identify_wyckoff_phases(self, arrays: WyckoffArrays, trading_ranges: List[Dict]) -> Dict:
         """
         Identify Wyckoff phases using authentic A-E phase methodology
         
@@ -553,33 +1127,18 @@ class WyckoffAnalysisService:
         }
         
         # Use the new authentic Wyckoff phase detection
-        all_phases = self._detect_phases_chronologically(df)
+        all_phases = self._detect_phases_chronologically(arrays, trading_ranges)
         
         # Categorize phases based on authentic Wyckoff terminology
         for phase_data in all_phases:
-            phase_name = phase_data.get('phase', '')
-            wyckoff_phase = phase_data.get('wyckoff_phase', '')
-            
-            # Map to our phase categories
-            if 'Phase A' in phase_name or 'Phase B' in phase_name or 'Phase C' in phase_name:
-                if 'Selling Climax' in phase_name or 'Building Cause' in phase_name or 'Spring' in phase_name:
-                    phases['accumulation'].append(phase_data)
-                else:
-                    phases['distribution'].append(phase_data)
-            elif 'Phase D' in phase_name or 'Markup' in phase_name:
-                phases['markup'].append(phase_data)
-            elif 'Markdown' in phase_name:
-                phases['markdown'].append(phase_data)
-            elif 'Trend' in phase_name:
-                if 'Markup' in phase_name:
-                    phases['markup'].append(phase_data)
-                elif 'Markdown' in phase_name:
-                    phases['markdown'].append(phase_data)
+            category = PHASE_CATEGORIES.get(phase_data.get('phase', ''))
+            if category:
+                phases[category].append(phase_data)
             # Note: No "transitional" phases in authentic Wyckoff Method
         
         return phases
     
-    def _detect_phases_chronologically(self, df: pd.DataFrame) -> List[Dict]:
+    def _detect_phases_chronologically(self, arrays: WyckoffArrays, trading_ranges: List[Dict]) -> List[Dict]:
         """
         Detect Wyckoff phases using authentic methodology
         
@@ -590,20 +1149,15 @@ class WyckoffAnalysisService:
         """
         phases = []
         
-        # Ensure data is sorted chronologically (oldest first)
-        df = df.sort_values('date').reset_index(drop=True)
-        
-        # Step 1: Identify trading ranges
-        trading_ranges = self._identify_trading_ranges(df)
+        # Step 1: trading ranges are identified once by the caller and passed in
         
         # Step 2: Analyze each trading range for Wyckoff phases
         for tr in trading_ranges:
-            tr_data = df.iloc[tr['start_idx']:tr['end_idx']+1]
-            wyckoff_phases = self._analyze_trading_range_phases(tr_data, tr)
+            wyckoff_phases = self._analyze_trading_range_phases(arrays, tr['start_idx'], tr['end_idx'] + 1, tr)
             phases.extend(wyckoff_phases)
         
         # Step 3: Identify trend phases between trading ranges
-        trend_phases = self._identify_trend_phases(df, trading_ranges)
+        trend_phases = self._identify_trend_phases(arrays, trading_ranges)
         phases.extend(trend_phases)
         
         # Step 4: Sort phases by date
@@ -611,8 +1165,14 @@ class WyckoffAnalysisService:
         
         return phases
     
-    def _analyze_window_for_phase(self, window_data: pd.DataFrame, full_df: pd.DataFrame, current_idx: int) -> Dict:
-        """Analyze a time window to determine its Wyckoff phase"""
+    def _analyze_window_for_phase(self, window_data: pd.DataFrame, volume_sma_20: float) -> Dict:
+        """
+        Analyze a time window to determine its Wyckoff phase
+        
+        volume_sma_20 is the 20-day average volume at the window's position; callers scanning
+        many windows should index the precomputed 'volume_sma_20' indicator column rather than
+        recomputing the rolling mean per window.
+        """
         
         # Calculate key metrics
         start_price = window_data['close'].iloc[0]
@@ -626,7 +1186,6 @@ class WyckoffAnalysisService:
         
         # Volume analysis
         avg_volume = window_data['volume'].mean()
-        volume_sma_20 = full_df['volume'].rolling(window=20).mean().iloc[current_idx]
         volume_ratio = avg_volume / volume_sma_20 if volume_sma_20 > 0 else 1.0
         
         # Volume trend (comparing first half vs second half)
@@ -636,17 +1195,20 @@ class WyckoffAnalysisService:
         volume_trend = second_half_volume / first_half_volume if first_half_volume > 0 else 1.0
         
         # Moving average analysis
-        sma_20 = window_data['close'].rolling(window=min(20, len(window_data))).mean().iloc[-1]
+        sma_20 = window_data['close'].to_numpy()[-20:].mean()  # SMA over the last (up to) 20 bars
         price_vs_sma = (end_price - sma_20) / sma_20 if sma_20 > 0 else 0
         
         # Determine phase based on improved criteria
         phase = self._classify_phase(price_change_pct, price_range_pct, volume_ratio, volume_trend, price_vs_sma)
         
         if phase:
+            start_date, end_date = np.datetime_as_string(
+                window_data['date'].to_numpy(dtype='datetime64[D]')[[0, -1]], unit='D'
+            ).tolist()
             return {
                 'phase': phase,
-                'start_date': window_data['date'].iloc[0].strftime('%Y-%m-%d'),
-                'end_date': window_data['date'].iloc[-1].strftime('%Y-%m-%d'),
+                'start_date': start_date,
+                'end_date': end_date,
                 'duration_days': len(window_data),
                 'price_change_pct': round(price_change_pct * 100, 2),
                 'price_range_pct': round(price_range_pct * 100, 2),
@@ -662,43 +1224,46 @@ class WyckoffAnalysisService:
     def _classify_phase(self, price_change_pct: float, price_range_pct: float, 
                        volume_ratio: float, volume_trend: float, price_vs_sma: float) -> str:
         """Classify phase based on price and volume characteristics"""
-        
-        # Markup: Strong uptrend with volume confirmation
-        if (price_change_pct > 0.08 and  # >8% gain
-            price_vs_sma > 0.02 and      # Price above SMA
-            volume_ratio > 1.1):         # Above average volume
-            return 'markup'
-        
-        # Markdown: Strong downtrend
-        if (price_change_pct < -0.08 and  # >8% decline
-            price_vs_sma < -0.02):        # Price below SMA
-            return 'markdown'
-        
-        # Accumulation: Sideways movement with volume accumulation
-        if (abs(price_change_pct) < 0.05 and  # <5% net change
-            price_range_pct < 0.15 and        # <15% range
-            volume_ratio > 1.0 and            # Above average volume
-            volume_trend > 1.05):             # Volume increasing
-            return 'accumulation'
-        
-        # Distribution: Sideways movement with volume distribution
-        if (abs(price_change_pct) < 0.05 and  # <5% net change
-            price_range_pct < 0.15 and        # <15% range
-            volume_ratio > 1.0 and            # Above average volume
-            volume_trend < 0.95):             # Volume decreasing
-            return 'distribution'
-        
-        # Weak uptrend (could be early markup)
-        if (price_change_pct > 0.03 and   # >3% gain
-            price_vs_sma > 0.01):         # Price above SMA
-            return 'markup'
-        
-        # Weak downtrend (could be early markdown)
-        if (price_change_pct < -0.03 and  # >3% decline
-            price_vs_sma < -0.01):        # Price below SMA
-            return 'markdown'
-        
-        return None  # No clear phase
+        codes = self._classify_phases(
+            np.array([price_change_pct], dtype=np.float64),
+            np.array([price_range_pct], dtype=np.float64),
+            np.array([volume_ratio], dtype=np.float64),
+            np.array([volume_trend], dtype=np.float64),
+            np.array([price_vs_sma], dtype=np.float64)
+        )
+        return PHASE_NAMES[codes[0]]
+    
+    def _classify_phases(self, price_change_pct: np.ndarray, price_range_pct: np.ndarray,
+                         volume_ratio: np.ndarray, volume_trend: np.ndarray, price_vs_sma: np.ndarray) -> np.ndarray:
+        """
+        Classify many windows at once; returns integer codes indexing PHASE_NAMES
+        
+        Criteria, checked in order:
+        - Markup: >8% gain, price >2% above SMA, above average volume (ratio > 1.1)
+        - Markdown: >8% decline, price >2% below SMA
+        - Accumulation: <5% net change, <15% range, above average volume, volume increasing
+        - Distribution: <5% net change, <15% range, above average volume, volume decreasing
+        - Weak uptrend (early markup): >3% gain, price >1% above SMA
+        - Weak downtrend (early markdown): >3% decline, price >1% below SMA
+        """
+        if NUMBA_AVAILABLE:
+            return _classify_phase_codes(price_change_pct, price_range_pct, volume_ratio, volume_trend, price_vs_sma)
+        
+        # Without numba: the same ordered criteria as masks over all windows (np.select
+        # takes the first condition that holds)
+        sideways = (np.abs(price_change_pct) < 0.05) & (price_range_pct < 0.15) & (volume_ratio > 1.0)
+        return np.select(
+            [
+                (price_change_pct > 0.08) & (price_vs_sma > 0.02) & (volume_ratio > 1.1),
+                (price_change_pct < -0.08) & (price_vs_sma < -0.02),
+                sideways & (volume_trend > 1.05),
+                sideways & (volume_trend < 0.95),
+                (price_change_pct > 0.03) & (price_vs_sma > 0.01),
+                (price_change_pct < -0.03) & (price_vs_sma < -0.01),
+            ],
+            [1, 2, 3, 4, 1, 2],
+            0
+        ).astype(np.int8)
     
     def _merge_overlapping_phases(self, phases: List[Dict]) -> List[Dict]:
         """Merge overlapping phases of the same type"""
@@ -707,155 +1272,193 @@ class WyckoffAnalysisService:
         
         # Sort by start date
         phases.sort(key=lambda x: x['start_date'])
+        periods = PhaseArray.from_window_phases(phases)
+        phase = periods.phase
+        start = periods.start_date.astype(np.int64)
+        end = periods.end_date.astype(np.int64)
+        n = len(periods)
+        
+        # A run of merged phases breaks where the type changes or where a phase starts
+        # after every earlier phase of the run has ended. Runs never span a type change,
+        # so the running latest end is taken per same-type segment: offsetting each
+        # segment past the previous one lets a single cumulative max serve all of them.
+        type_change = np.ones(n, dtype=bool)
+        type_change[1:] = phase[1:] != phase[:-1]
+        offset = (np.cumsum(type_change) - 1) * (end.max() - start.min() + 1)
+        latest_end = np.maximum.accumulate(end + offset)
+        run_start = type_change
+        run_start[1:] |= start[1:] + offset[1:] > latest_end[:-1]
+        
+        first = np.flatnonzero(run_start)
+        last = np.append(first[1:], n) - 1
+        columns = periods.columns
+        merged_columns = {field: values[first] for field, values in columns.items()}
+        merged_columns['duration_days'] = np.add.reduceat(columns['duration_days'], first)
+        merged_columns['price_range_pct'] = np.fmax.reduceat(columns['price_range_pct'], first)
+        merged_columns['end_price'] = columns['end_price'][last]
+        
+        # Averages are folded in pairwise as a run grows, rounding at every step (part of
+        # the merged values, not just output formatting); step t advances all runs longer
+        # than t at once
+        run_length = last - first + 1
+        for t in range(1, run_length.max()):
+            growing = run_length > t
+            for field in ('price_change_pct', 'volume_ratio', 'volume_trend', 'price_vs_sma'):
+                merged_columns[field][growing] = np.round(
+                    (merged_columns[field][growing] + columns[field][first[growing] + t]) / 2, 2
+                )
+        
+        return PhaseArray(
+            start_date=periods.start_date[first],
+            end_date=(np.maximum.reduceat(end, first)).astype('datetime64[D]'),
+            columns=merged_columns,
+            phase=phase[first]
+        ).to_dicts()
+    
+    def _sideways_window_stats(self, df: pd.DataFrame, window: int = 20) -> Dict[str, np.ndarray]:
+        """
+        Statistics of every `window`-bar period scanned by the accumulation/distribution
+        finders, computed in one vectorized pass. Period k covers rows k .. k+window-1
+        and is judged against volume_sma_20 of the row right after it (row k+window).
+        """
+        n_periods = len(df) - window - 10
+        if n_periods <= 0:
+            return {'n_periods': 0}
+        
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        
+        # Streaming window statistics: O(1) per period instead of re-reducing every window
+        if NUMBA_AVAILABLE:
+            lowest, highest = _rolling_min_max(low, high, window)
+            period_range = (highest - lowest)[window - 1:window - 1 + n_periods]
+        else:
+            period_range = (sliding_window_view(high, window).max(axis=1) -
+                            sliding_window_view(low, window).min(axis=1))[:n_periods]
+        price_range = period_range / _window_means(df['close'].to_numpy(dtype=np.float64), window)[:n_periods]
         
-        merged = []
-        current_phase = phases[0]
-        
-        for next_phase in phases[1:]:
-            # Check if phases overlap and are the same type
-            if (self._phases_overlap(current_phase, next_phase) and 
-                current_phase['phase'] == next_phase['phase']):
-                # Merge phases
-                current_phase = self._merge_two_phases(current_phase, next_phase)
-            else:
-                # No overlap or different type, add current and move to next
-                merged.append(current_phase)
-                current_phase = next_phase
-        
-        # Add the last phase
-        merged.append(current_phase)
+        # Volume trend: the period's last 10-day volume mean over the rolling(10) mean at its
+        # first row. Taken within the period, that first-row mean has a single bar in view,
+        # which pandas leaves NaN (so the trend is NaN and never passes a threshold)
+        last_volume_sma_10 = _window_means(volume, 10)[window - 10:window - 10 + n_periods]
+        first_volume_sma_10 = np.full(n_periods, np.nan)
+        volume_trend = last_volume_sma_10 / first_volume_sma_10
         
-        return merged
-    
-    def _phases_overlap(self, phase1: Dict, phase2: Dict) -> bool:
-        """Check if two phases overlap in time"""
-        return (phase1['end_date'] >= phase2['start_date'] and 
-                phase2['end_date'] >= phase1['start_date'])
-    
-    def _merge_two_phases(self, phase1: Dict, phase2: Dict) -> Dict:
-        """Merge two overlapping phases of the same type"""
         return {
-            'phase': phase1['phase'],
-            'start_date': min(phase1['start_date'], phase2['start_date']),
-            'end_date': max(phase1['end_date'], phase2['end_date']),
-            'duration_days': phase1['duration_days'] + phase2['duration_days'],
-            'price_change_pct': round((phase1['price_change_pct'] + phase2['price_change_pct']) / 2, 2),
-            'price_range_pct': round(max(phase1['price_range_pct'], phase2['price_range_pct']), 2),
-            'volume_ratio': round((phase1['volume_ratio'] + phase2['volume_ratio']) / 2, 2),
-            'volume_trend': round((phase1['volume_trend'] + phase2['volume_trend']) / 2, 2),
-            'price_vs_sma': round((phase1['price_vs_sma'] + phase2['price_vs_sma']) / 2, 2),
-            'start_price': phase1['start_price'],
-            'end_price': phase2['end_price']
+            'n_periods': n_periods,
+            'price_range': price_range,
+            'volume_trend': volume_trend,
+            'avg_volume': _window_means(volume, window)[:n_periods],
+            'volume_sma_20': df['volume_sma_20'].to_numpy(dtype=np.float64)[window:window + n_periods],
         }
     
-    def _find_accumulation_periods(self, df: pd.DataFrame) -> List[Dict]:
-        """Find accumulation periods (sideways movement with increasing volume)"""
-        periods = []
-        
-        # Look for sideways movement (low volatility, price range)
-        sideways_threshold = 0.05  # 5% price range
-        
-        for i in range(20, len(df) - 10):
-            # Check 20-day period for sideways movement
-            period_data = df.iloc[i-20:i]
-            
-            price_range = (period_data['high'].max() - period_data['low'].min()) / period_data['close'].mean()
-            volume_trend = period_data['volume'].rolling(window=10).mean().iloc[-1] / period_data['volume'].rolling(window=10).mean().iloc[0]
-            
-            # Accumulation criteria: sideways movement + increasing volume
-            if (price_range < sideways_threshold and 
-                volume_trend > 1.1 and  # Volume increasing
-                period_data['volume'].mean() > df['volume_sma_20'].iloc[i]):
-                
-                periods.append({
-                    'start_date': period_data['date'].iloc[0].strftime('%Y-%m-%d'),
-                    'end_date': period_data['date'].iloc[-1].strftime('%Y-%m-%d'),
-                    'duration_days': 20,
-                    'price_range_pct': round(price_range * 100, 2),
-                    'volume_trend': round(volume_trend, 2),
-                    'avg_volume_ratio': round(period_data['volume'].mean() / df['volume_sma_20'].iloc[i], 2)
-                })
+    def _sideways_periods(self, dates: np.ndarray, stats: Dict[str, np.ndarray], is_period: np.ndarray) -> List[Dict]:
+        """Period dicts for the 20-bar periods selected from _sideways_window_stats"""
+        k = np.flatnonzero(is_period)
+        return PhaseArray.from_rows(dates, k, k + 19, {
+            'duration_days': np.full(len(k), 20),
+            'price_range_pct': stats['price_range'][k] * 100,
+            'volume_trend': stats['volume_trend'][k],
+            'avg_volume_ratio': stats['avg_volume'][k] / stats['volume_sma_20'][k]
+        }).to_dicts()
+    
+    def _find_wyckoff_periods(self, df: pd.DataFrame) -> Dict[str, List[Dict]]:
+        """
+        Accumulation, distribution, markup and markdown periods from a single pass: the
+        sideways statistics and the trend scan are computed once and every phase's
+        criteria are masks over the same arrays
+        """
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        periods = {}
+        
+        # Accumulation / distribution: sideways movement (price range under 5%) with
+        # increasing / decreasing volume
+        sideways_threshold = 0.05
+        stats = self._sideways_window_stats(df)
+        if stats['n_periods'] == 0:
+            periods['accumulation'] = []
+            periods['distribution'] = []
+        else:
+            is_sideways = stats['price_range'] < sideways_threshold
+            periods['accumulation'] = self._sideways_periods(dates, stats, (
+                is_sideways &
+                (stats['volume_trend'] > 1.1) &  # Volume increasing
+                (stats['avg_volume'] > stats['volume_sma_20'])
+            ))
+            periods['distribution'] = self._sideways_periods(dates, stats, (
+                is_sideways &
+                (stats['volume_trend'] < 0.9) &  # Volume decreasing
+                (stats['avg_volume'] < stats['volume_sma_20'])
+            ))
+        
+        # Markup: significant uptrend (at least 15% gain) + volume confirmation (at least
+        # 5 high volume days) + close above SMA 20. Markdown: significant downtrend (at
+        # least 15% decline) + close below SMA 20
+        codes, price_change, high_volume_days, trend_strength = self._trend_period_scan(df)
+        k = np.flatnonzero(codes == 1)
+        periods['markup'] = PhaseArray.from_rows(dates, k, k + 29, {
+            'duration_days': np.full(len(k), 30),
+            'price_change_pct': price_change[k] * 100,
+            'high_volume_days': high_volume_days[k],
+            'trend_strength': trend_strength[k]
+        }).to_dicts()
+        k = np.flatnonzero(codes == 2)
+        periods['markdown'] = PhaseArray.from_rows(dates, k, k + 29, {
+            'duration_days': np.full(len(k), 30),
+            'price_change_pct': price_change[k] * 100,
+            'trend_strength': trend_strength[k]
+        }).to_dicts()
         
         return periods
     
+    def _find_accumulation_periods(self, df: pd.DataFrame) -> List[Dict]:
+        """Find accumulation periods (sideways movement with increasing volume)"""
+        return self._find_wyckoff_periods(df)['accumulation']
+    
     def _find_distribution_periods(self, df: pd.DataFrame) -> List[Dict]:
         """Find distribution periods (sideways movement with decreasing volume)"""
-        periods = []
-        
-        sideways_threshold = 0.05  # 5% price range
-        
-        for i in range(20, len(df) - 10):
-            period_data = df.iloc[i-20:i]
-            
-            price_range = (period_data['high'].max() - period_data['low'].min()) / period_data['close'].mean()
-            volume_trend = period_data['volume'].rolling(window=10).mean().iloc[-1] / period_data['volume'].rolling(window=10).mean().iloc[0]
-            
-            # Distribution criteria: sideways movement + decreasing volume
-            if (price_range < sideways_threshold and 
-                volume_trend < 0.9 and  # Volume decreasing
-                period_data['volume'].mean() < df['volume_sma_20'].iloc[i]):
-                
-                periods.append({
-                    'start_date': period_data['date'].iloc[0].strftime('%Y-%m-%d'),
-                    'end_date': period_data['date'].iloc[-1].strftime('%Y-%m-%d'),
-                    'duration_days': 20,
-                    'price_range_pct': round(price_range * 100, 2),
-                    'volume_trend': round(volume_trend, 2),
-                    'avg_volume_ratio': round(period_data['volume'].mean() / df['volume_sma_20'].iloc[i], 2)
-                })
-        
-        return periods
+        return self._find_wyckoff_periods(df)['distribution']
+    
+    def _trend_period_scan(self, df: pd.DataFrame, window: int = 30) -> Tuple[np.ndarray, ...]:
+        """
+        _scan_trend_periods over the indicator frame's columns. Returns codes, price change,
+        high-volume day count and trend strength per period
+        """
+        # High-volume days per window from prefix-sum differences (O(N) for all windows)
+        high_volume = df['high_volume'].to_numpy().astype(np.int32, copy=False)
+        cum = np.concatenate(([0], np.cumsum(high_volume)))
+        n_periods = max(len(df) - window - 10, 0)
+        high_volume_days = (cum[window:] - cum[:-window])[:n_periods]
+        
+        close = df['close'].to_numpy(dtype=np.float64)
+        sma_20 = df['sma_20'].to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE:
+            codes, price_change, trend_strength = _scan_trend_periods(close, sma_20, high_volume_days, window)
+            return codes, price_change, high_volume_days, trend_strength
+        
+        # Without numba: a period only needs its first and last rows, so the scan is a few
+        # operations on offset (zero-copy) slices instead of a per-period Python loop
+        first_close = close[:n_periods]
+        last_close = close[window - 1:window - 1 + n_periods]
+        last_sma = sma_20[window - 1:window - 1 + n_periods]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = (last_close - first_close) / first_close
+            trend_strength = (last_close / last_sma - 1) * 100
+        codes = np.select(
+            [(price_change > 0.15) & (high_volume_days > 5) & (last_close > last_sma),
+             (price_change < -0.15) & (last_close < last_sma)],
+            [1, 2], 0
+        ).astype(np.int8)
+        return codes, price_change, high_volume_days, trend_strength
     
     def _find_markup_periods(self, df: pd.DataFrame) -> List[Dict]:
         """Find markup periods (uptrend with volume confirmation)"""
-        periods = []
-        
-        for i in range(30, len(df) - 10):
-            period_data = df.iloc[i-30:i]
-            
-            # Check for uptrend
-            price_change = (period_data['close'].iloc[-1] - period_data['close'].iloc[0]) / period_data['close'].iloc[0]
-            volume_confirmation = period_data['high_volume'].sum() > 5  # At least 5 high volume days
-            
-            # Markup criteria: significant uptrend + volume confirmation
-            if (price_change > 0.15 and  # At least 15% gain
-                volume_confirmation and
-                period_data['close'].iloc[-1] > period_data['sma_20'].iloc[-1]):
-                
-                periods.append({
-                    'start_date': period_data['date'].iloc[0].strftime('%Y-%m-%d'),
-                    'end_date': period_data['date'].iloc[-1].strftime('%Y-%m-%d'),
-                    'duration_days': 30,
-                    'price_change_pct': round(price_change * 100, 2),
-                    'high_volume_days': period_data['high_volume'].sum(),
-                    'trend_strength': round((period_data['close'].iloc[-1] / period_data['sma_20'].iloc[-1] - 1) * 100, 2)
-                })
-        
-        return periods
+        return self._find_wyckoff_periods(df)['markup']
     
     def _find_markdown_periods(self, df: pd.DataFrame) -> List[Dict]:
         """Find markdown periods (downtrend)"""
-        periods = []
-        
-        for i in range(30, len(df) - 10):
-            period_data = df.iloc[i-30:i]
-            
-            # Check for downtrend
-            price_change = (period_data['close'].iloc[-1] - period_data['close'].iloc[0]) / period_data['close'].iloc[0]
-            
-            # Markdown criteria: significant downtrend
-            if (price_change < -0.15 and  # At least 15% decline
-                period_data['close'].iloc[-1] < period_data['sma_20'].iloc[-1]):
-                
-                periods.append({
-                    'start_date': period_data['date'].iloc[0].strftime('%Y-%m-%d'),
-                    'end_date': period_data['date'].iloc[-1].strftime('%Y-%m-%d'),
-                    'duration_days': 30,
-                    'price_change_pct': round(price_change * 100, 2),
-                    'trend_strength': round((period_data['close'].iloc[-1] / period_data['sma_20'].iloc[-1] - 1) * 100, 2)
-                })
-        
-        return periods
+        return self._find_wyckoff_periods(df)['markdown']
     
     def _analyze_volume_price_relationships(self, df: pd.DataFrame) -> Dict:
         """Analyze volume-price relationships for Wyckoff analysis"""
@@ -866,12 +1469,34 @@ class WyckoffAnalysisService:
         volume_trend = recent_data['volume_ratio'].mean()
         high_volume_days = recent_data['high_volume'].sum()
         
-        # Price-volume correlation
-        price_volume_corr = recent_data['price_change'].corr(recent_data['volume_ratio'])
-        
-        # Volume at key price levels
-        volume_at_highs = recent_data[recent_data['close'] > recent_data['close'].rolling(5).max().shift(1)]['volume_ratio'].mean()
-        volume_at_lows = recent_data[recent_data['close'] < recent_data['close'].rolling(5).min().shift(1)]['volume_ratio'].mean()
+        # Price-volume correlation over the rows where both are present (as Series.corr);
+        # NaN with fewer than two pairs or a constant series
+        price_change = recent_data['price_change'].to_numpy(dtype=np.float64)
+        volume_ratio = recent_data['volume_ratio'].to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(price_change) | np.isnan(volume_ratio))
+        if np.count_nonzero(valid) >= 2:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                price_volume_corr = np.corrcoef(price_change[valid], volume_ratio[valid])[0, 1]
+        else:
+            price_volume_corr = np.nan
+        
+        # Volume at key price levels: closes above the prior 5-day high / below the prior 5-day low
+        close = recent_data['close'].to_numpy(dtype=np.float64)
+        prior_high = np.full(len(close), np.nan)
+        prior_low = np.full(len(close), np.nan)
+        if len(close) > 5:
+            windows = sliding_window_view(close[:-1], 5)
+            prior_high[5:] = windows.max(axis=1)
+            prior_low[5:] = windows.min(axis=1)
+        
+        def mean_ratio(mask: np.ndarray) -> float:
+            # NaN-skipping mean like pandas (NaN when nothing is left)
+            values = volume_ratio[mask]
+            values = values[~np.isnan(values)]
+            return values.mean() if len(values) else np.nan
+        
+        volume_at_highs = mean_ratio(close > prior_high)
+        volume_at_lows = mean_ratio(close < prior_low)
         
         return {
             'volume_trend': round(volume_trend, 2),
@@ -898,39 +1523,50 @@ class WyckoffAnalysisService:
     def _identify_support_resistance(self, df: pd.DataFrame) -> Dict:
         """Identify key support and resistance levels"""
         
-        # Look for pivot highs and lows
-        pivot_highs = []
-        pivot_lows = []
-        
-        for i in range(5, len(df) - 5):
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        current_price = df['close'].to_numpy()[-1]
+        
+        # Look for pivot highs and lows: bars i in 5 .. len-6 against the 5 bars on either side
+        # (window maxima/minima skip NaN like pandas' max/min)
+        is_pivot_high = np.zeros(len(df), dtype=bool)
+        is_pivot_low = np.zeros(len(df), dtype=bool)
+        if len(df) >= 11:
+            window_high = np.fmax.reduce(sliding_window_view(high, 5), axis=1)
+            window_low = np.fmin.reduce(sliding_window_view(low, 5), axis=1)
+            center = slice(5, len(df) - 5)
+            
             # Pivot high: high point with lower highs on both sides
-            if (df['high'].iloc[i] > df['high'].iloc[i-5:i].max() and 
-                df['high'].iloc[i] > df['high'].iloc[i+1:i+6].max()):
-                pivot_highs.append({
-                    'date': df['date'].iloc[i].strftime('%Y-%m-%d'),
-                    'price': float(df['high'].iloc[i]),
-                    'volume': float(df['volume'].iloc[i])
-                })
+            is_pivot_high[center] = (high[center] > window_high[:-6]) & (high[center] > window_high[6:])
             
             # Pivot low: low point with higher lows on both sides
-            if (df['low'].iloc[i] < df['low'].iloc[i-5:i].min() and 
-                df['low'].iloc[i] < df['low'].iloc[i+1:i+6].min()):
-                pivot_lows.append({
-                    'date': df['date'].iloc[i].strftime('%Y-%m-%d'),
-                    'price': float(df['low'].iloc[i]),
-                    'volume': float(df['volume'].iloc[i])
-                })
+            is_pivot_low[center] = (low[center] < window_low[:-6]) & (low[center] < window_low[6:])
+        
+        dates = df['date'].to_numpy(dtype='datetime64[D]')
+        
+        def levels(is_level: np.ndarray, price: np.ndarray) -> List[Dict]:
+            # Dates of the selected pivots are formatted in one vectorized call
+            idx = np.flatnonzero(is_level)
+            return [
+                {'date': date, 'price': level_price, 'volume': level_volume}
+                for date, level_price, level_volume in zip(
+                    np.datetime_as_string(dates[idx], unit='D').tolist(),
+                    price[idx].tolist(),
+                    volume[idx].tolist()
+                )
+            ]
         
         # Get recent levels (last 60 days)
-        recent_highs = [h for h in pivot_highs if h['price'] >= df['close'].iloc[-1] * 0.9]
-        recent_lows = [l for l in pivot_lows if l['price'] <= df['close'].iloc[-1] * 1.1]
+        recent_highs = levels(is_pivot_high & (high >= current_price * 0.9), high)
+        recent_lows = levels(is_pivot_low & (low <= current_price * 1.1), low)
         
         return {
             'resistance_levels': sorted(recent_highs[-3:], key=lambda x: x['price']),
             'support_levels': sorted(recent_lows[-3:], key=lambda x: x['price'], reverse=True),
-            'current_price': float(df['close'].iloc[-1]),
-            'distance_to_nearest_resistance': self._calculate_distance_to_level(df['close'].iloc[-1], recent_highs),
-            'distance_to_nearest_support': self._calculate_distance_to_level(df['close'].iloc[-1], recent_lows)
+            'current_price': float(current_price),
+            'distance_to_nearest_resistance': self._calculate_distance_to_level(current_price, recent_highs),
+            'distance_to_nearest_support': self._calculate_distance_to_level(current_price, recent_lows)
         }
     
     def _calculate_distance_to_level(self, current_price: float, levels: List[Dict]) -> float:
@@ -942,38 +1578,39 @@ class WyckoffAnalysisService:
         return round((nearest_level['price'] - current_price) / current_price * 100, 2)
     
     def _assess_current_phase(self, df: pd.DataFrame, phases: Dict) -> Dict:
-        """Assess the current Wyckoff phase using improved logic"""
+        """Assess the current Wyckoff phase using improved logic (df is sorted by date)"""
         
-        # Ensure data is sorted chronologically
-        df = df.sort_values('date').reset_index(drop=True)
-        
-        # Use last 20 days for current phase assessment
-        recent_data = df.tail(20)
-        current_price = df['close'].iloc[-1]
+        # Use last 20 days for current phase assessment, as arrays (no per-scalar pandas indexing)
+        close = df['close'].to_numpy()[-20:]
+        high = df['high'].to_numpy()[-20:]
+        low = df['low'].to_numpy()[-20:]
+        volume = df['volume'].to_numpy()[-20:]
         
         # Calculate metrics using the same logic as phase detection
-        start_price = recent_data['close'].iloc[0]
-        end_price = recent_data['close'].iloc[-1]
+        start_price = close[0]
+        end_price = close[-1]
         price_change_pct = (end_price - start_price) / start_price
         
-        # Price range analysis
-        high_price = recent_data['high'].max()
-        low_price = recent_data['low'].min()
+        # Price range analysis (fmax/fmin skip NaNs like pandas' max/min)
+        high_price = np.fmax.reduce(high)
+        low_price = np.fmin.reduce(low)
         price_range_pct = (high_price - low_price) / start_price
         
         # Volume analysis
-        avg_volume = recent_data['volume'].mean()
-        volume_sma_20 = df['volume'].rolling(window=20).mean().iloc[-1]
+        avg_volume = _nan_mean(volume)
+        # The 20-day volume SMA at the last bar spans exactly the recent window (and is
+        # undefined with fewer than 20 bars), so no rolling pass over the history is needed
+        volume_sma_20 = avg_volume if len(df) >= 20 else np.nan
         volume_ratio = avg_volume / volume_sma_20 if volume_sma_20 > 0 else 1.0
         
         # Volume trend
-        mid_point = len(recent_data) // 2
-        first_half_volume = recent_data['volume'].iloc[:mid_point].mean()
-        second_half_volume = recent_data['volume'].iloc[mid_point:].mean()
+        mid_point = len(volume) // 2
+        first_half_volume = _nan_mean(volume[:mid_point])
+        second_half_volume = _nan_mean(volume[mid_point:])
         volume_trend = second_half_volume / first_half_volume if first_half_volume > 0 else 1.0
         
-        # Moving average analysis
-        sma_20 = recent_data['close'].rolling(window=min(20, len(recent_data))).mean().iloc[-1]
+        # Moving average analysis: the SMA window spans the whole recent slice (NaN if any close is)
+        sma_20 = close.mean()
         price_vs_sma = (end_price - sma_20) / sma_20 if sma_20 > 0 else 0
         
         # Use the same classification logic
@@ -997,54 +1634,14 @@ class WyckoffAnalysisService:
     
     def _calculate_phase_confidence(self, price_change_pct: float, price_range_pct: float, 
                                    volume_ratio: float, volume_trend: float, price_vs_sma: float, phase: str) -> float:
-        """Calculate confidence level for phase classification"""
-        confidence = 0.5  # Base confidence
+        """Calculate confidence level for phase classification (see CONFIDENCE_TABLE)"""
+        price_key, price_thresholds, price_bonuses, volume_key, volume_thresholds, volume_bonuses = CONFIDENCE_TABLE[phase]
+        metrics = _confidence_metrics(price_change_pct, volume_ratio, volume_trend)
         
-        if phase == 'markup':
-            # Higher confidence for stronger uptrends
-            if price_change_pct > 0.15:
-                confidence += 0.3
-            elif price_change_pct > 0.08:
-                confidence += 0.2
-            else:
-                confidence += 0.1
-            
-            # Volume confirmation bonus
-            if volume_ratio > 1.2:
-                confidence += 0.1
-            elif volume_ratio > 1.0:
-                confidence += 0.05
-        
-        elif phase == 'markdown':
-            # Higher confidence for stronger downtrends
-            if price_change_pct < -0.15:
-                confidence += 0.3
-            elif price_change_pct < -0.08:
-                confidence += 0.2
-            else:
-                confidence += 0.1
-        
-        elif phase == 'accumulation':
-            # Higher confidence for clearer sideways movement
-            if abs(price_change_pct) < 0.02:
-                confidence += 0.2
-            elif abs(price_change_pct) < 0.05:
-                confidence += 0.1
-            
-            # Volume trend bonus
-            if volume_trend > 1.1:
-                confidence += 0.1
-        
-        elif phase == 'distribution':
-            # Higher confidence for clearer sideways movement
-            if abs(price_change_pct) < 0.02:
-                confidence += 0.2
-            elif abs(price_change_pct) < 0.05:
-                confidence += 0.1
-            
-            # Volume trend bonus
-            if volume_trend < 0.9:
-                confidence += 0.1
+        # Comparisons against NaN are False, so a NaN metric earns the lowest bonus
+        confidence = 0.5  # Base confidence
+        confidence += price_bonuses[np.count_nonzero(metrics[price_key] > price_thresholds)]
+        confidence += volume_bonuses[np.count_nonzero(metrics[volume_key] > volume_thresholds)]
         
         return min(0.95, max(0.3, confidence))  # Clamp between 0.3 and 0.95
     
@@ -1064,8 +1661,8 @@ class WyckoffAnalysisService:
     def _generate_wyckoff_signals(self, df: pd.DataFrame, current_phase: Dict) -> Dict:
         """Generate trading signals based on Wyckoff analysis"""
         
-        current_price = df['close'].iloc[-1]
-        recent_volume = df['volume_ratio'].tail(5).mean()
+        current_price = df['close'].to_numpy()[-1]
+        recent_volume = _nan_mean(df['volume_ratio'].to_numpy()[-5:])
         
         signals = {
             'primary_signal': 'HOLD',
@@ -1098,7 +1695,7 @@ class WyckoffAnalysisService:
         
         # Calculate stop loss and take profit levels
         if signals['entry_signal'] or signals['exit_signal']:
-            atr = df['atr_14'].iloc[-1]
+            atr = df['atr_14'].to_numpy()[-1]
             signals['stop_loss'] = round(current_price - (2 * atr), 2)
             signals['take_profit'] = round(current_price + (3 * atr), 2)
         
@@ -1123,16 +1720,12 @@ class WyckoffAnalysisService:
         correlation_score = abs(volume_analysis['price_volume_correlation']) * 20
         score += correlation_score
         
-        # Recent performance score (10 points)
-        if len(df) >= 20:
-            recent_return = (df['close'].iloc[-1] - df['close'].iloc[-20]) / df['close'].iloc[-20]
-            performance_score = max(0, min(10, (recent_return + 0.2) * 25))  # Bonus for positive returns
-            score += performance_score
-        else:
-            # Use available data if less than 20 rows
-            recent_return = (df['close'].iloc[-1] - df['close'].iloc[0]) / df['close'].iloc[0]
-            performance_score = max(0, min(10, (recent_return + 0.2) * 25))
-            score += performance_score
+        # Recent performance score (10 points), over the last 20 rows or all available data
+        close = df['close'].to_numpy()
+        base_price = close[-20] if len(close) >= 20 else close[0]
+        recent_return = (close[-1] - base_price) / base_price
+        performance_score = max(0, min(10, (recent_return + 0.2) * 25))  # Bonus for positive returns
+        score += performance_score
         
         # Calculate grade
         if score >= 80:
@@ -1166,39 +1759,44 @@ class WyckoffAnalysisService:
         
         # Summary statistics
         total_stocks = len(analysis_results)
-        successful_analyses = len([r for r in analysis_results if 'error' not in r])
-        
-        # Phase distribution
-        phase_distribution = {}
-        grade_distribution = {}
-        buy_signals = 0
-        sell_signals = 0
-        
-        for result in analysis_results:
-            if 'error' in result:
-                continue
-                
-            phase = result['current_phase']['phase']
-            grade = result['wyckoff_score']['grade']
-            
-            phase_distribution[phase] = phase_distribution.get(phase, 0) + 1
-            grade_distribution[grade] = grade_distribution.get(grade, 0) + 1
-            
-            if result['signals']['primary_signal'] == 'BUY':
-                buy_signals += 1
-            elif result['signals']['primary_signal'] == 'SELL':
-                sell_signals += 1
-        
-        # Top performers
         successful_results = [r for r in analysis_results if 'error' not in r]
-        top_performers = sorted(successful_results, key=lambda x: x['wyckoff_score']['total_score'], reverse=True)[:5]
+        successful_analyses = len(successful_results)
         
-        # Best opportunities (high score + buy signal)
-        best_opportunities = [
-            r for r in successful_results 
-            if r['signals']['primary_signal'] == 'BUY' and r['wyckoff_score']['total_score'] > 70
+        # One row per successful analysis; the aggregations below are column ops
+        rep_df = pd.DataFrame(
+            [
+                {
+                    'symbol': r['symbol'],
+                    'score': r['wyckoff_score']['total_score'],
+                    'grade': r['wyckoff_score']['grade'],
+                    'phase': r['current_phase']['phase'],
+                    'signal': r['signals']['primary_signal'],
+                    'current_price': r['current_price'],
+                    'confidence': r['current_phase']['confidence']
+                }
+                for r in successful_results
+            ],
+            columns=['symbol', 'score', 'grade', 'phase', 'signal', 'current_price', 'confidence']
+        )
+        rep_df['score'] = rep_df['score'].astype(float)
+        
+        # Distributions keep first-seen order (sort=False)
+        phase_distribution = rep_df['phase'].value_counts(sort=False, dropna=False).to_dict()
+        grade_distribution = rep_df['grade'].value_counts(sort=False, dropna=False).to_dict()
+        buy_signals = int((rep_df['signal'] == 'BUY').sum())
+        sell_signals = int((rep_df['signal'] == 'SELL').sum())
+        
+        # Top performers (nlargest keeps the earlier stock on ties)
+        top_performers = rep_df.nlargest(5, 'score').rename(columns={'phase': 'current_phase'})
+        
+        # Best opportunities (high score + buy signal), best first; the reasoning lists are
+        # joined back from the results by row position
+        is_opportunity = (rep_df['signal'] == 'BUY') & (rep_df['score'] > 70)
+        best_opportunities = rep_df[is_opportunity].nlargest(len(rep_df), 'score')
+        best_opportunities = best_opportunities.rename(columns={'phase': 'current_phase'})
+        best_opportunities['reasoning'] = [
+            successful_results[i]['signals']['reasoning'] for i in best_opportunities.index
         ]
-        best_opportunities = sorted(best_opportunities, key=lambda x: x['wyckoff_score']['total_score'], reverse=True)
         
         return {
             'report_date': datetime.now().isoformat(),
@@ -1212,27 +1810,12 @@ class WyckoffAnalysisService:
             },
             'phase_distribution': phase_distribution,
             'grade_distribution': grade_distribution,
-            'top_performers': [
-                {
-                    'symbol': r['symbol'],
-                    'score': r['wyckoff_score']['total_score'],
-                    'grade': r['wyckoff_score']['grade'],
-                    'current_phase': r['current_phase']['phase'],
-                    'signal': r['signals']['primary_signal']
-                }
-                for r in top_performers
-            ],
-            'best_opportunities': [
-                {
-                    'symbol': r['symbol'],
-                    'score': r['wyckoff_score']['total_score'],
-                    'current_price': r['current_price'],
-                    'current_phase': r['current_phase']['phase'],
-                    'confidence': r['current_phase']['confidence'],
-                    'reasoning': r['signals']['reasoning']
-                }
-                for r in best_opportunities
-            ],
+            'top_performers': top_performers[
+                ['symbol', 'score', 'grade', 'current_phase', 'signal']
+            ].to_dict(orient='records'),
+            'best_opportunities': best_opportunities[
+                ['symbol', 'score', 'current_price', 'current_phase', 'confidence', 'reasoning']
+            ].to_dict(orient='records'),
             'detailed_analysis': analysis_results
         }
 
@@ -6,14 +6,226 @@ Comprehensive backtesting system for Wyckoff Method trading strategies
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, NamedTuple, Tuple, Optional
 from datetime import datetime, timedelta
+import hashlib
 import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
+from itertools import repeat
+
+from utils.numba_compat import njit, NUMBA_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# Bars in the trailing window used for phase analysis
+PHASE_WINDOW = 20
+
+# Prepared-frame columns kept for reference only (no backtest step reads them), stored as float32
+REFERENCE_COLUMNS = (
+    'price_change', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'price_vs_sma20', 'price_vs_sma50',
+    'atr_14', 'volatility', 'volatility_mean_20', 'daily_range', 'close_position'
+)
+
+def _window_nanmean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of the trailing `window` values at every row, skipping NaNs like pandas'
+    Series.mean (same summation, so the results match it exactly). Rows before the
+    first full window and all-NaN windows are NaN.
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+    missing = np.isnan(values)
+    sums = sliding_window_view(np.where(missing, 0.0, values), window).sum(axis=1)
+    counts = sliding_window_view(~missing, window).sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        out[window - 1:] = sums / counts
+    return out
+
+# Slots of the rolling-window states below: observation count, running sum (mean) or
+# running mean (variance), negative-value count (mean) or sum of squared deviations
+# (variance), Kahan compensations for adds and removes, run of equal values, last value
+_NOBS, _ACC, _AUX, _COMP_ADD, _COMP_REMOVE, _SAME_RUN, _PREV = range(7)
+
+@njit(cache=True)
+def _new_rolling_state(values):
+    state = np.zeros(7)
+    state[_PREV] = values[0] if values.shape[0] else np.nan
+    return state
+
+@njit(cache=True)
+def _rolling_mean_step(state, values, i, window):
+    """
+    Slide a rolling-mean window to end at row i and return its mean. Same updates as
+    pandas' rolling(window).mean() (compensated running sum), so values match it exactly.
+    """
+    if i >= window:
+        x = values[i - window]
+        if x == x:
+            state[_NOBS] -= 1
+            y = -x - state[_COMP_REMOVE]
+            t = state[_ACC] + y
+            state[_COMP_REMOVE] = t - state[_ACC] - y
+            state[_ACC] = t
+            if np.signbit(x):
+                state[_AUX] -= 1
+    x = values[i]
+    if x == x:
+        state[_NOBS] += 1
+        y = x - state[_COMP_ADD]
+        t = state[_ACC] + y
+        state[_COMP_ADD] = t - state[_ACC] - y
+        state[_ACC] = t
+        if np.signbit(x):
+            state[_AUX] += 1
+        state[_SAME_RUN] = state[_SAME_RUN] + 1 if x == state[_PREV] else 1
+        state[_PREV] = x
+    
+    nobs = state[_NOBS]
+    if nobs < window or nobs == 0:
+        return np.nan
+    if state[_SAME_RUN] >= nobs:
+        return state[_PREV]
+    mean = state[_ACC] / nobs
+    if state[_AUX] == 0 and mean < 0:
+        return 0.0
+    if state[_AUX] == nobs and mean > 0:
+        return 0.0
+    return mean
+
+@njit(cache=True)
+def _rolling_var_step(state, values, i, window):
+    """
+    Slide a rolling-variance window to end at row i and return its sample variance
+    (compensated Welford update, as in pandas 2's rolling(window).var()).
+    """
+    if i >= window:
+        x = values[i - window]
+        if x == x:
+            state[_NOBS] -= 1
+            if state[_NOBS] > 0:
+                prev_mean = state[_ACC] - state[_COMP_REMOVE]
+                y = x - state[_COMP_REMOVE]
+                t = y - state[_ACC]
+                state[_COMP_REMOVE] = t + state[_ACC] - y
+                state[_ACC] -= t / state[_NOBS]
+                state[_AUX] -= (x - prev_mean) * (x - state[_ACC])
+            else:
+                state[_ACC] = 0.0
+                state[_AUX] = 0.0
+    x = values[i]
+    if x == x:
+        state[_SAME_RUN] = state[_SAME_RUN] + 1 if x == state[_PREV] else 1
+        state[_PREV] = x
+        state[_NOBS] += 1
+        prev_mean = state[_ACC] - state[_COMP_ADD]
+        y = x - state[_COMP_ADD]
+        t = y - state[_ACC]
+        state[_COMP_ADD] = t + state[_ACC] - y
+        state[_ACC] += t / state[_NOBS]
+        state[_AUX] += (x - prev_mean) * (x - state[_ACC])
+    
+    nobs = state[_NOBS]
+    if nobs < window or nobs <= 1:
+        return np.nan
+    if state[_SAME_RUN] >= nobs:
+        return 0.0
+    return max(state[_AUX] / (nobs - 1), 0.0)
+
+@njit(cache=True)
+def _indicator_pass(high, low, close, volume):
+    """
+    Every rolling/EWM indicator of the backtest in one pass over the bars. The rolling
+    means follow pandas' own updates and the EMAs its adjusted ewm recurrence, so those
+    columns equal the pandas ones bit for bit. Volatility (20-bar close std over sma_20)
+    agrees with pandas to rounding, and its trailing PHASE_WINDOW mean (skipping NaNs)
+    is a running sum, recomputed every 4096 bars to keep rounding from accumulating.
+    Neither feeds a trading decision. Only volume_sma_20 (behind the volume ratio the
+    phases are classified on) is returned in float64; the reference-only indicators are
+    float32, from float64 running state.
+    
+    Returns (volume_sma_20, sma_20, sma_50, ema_12, ema_26, atr_14, volatility,
+    volatility_mean_20).
+    """
+    n = close.shape[0]
+    volume_sma_20 = np.empty(n)
+    sma_20 = np.empty(n, dtype=np.float32)
+    sma_50 = np.empty(n, dtype=np.float32)
+    atr_14 = np.empty(n, dtype=np.float32)
+    volatility = np.empty(n, dtype=np.float32)
+    volatility_mean = np.full(n, np.nan, dtype=np.float32)
+    emas = np.empty((2, n), dtype=np.float32)
+    
+    # True range; NaN on the first bar, where there is no previous close
+    true_range = np.empty(n)
+    for i in range(n):
+        prev_close = close[i - 1] if i > 0 else np.nan
+        high_low = high[i] - low[i]
+        high_close = abs(high[i] - prev_close)
+        low_close = abs(low[i] - prev_close)
+        if np.isnan(high_low) or np.isnan(high_close) or np.isnan(low_close):
+            true_range[i] = np.nan
+        else:
+            true_range[i] = max(high_low, high_close, low_close)
+    
+    volume_state = _new_rolling_state(volume)
+    sma_20_state = _new_rolling_state(close)
+    sma_50_state = _new_rolling_state(close)
+    var_20_state = _new_rolling_state(close)
+    atr_state = _new_rolling_state(true_range)
+    volatility_sum = 0.0
+    volatility_count = 0
+    
+    # EMA state (pandas ewm(span).mean(), adjust=True): current average and weight
+    decay = 1.0 - 2.0 / (np.array([12.0, 26.0]) + 1.0)
+    weighted = np.full(2, close[0] if n else np.nan)
+    old_weight = np.ones(2)
+    
+    for i in range(n):
+        volume_sma_20[i] = _rolling_mean_step(volume_state, volume, i, 20)
+        mean_20 = _rolling_mean_step(sma_20_state, close, i, 20)
+        sma_20[i] = mean_20
+        sma_50[i] = _rolling_mean_step(sma_50_state, close, i, 50)
+        atr_14[i] = _rolling_mean_step(atr_state, true_range, i, 14)
+        
+        volatility[i] = np.sqrt(_rolling_var_step(var_20_state, close, i, 20)) / mean_20
+        if i >= PHASE_WINDOW:
+            old = volatility[i - PHASE_WINDOW]
+            if not np.isnan(old):
+                volatility_sum -= old
+                volatility_count -= 1
+        if not np.isnan(volatility[i]):
+            volatility_sum += volatility[i]
+            volatility_count += 1
+        if i % 4096 == 4095:
+            volatility_sum = 0.0
+            for j in range(max(0, i - PHASE_WINDOW + 1), i + 1):
+                if not np.isnan(volatility[j]):
+                    volatility_sum += volatility[j]
+        if i >= PHASE_WINDOW - 1 and volatility_count > 0:
+            volatility_mean[i] = volatility_sum / volatility_count
+        
+        c = close[i]
+        for j in range(2):
+            if i > 0:
+                if weighted[j] == weighted[j]:
+                    old_weight[j] *= decay[j]
+                    if c == c:
+                        if weighted[j] != c:
+                            weighted[j] = (old_weight[j] * weighted[j] + c) / (old_weight[j] + 1.0)
+                        old_weight[j] += 1.0
+                elif c == c:
+                    weighted[j] = c
+            emas[j, i] = weighted[j]
+    
+    return volume_sma_20, sma_20, sma_50, emas[0], emas[1], atr_14, volatility, volatility_mean
+
 class WyckoffPhase(Enum):
     """Wyckoff Phase enumeration"""
     ACCUMULATION = "Accumulation"
@@ -27,6 +239,222 @@ class TradeAction(Enum):
     SELL = "SELL"
     HOLD = "HOLD"
 
+# Integer codes of the enums (definition order), used by the daily signal path and the
+# jitted trade simulation; the enums keep their string values for the API
+PHASES = list(WyckoffPhase)
+ACTIONS = list(TradeAction)
+PHASE_CODES = {phase: code for code, phase in enumerate(PHASES)}
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+_ACCUMULATION = PHASE_CODES[WyckoffPhase.ACCUMULATION]
+_DISTRIBUTION = PHASE_CODES[WyckoffPhase.DISTRIBUTION]
+_MARKUP = PHASE_CODES[WyckoffPhase.MARKUP]
+_MARKDOWN = PHASE_CODES[WyckoffPhase.MARKDOWN]
+_BUY = ACTION_CODES[TradeAction.BUY]
+_HOLD = ACTION_CODES[TradeAction.HOLD]
+
+# Daily signal by phase and whether volume confirms it (volume trend above 1.5)
+SIGNAL_RULES = {
+    (WyckoffPhase.ACCUMULATION, True): (TradeAction.BUY, "High volume accumulation - institutional buying"),
+    (WyckoffPhase.ACCUMULATION, False): (TradeAction.HOLD, "Accumulation phase - waiting for volume confirmation"),
+    (WyckoffPhase.DISTRIBUTION, True): (TradeAction.SELL, "High volume distribution - institutional selling"),
+    (WyckoffPhase.DISTRIBUTION, False): (TradeAction.HOLD, "Distribution phase - waiting for volume confirmation"),
+    (WyckoffPhase.MARKUP, True): (TradeAction.BUY, "Strong uptrend with volume confirmation"),
+    (WyckoffPhase.MARKUP, False): (TradeAction.BUY, "Strong uptrend with volume confirmation"),
+    (WyckoffPhase.MARKDOWN, True): (TradeAction.SELL, "Downtrend phase - avoid long positions"),
+    (WyckoffPhase.MARKDOWN, False): (TradeAction.SELL, "Downtrend phase - avoid long positions"),
+}
+# Reasoning strings of the daily signals, stored in SignalBuffer by position
+SIGNAL_REASONINGS = list(dict.fromkeys(reasoning for _, reasoning in SIGNAL_RULES.values()))
+REASONING_CODES = {reasoning: code for code, reasoning in enumerate(SIGNAL_REASONINGS)}
+# SIGNAL_RULES as lookup tables indexed by [phase code, confirmed]
+SIGNAL_ACTION_CODES = np.zeros((len(PHASES), 2), dtype=np.int8)
+SIGNAL_REASONING_CODES = np.zeros((len(PHASES), 2), dtype=np.int8)
+for (_phase, _confirmed), (_action, _reasoning) in SIGNAL_RULES.items():
+    SIGNAL_ACTION_CODES[PHASE_CODES[_phase], int(_confirmed)] = ACTION_CODES[_action]
+    SIGNAL_REASONING_CODES[PHASE_CODES[_phase], int(_confirmed)] = REASONING_CODES[_reasoning]
+
+NS_PER_DAY = 86400 * 10**9
+
+def _first_seen(codes: np.ndarray) -> List[int]:
+    """Distinct codes in order of first appearance"""
+    _, first = np.unique(codes, return_index=True)
+    return codes[np.sort(first)].tolist()
+
+@njit(cache=True)
+def _support_resistance(close, low, high, pivot_low_idx, pivot_high_idx, start):
+    """
+    Support and resistance for days start .. len(close)-1 (NaN where there is none): the
+    highest pivot low below the day's close and the lowest pivot high above it, among the
+    pivots of the last 50 days (rows i-44 .. i-5, whose 5 neighbours on either side are
+    all within those days). Days with less than 50 days of history have neither.
+    """
+    n = close.shape[0]
+    n_days = max(n - start, 0)
+    support = np.full(n_days, np.nan)
+    resistance = np.full(n_days, np.nan)
+    first_low = 0
+    first_high = 0
+    for t in range(n_days):
+        i = start + t
+        if i + 1 < 50:
+            continue
+        price = close[i]
+        
+        while first_low < pivot_low_idx.shape[0] and pivot_low_idx[first_low] < i - 44:
+            first_low += 1
+        j = first_low
+        while j < pivot_low_idx.shape[0] and pivot_low_idx[j] <= i - 5:
+            level = low[pivot_low_idx[j]]
+            if level < price and not level <= support[t]:
+                support[t] = level
+            j += 1
+        
+        while first_high < pivot_high_idx.shape[0] and pivot_high_idx[first_high] < i - 44:
+            first_high += 1
+        j = first_high
+        while j < pivot_high_idx.shape[0] and pivot_high_idx[j] <= i - 5:
+            level = high[pivot_high_idx[j]]
+            if level > price and not level >= resistance[t]:
+                resistance[t] = level
+            j += 1
+    return support, resistance
+
+@njit(cache=True)
+def _next_phase_day(phase, code):
+    """For every day, the first day from it on in phase `code` (len(phase) if none)"""
+    n_days = phase.shape[0]
+    out = np.empty(n_days + 1, dtype=np.int64)
+    out[n_days] = n_days
+    for t in range(n_days - 1, -1, -1):
+        out[t] = t if phase[t] == code else out[t + 1]
+    return out
+
+@njit(cache=True)
+def _find_exit(close, date_ns, next_exit_day, start, entry, is_long, stop_loss_percent,
+               take_profit_percent, max_trade_duration):
+    """
+    Row at which a position entered at row `entry` is closed (len(close) if it is still
+    open after the last day): the first later row that reaches the time limit, is in the
+    exit phase (next_exit_day, from _next_phase_day) or closes at the stop loss / take
+    profit level, whichever comes first.
+    """
+    n = close.shape[0]
+    entry_price = close[entry]
+    # Time limit: the first row max_trade_duration days or more after the entry (dates ascend)
+    if max_trade_duration > (date_ns[n - 1] - date_ns[entry]) // NS_PER_DAY:
+        last = n
+    else:
+        last = max(np.searchsorted(date_ns, date_ns[entry] + max_trade_duration * NS_PER_DAY), entry + 1)
+    last = min(last, next_exit_day[entry + 1 - start] + start)
+    
+    # Stop loss / take profit at the close, up to the time / phase exit
+    if is_long:
+        stop_level = entry_price * (1 - stop_loss_percent)
+        target_level = entry_price * (1 + take_profit_percent)
+        for j in range(entry + 1, last):
+            if close[j] <= stop_level or close[j] >= target_level:
+                return j
+    else:
+        stop_level = entry_price * (1 + stop_loss_percent)
+        target_level = entry_price * (1 - take_profit_percent)
+        for j in range(entry + 1, last):
+            if close[j] >= stop_level or close[j] <= target_level:
+                return j
+    return last
+
+@njit(cache=True)
+def _simulate_trades(close, date_ns, phase, action, start, initial_capital, position_size_percent,
+                     stop_loss_percent, take_profit_percent, max_trade_duration):
+    """
+    Position loop of the backtest over days start .. len(close)-1 (phase/action hold one
+    code per day). At most one position is open: its exit row (time limit, stop loss /
+    take profit at the close, opposite phase) is looked up when it is entered, and on
+    each day an exiting position is closed before a new one is entered on a BUY/SELL
+    signal with position_size_percent of the capital. A position still open after the
+    last day is closed at the last close.
+    
+    Returns (entry_idx, exit_idx, shares, pnl, pnl_percent, duration_days, equity, capital,
+    closed_at_end, failed_idx): trades as parallel arrays, the portfolio value per day, the
+    final capital, whether the last trade was closed at the end of the data, and the day
+    whose position size was not a finite number (-1 if none; the simulation stops there).
+    """
+    n = close.shape[0]
+    n_days = max(n - start, 0)
+    equity = np.empty(n_days)
+    entry_idx = np.empty(n_days, dtype=np.int64)
+    exit_idx = np.empty(n_days, dtype=np.int64)
+    shares_out = np.empty(n_days, dtype=np.int64)
+    pnl_out = np.empty(n_days)
+    pnl_percent_out = np.empty(n_days)
+    duration_out = np.empty(n_days, dtype=np.int64)
+    n_trades = 0
+    
+    # First day from each day on that closes a long / short position by phase
+    next_distribution = _next_phase_day(phase, _DISTRIBUTION)
+    next_accumulation = _next_phase_day(phase, _ACCUMULATION)
+    
+    capital = initial_capital
+    in_position = False
+    entry = 0
+    exit_row = 0
+    entry_price = 0.0
+    is_long = True
+    shares = 0
+    for t in range(n_days):
+        i = start + t
+        price = close[i]
+        
+        if in_position and i == exit_row:
+            days_held = (date_ns[i] - date_ns[entry]) // NS_PER_DAY
+            pnl = (price - entry_price) * shares if is_long else (entry_price - price) * shares
+            capital += pnl
+            entry_idx[n_trades] = entry
+            exit_idx[n_trades] = i
+            shares_out[n_trades] = shares
+            pnl_out[n_trades] = pnl
+            pnl_percent_out[n_trades] = (pnl / (entry_price * shares)) * 100
+            duration_out[n_trades] = days_held
+            n_trades += 1
+            in_position = False
+        
+        if not in_position and action[t] != _HOLD:
+            size = capital * position_size_percent / price
+            if not np.isfinite(size):
+                return (entry_idx[:n_trades], exit_idx[:n_trades], shares_out[:n_trades],
+                        pnl_out[:n_trades], pnl_percent_out[:n_trades], duration_out[:n_trades],
+                        equity[:t], capital, False, i)
+            if int(size) > 0:
+                in_position = True
+                entry = i
+                entry_price = price
+                is_long = action[t] == _BUY
+                shares = int(size)
+                exit_row = _find_exit(close, date_ns, next_distribution if is_long else next_accumulation,
+                                      start, i, is_long, stop_loss_percent, take_profit_percent,
+                                      max_trade_duration)
+        
+        if in_position:
+            unrealized = (price - entry_price) * shares if is_long else (entry_price - price) * shares
+            equity[t] = capital + unrealized
+        else:
+            equity[t] = capital
+    
+    if in_position:
+        price = close[n - 1]
+        pnl = (price - entry_price) * shares if is_long else (entry_price - price) * shares
+        capital += pnl
+        entry_idx[n_trades] = entry
+        exit_idx[n_trades] = n - 1
+        shares_out[n_trades] = shares
+        pnl_out[n_trades] = pnl
+        pnl_percent_out[n_trades] = (pnl / (entry_price * shares)) * 100
+        duration_out[n_trades] = (date_ns[n - 1] - date_ns[entry]) // NS_PER_DAY
+        n_trades += 1
+    
+    return (entry_idx[:n_trades], exit_idx[:n_trades], shares_out[:n_trades],
+            pnl_out[:n_trades], pnl_percent_out[:n_trades], duration_out[:n_trades],
+            equity, capital, in_position, -1)
+
 @dataclass
 class WyckoffSignal:
     """Wyckoff trading signal"""
@@ -40,6 +468,15 @@ class WyckoffSignal:
     support_level: Optional[float] = None
     resistance_level: Optional[float] = None
 
+class PhaseInfo(NamedTuple):
+    """Phase analysis of one backtest day"""
+    phase: int  # code into PHASES
+    confidence: float
+    price_trend: float
+    volume_trend: float
+    volatility: float
+    price: float
+
 @dataclass
 class Trade:
     """Individual trade record"""
@@ -58,6 +495,102 @@ class Trade:
     entry_reasoning: str = ""
     exit_reasoning: str = ""
 
+@dataclass
+class BacktestArrays:
+    """Prepared columns the per-day loop reads, as contiguous arrays"""
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    price_trend: np.ndarray  # close change over the trailing PHASE_WINDOW bars
+    volume_trend: np.ndarray  # mean volume_ratio over the trailing PHASE_WINDOW bars
+    volatility: np.ndarray  # mean volatility over the trailing PHASE_WINDOW bars (float32, reference only)
+    pivot_low_idx: np.ndarray  # rows of the pivot lows / highs, ascending
+    pivot_high_idx: np.ndarray
+    
+    def slice(self, start: int, stop: int) -> 'BacktestArrays':
+        """Rows start .. stop-1 as views, with the pivot rows renumbered from start"""
+        def rows(idx: np.ndarray) -> np.ndarray:
+            return idx[np.searchsorted(idx, start):np.searchsorted(idx, stop)] - start
+        
+        return BacktestArrays(
+            close=self.close[start:stop],
+            high=self.high[start:stop],
+            low=self.low[start:stop],
+            price_trend=self.price_trend[start:stop],
+            volume_trend=self.volume_trend[start:stop],
+            volatility=self.volatility[start:stop],
+            pivot_low_idx=rows(self.pivot_low_idx),
+            pivot_high_idx=rows(self.pivot_high_idx)
+        )
+    
+    @classmethod
+    def from_indicators(cls, columns: Dict[str, np.ndarray]) -> 'BacktestArrays':
+        """Arrays from the columns returned by WyckoffBacktestEngine._compute_indicators"""
+        return cls(
+            close=columns['close'],
+            high=columns['high'],
+            low=columns['low'],
+            price_trend=columns['price_trend_20'],
+            volume_trend=columns['volume_ratio_mean_20'],
+            volatility=columns['volatility_mean_20'].astype(np.float32, copy=False),
+            pivot_low_idx=np.flatnonzero(columns['is_pivot_low']),
+            pivot_high_idx=np.flatnonzero(columns['is_pivot_high'])
+        )
+
+@dataclass
+class SignalBuffer:
+    """
+    Daily signals as parallel arrays (phase / action / reasoning as codes into PHASES,
+    ACTIONS and SIGNAL_REASONINGS, missing support / resistance as NaN). Indexing or
+    iterating yields WyckoffSignal objects, built on demand.
+    """
+    dates: pd.DatetimeIndex
+    phase: np.ndarray
+    action: np.ndarray
+    price: np.ndarray
+    volume_ratio: np.ndarray
+    confidence: np.ndarray
+    reasoning: np.ndarray
+    support_level: np.ndarray
+    resistance_level: np.ndarray
+    
+    @classmethod
+    def empty(cls, dates: pd.DatetimeIndex) -> 'SignalBuffer':
+        n = len(dates)
+        return cls(
+            dates=dates,
+            phase=np.zeros(n, dtype=np.int8),
+            action=np.zeros(n, dtype=np.int8),
+            price=np.zeros(n),
+            volume_ratio=np.zeros(n),
+            confidence=np.zeros(n),
+            reasoning=np.zeros(n, dtype=np.int8),
+            support_level=np.full(n, np.nan),
+            resistance_level=np.full(n, np.nan)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def __getitem__(self, k: int) -> WyckoffSignal:
+        support = self.support_level[k]
+        resistance = self.resistance_level[k]
+        return WyckoffSignal(
+            date=self.dates[k],
+            phase=PHASES[self.phase[k]],
+            action=ACTIONS[self.action[k]],
+            price=self.price[k],
+            volume_ratio=self.volume_ratio[k],
+            confidence=float(self.confidence[k]),
+            reasoning=SIGNAL_REASONINGS[self.reasoning[k]],
+            support_level=None if np.isnan(support) else support,
+            resistance_level=None if np.isnan(resistance) else resistance
+        )
+    
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
 @dataclass
 class BacktestResults:
     """Complete backtest results"""
@@ -66,11 +599,28 @@ class BacktestResults:
     end_date: datetime
     total_days: int
     trades: List[Trade]
-    signals: List[WyckoffSignal]
+    signals: SignalBuffer
     performance_metrics: Dict
     phase_analysis: Dict
     equity_curve: List[Tuple[datetime, float]]
 
+# Engine settings a parameter sweep (run_backtest_batch) may vary: the trade simulation
+# settings, the only ones that change a backtest's results (volume_threshold only feeds
+# the reference high_volume column)
+SWEEP_PARAMETERS = (
+    'position_size_percent', 'stop_loss_percent', 'take_profit_percent', 'max_trade_duration'
+)
+
+def _run_backtest_sweep(symbol: str, df: pd.DataFrame, initial_capital: float, param_grid: List[Dict]) -> List[BacktestResults]:
+    """Worker for run_backtest_batch: backtests of one symbol for every parameter set"""
+    results = []
+    for params in param_grid:
+        engine = WyckoffBacktestEngine(initial_capital=initial_capital)
+        for name, value in params.items():
+            setattr(engine, name, value)
+        results.append(engine.run_backtest(df, symbol))
+    return results
+
 class WyckoffBacktestEngine:
     """
     Wyckoff Method Backtesting Engine
@@ -79,6 +629,15 @@ class WyckoffBacktestEngine:
     Wyckoff phase identification and trading signals.
     """
     
+    # Prepared arrays of recently backtested data, shared by all engines (parameter sweeps
+    # rerun the same frame) and keyed by a hash of its contents; least recently used
+    # entries are evicted past this size. Cached arrays are shared, so treat them as read-only
+    PREPARED_CACHE_SIZE = 64
+    _prepared_cache: OrderedDict = OrderedDict()
+    _prepared_cache_lock = threading.Lock()
+    _prepared_cache_hits = 0
+    _prepared_cache_misses = 0
+    
     def __init__(self, initial_capital: float = 100000.0):
         """
         Initialize backtest engine
@@ -108,68 +667,95 @@ class WyckoffBacktestEngine:
         Returns:
             Complete backtest results
         """
+        # Prepare data; every trailing-window feature is precomputed over the whole frame so
+        # each day is a handful of array lookups
+        arrays = self._get_prepared_arrays(df)
+        return self._backtest_arrays(arrays, df.index, symbol)
+    
+    def run_walk_forward(self, df: pd.DataFrame, symbol: str, window: int = 160, step: int = 40) -> List[BacktestResults]:
+        """
+        Backtest successive windows of df: rows s .. s+window-1 for s = 0, step, 2*step, ...
+        
+        Indicators are computed once for the whole frame (and cached) and sliced per window,
+        so overlapping windows share them and each window sees indicator values warmed up on
+        the data before it, never after it (every indicator at a row only uses rows up to it;
+        support/resistance pivots used on a day are at least 5 days old). Otherwise each
+        window is backtested like run_backtest, including the 30-day start.
+        """
+        if window <= 30:
+            raise ValueError("window must be longer than the 30-day start of a backtest")
+        
+        arrays = self._get_prepared_arrays(df)
+        return [
+            self._backtest_arrays(arrays.slice(start, start + window), df.index[start:start + window], symbol)
+            for start in range(0, len(df) - window + 1, step)
+        ]
+    
+    def _backtest_arrays(self, arrays: BacktestArrays, dates: pd.DatetimeIndex, symbol: str) -> BacktestResults:
+        """Backtest over prepared arrays, one row per date"""
         print(f"🚀 Starting Wyckoff Backtest for {symbol}")
-        print(f"📅 Period: {df.index[0].date()} to {df.index[-1].date()}")
+        print(f"📅 Period: {dates[0].date()} to {dates[-1].date()}")
         print(f"💰 Initial Capital: ${self.initial_capital:,.2f}")
         
-        # Prepare data
-        df = self._prepare_data(df)
-        
-        # Initialize tracking variables
-        current_position = None
-        trades = []
-        signals = []
-        equity_curve = []
+        # Daily signals, using only data up to each day
+        signals = SignalBuffer.empty(dates[30:])  # Start after 30 days for indicators
+        for i in range(30, len(dates)):
+            phase_analysis = self._analyze_current_phase(arrays, i)
+            self._write_signal(signals, i - 30, phase_analysis)
+        signals.support_level, signals.resistance_level = _support_resistance(
+            arrays.close, arrays.low, arrays.high, arrays.pivot_low_idx, arrays.pivot_high_idx, 30
+        )
         
-        # Reset capital for this backtest
-        self.current_capital = self.initial_capital
+        # Simulate the positions over the signals in one jitted pass
+        date_ns = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        (entry_idx, exit_idx, shares, pnl, pnl_percent, duration_days,
+         equity, capital, closed_at_end, failed_idx) = _simulate_trades(
+            arrays.close, date_ns,
+            signals.phase, signals.action,
+            30, float(self.initial_capital), self.position_size_percent,
+            self.stop_loss_percent, self.take_profit_percent, self.max_trade_duration
+        )
+        if failed_idx >= 0:
+            # Raises the same error sizing the position in Python would (NaN / inf price)
+            int(capital * self.position_size_percent / arrays.close[failed_idx])
+        self.current_capital = capital
         
-        # Analyze each day chronologically
-        for i in range(30, len(df)):  # Start after 30 days for indicators
-            current_date = df.index[i]
-            current_data = df.iloc[:i+1]  # All data up to current day
-            
-            # Analyze current Wyckoff phase
-            phase_analysis = self._analyze_current_phase(current_data)
-            signal = self._generate_signal(current_data, phase_analysis, current_date)
-            signals.append(signal)
-            
-            # Handle existing position
-            if current_position:
-                current_position = self._update_position(current_position, current_data, signal)
-                
-                # Check for exit conditions
-                if self._should_exit_position(current_position, current_data, signal):
-                    trade = self._close_position(current_position, current_data.iloc[-1], signal)
-                    trades.append(trade)
-                    current_position = None
-            
-            # Check for new entry
-            if not current_position and signal.action != TradeAction.HOLD:
-                position = self._enter_position(signal, current_data.iloc[-1])
-                if position:
-                    current_position = position
-            
-            # Update equity curve
-            portfolio_value = self._calculate_portfolio_value(current_position, current_data.iloc[-1])
-            equity_curve.append((current_date, portfolio_value))
-        
-        # Close any remaining position
-        if current_position:
-            final_signal = WyckoffSignal(
-                date=df.index[-1],
-                phase=WyckoffPhase.MARKUP,
-                action=TradeAction.HOLD,
-                price=df.iloc[-1]['close'],
-                volume_ratio=1.0,
-                confidence=0.0,
-                reasoning="End of backtest period"
-            )
-            trade = self._close_position(current_position, df.iloc[-1], final_signal)
-            trades.append(trade)
+        trades = []
+        final_signal = WyckoffSignal(
+            date=dates[-1],
+            phase=WyckoffPhase.MARKUP,
+            action=TradeAction.HOLD,
+            price=arrays.close[-1],
+            volume_ratio=1.0,
+            confidence=0.0,
+            reasoning="End of backtest period"
+        )
+        for k in range(len(entry_idx)):
+            entry_signal = signals[entry_idx[k] - 30]
+            # A position still open after the last day is closed by final_signal
+            is_final = closed_at_end and k == len(entry_idx) - 1
+            exit_signal = final_signal if is_final else signals[exit_idx[k] - 30]
+            trades.append(Trade(
+                symbol="",  # Will be set by caller
+                entry_date=entry_signal.date,
+                exit_date=exit_signal.date,
+                entry_price=entry_signal.price,
+                exit_price=arrays.close[exit_idx[k]],
+                action=entry_signal.action,
+                shares=int(shares[k]),
+                entry_phase=entry_signal.phase,
+                exit_phase=exit_signal.phase,
+                pnl=pnl[k],
+                pnl_percent=pnl_percent[k],
+                duration_days=int(duration_days[k]),
+                entry_reasoning=entry_signal.reasoning,
+                exit_reasoning=exit_signal.reasoning
+            ))
+        equity_curve = list(zip(dates[30:], equity.tolist()))
+        portfolio_value = equity_curve[-1][1]
         
         # Calculate performance metrics
-        performance_metrics = self._calculate_performance_metrics(trades, equity_curve)
+        performance_metrics = self._calculate_performance_metrics(trades, equity)
         
         # Analyze phases
         phase_analysis = self._analyze_phases(signals)
@@ -181,9 +767,9 @@ class WyckoffBacktestEngine:
         
         return BacktestResults(
             symbol=symbol,
-            start_date=df.index[30],
-            end_date=df.index[-1],
-            total_days=len(df) - 30,
+            start_date=dates[30],
+            end_date=dates[-1],
+            total_days=len(dates) - 30,
             trades=trades,
             signals=signals,
             performance_metrics=performance_metrics,
@@ -191,287 +777,219 @@ class WyckoffBacktestEngine:
             equity_curve=equity_curve
         )
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepare data with technical indicators"""
-        df = df.copy()
+    def run_backtest_batch(self, symbol_dfs: Dict[str, pd.DataFrame], param_grid: Optional[List[Dict]] = None,
+                           max_workers: Optional[int] = None) -> Dict[str, List[BacktestResults]]:
+        """
+        Backtest many symbols across worker processes, once per parameter set in param_grid
+        (dicts overriding this engine's position_size_percent, stop_loss_percent,
+        take_profit_percent or max_trade_duration; default: this engine's settings only).
+        Returns each symbol's results in param_grid order. A symbol's sweep runs in one
+        worker, so its data is prepared once there and reused from the cache.
+        """
+        if not symbol_dfs:
+            return {}
         
+        param_grid = param_grid or [{}]
+        for params in param_grid:
+            unknown = set(params) - set(SWEEP_PARAMETERS)
+            if unknown:
+                raise ValueError(f"Unknown backtest parameters: {sorted(unknown)}")
+        base = {name: getattr(self, name) for name in SWEEP_PARAMETERS}
+        param_grid = [{**base, **params} for params in param_grid]
+        
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = executor.map(_run_backtest_sweep, symbol_dfs.keys(), symbol_dfs.values(),
+                                   repeat(self.initial_capital), repeat(param_grid))
+            return dict(zip(symbol_dfs.keys(), results))
+    
+    @classmethod
+    def prepared_cache_stats(cls) -> Dict:
+        """Hit/miss counts and current size of the prepared-data cache"""
+        with cls._prepared_cache_lock:
+            return {
+                'hits': cls._prepared_cache_hits,
+                'misses': cls._prepared_cache_misses,
+                'size': len(cls._prepared_cache)
+            }
+    
+    def _data_key(self, df: pd.DataFrame) -> str:
+        """Cache key: hash of the dates and OHLCV values of df"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(df.index.to_numpy(dtype='datetime64[ns]').tobytes())
+        digest.update(df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64).tobytes())
+        return digest.hexdigest()
+    
+    def _get_prepared_arrays(self, df: pd.DataFrame) -> BacktestArrays:
+        """Prepared arrays for df, reused when the same data was backtested recently"""
+        cls = type(self)
+        key = self._data_key(df)
+        with cls._prepared_cache_lock:
+            cached = cls._prepared_cache.get(key)
+            if cached is not None:
+                cls._prepared_cache.move_to_end(key)
+                cls._prepared_cache_hits += 1
+                return cached
+            cls._prepared_cache_misses += 1
+        
+        arrays = BacktestArrays.from_indicators(self._compute_indicators(df))
+        
+        with cls._prepared_cache_lock:
+            cls._prepared_cache[key] = arrays
+            while len(cls._prepared_cache) > cls.PREPARED_CACHE_SIZE:
+                cls._prepared_cache.popitem(last=False)
+        return arrays
+    
+    def prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prepared frame: OHLCV as float plus every indicator column. The backtest itself
+        works on BacktestArrays and never builds this frame; it is for inspecting the data.
+        """
+        columns = self._compute_indicators(df)
+        prepared = pd.DataFrame(columns, index=df.index)
+        prepared.insert(0, 'open', df['open'].to_numpy(dtype=np.float64))
+        
+        # Indicators derived element-wise, for reference only
+        prepared['price_change'] = prepared['close'].pct_change()
+        prepared['high_volume'] = prepared['volume_ratio'] > self.volume_threshold
+        prepared['price_vs_sma20'] = (prepared['close'] / prepared['sma_20'] - 1) * 100
+        prepared['price_vs_sma50'] = (prepared['close'] / prepared['sma_50'] - 1) * 100
+        prepared['daily_range'] = (prepared['high'] - prepared['low']) / prepared['close']
+        prepared['close_position'] = (prepared['close'] - prepared['low']) / (prepared['high'] - prepared['low'])
+        
+        # Columns nothing in the backtest reads are kept in float32; OHLC and every column
+        # that feeds a threshold or an output stays float64
+        for col in REFERENCE_COLUMNS:
+            prepared[col] = prepared[col].to_numpy(dtype=np.float32)
+        
+        return prepared
+    
+    def _compute_indicators(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        OHLC(V) and indicator columns as float arrays, computed straight from df's columns
+        (no copy of the frame, no column inserts)
+        """
         # Convert to float to avoid decimal issues
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].astype(float)
-        
-        # Calculate technical indicators
-        df['price_change'] = df['close'].pct_change()
-        df['volume_sma_20'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_sma_20']
-        df['high_volume'] = df['volume_ratio'] > self.volume_threshold
-        
-        # Moving averages
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        
-        # Price relative to moving averages
-        df['price_vs_sma20'] = (df['close'] / df['sma_20'] - 1) * 100
-        df['price_vs_sma50'] = (df['close'] / df['sma_50'] - 1) * 100
-        
-        # Volatility
-        df['atr_14'] = self._calculate_atr(df, 14)
-        df['volatility'] = df['close'].rolling(window=20).std() / df['close'].rolling(window=20).mean()
-        
-        # Range analysis
-        df['daily_range'] = (df['high'] - df['low']) / df['close']
-        df['close_position'] = (df['close'] - df['low']) / (df['high'] - df['low'])
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        n = len(close)
+        
+        if NUMBA_AVAILABLE:
+            # One fused pass for every rolling/EWM indicator
+            (volume_sma_20, sma_20, sma_50, ema_12, ema_26,
+             atr_14, volatility, volatility_mean_20) = _indicator_pass(high, low, close, volume)
+        else:
+            close_series = pd.Series(close)
+            volume_sma_20 = pd.Series(volume).rolling(window=20).mean().to_numpy()
+            sma_20 = close_series.rolling(window=20).mean().to_numpy()
+            sma_50 = close_series.rolling(window=50).mean().to_numpy()
+            ema_12 = close_series.ewm(span=12).mean().to_numpy()
+            ema_26 = close_series.ewm(span=26).mean().to_numpy()
+            atr_14 = self._calculate_atr(high, low, close, 14)
+            volatility = close_series.rolling(window=20).std().to_numpy() / sma_20
+            volatility_mean_20 = _window_nanmean(volatility, PHASE_WINDOW)
+        
+        volume_ratio = volume / volume_sma_20
+        
+        # Trailing-window features for the daily phase analysis (row i covers rows
+        # i - PHASE_WINDOW + 1 .. i, the window the backtest sees on day i)
+        first_close = np.full(n, np.nan)
+        first_close[PHASE_WINDOW - 1:] = close[:max(n - PHASE_WINDOW + 1, 0)]
+        price_trend_20 = (close - first_close) / first_close
+        volume_ratio_mean_20 = _window_nanmean(volume_ratio, PHASE_WINDOW)
+        
+        # Pivot lows/highs: strictly below/above the 5 bars on either side (window
+        # minima/maxima skip NaN like pandas' min/max). Whether a bar is a pivot only
+        # depends on its neighbours, so the masks hold for every backtest day
+        is_pivot_low = np.zeros(n, dtype=bool)
+        is_pivot_high = np.zeros(n, dtype=bool)
+        if n >= 11:
+            window_low = np.fmin.reduce(sliding_window_view(low, 5), axis=1)
+            window_high = np.fmax.reduce(sliding_window_view(high, 5), axis=1)
+            center = slice(5, n - 5)
+            is_pivot_low[center] = (low[center] < window_low[:-6]) & (low[center] < window_low[6:])
+            is_pivot_high[center] = (high[center] > window_high[:-6]) & (high[center] > window_high[6:])
         
-        return df
+        return {
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'volume_sma_20': volume_sma_20,
+            'volume_ratio': volume_ratio,
+            'sma_20': sma_20,
+            'sma_50': sma_50,
+            'ema_12': ema_12,
+            'ema_26': ema_26,
+            'atr_14': atr_14,
+            'volatility': volatility,
+            'price_trend_20': price_trend_20,
+            'volume_ratio_mean_20': volume_ratio_mean_20,
+            'volatility_mean_20': volatility_mean_20,
+            'is_pivot_low': is_pivot_low,
+            'is_pivot_high': is_pivot_high
+        }
     
-    def _calculate_atr(self, df: pd.DataFrame, period: int) -> pd.Series:
+    def _calculate_atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
         """Calculate Average True Range"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
+        prev_close = pd.Series(close).shift().to_numpy()
+        high_low = high - low
+        high_close = np.abs(high - prev_close)
+        low_close = np.abs(low - prev_close)
         
         true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        return true_range.rolling(window=period).mean()
+        return pd.Series(true_range).rolling(window=period).mean().to_numpy()
     
-    def _analyze_current_phase(self, df: pd.DataFrame) -> Dict:
-        """Analyze current Wyckoff phase based on recent data"""
-        if len(df) < 20:
-            return {
-                'phase': WyckoffPhase.MARKUP,
-                'confidence': 0.5,
-                'price_trend': 0.0,
-                'volume_trend': 1.0,
-                'volatility': 0.0
-            }
+    def _analyze_current_phase(self, arrays: BacktestArrays, i: int) -> PhaseInfo:
+        """Analyze the Wyckoff phase on day i from the trailing PHASE_WINDOW days"""
+        if i + 1 < PHASE_WINDOW:
+            return PhaseInfo(_MARKUP, 0.5, 0.0, 1.0, 0.0, arrays.close[i])
         
-        recent_data = df.tail(20)  # Last 20 days
-        current_price = df['close'].iloc[-1]
+        current_price = arrays.close[i]
         
-        # Analyze price action
-        price_trend = (recent_data['close'].iloc[-1] - recent_data['close'].iloc[0]) / recent_data['close'].iloc[0]
-        volume_trend = recent_data['volume_ratio'].mean()
-        volatility = recent_data['volatility'].mean()
+        # Analyze price action (precomputed trailing-window features)
+        price_trend = arrays.price_trend[i]
+        volume_trend = arrays.volume_trend[i]
+        volatility = arrays.volatility[i]
         
         # Determine phase based on Wyckoff principles
         if abs(price_trend) < 0.02 and volume_trend > 1.2:
-            phase = WyckoffPhase.ACCUMULATION
+            phase = _ACCUMULATION
             confidence = 0.8
         elif abs(price_trend) < 0.02 and volume_trend < 0.8:
-            phase = WyckoffPhase.DISTRIBUTION
+            phase = _DISTRIBUTION
             confidence = 0.8
         elif price_trend > 0.05 and volume_trend > 1.1:
-            phase = WyckoffPhase.MARKUP
+            phase = _MARKUP
             confidence = 0.9
         elif price_trend < -0.05:
-            phase = WyckoffPhase.MARKDOWN
+            phase = _MARKDOWN
             confidence = 0.9
         else:
-            phase = WyckoffPhase.MARKUP
+            phase = _MARKUP
             confidence = 0.6
         
-        return {
-            'phase': phase,
-            'confidence': confidence,
-            'price_trend': price_trend,
-            'volume_trend': volume_trend,
-            'volatility': volatility,
-            'price': current_price
-        }
-    
-    def _generate_signal(self, df: pd.DataFrame, phase_analysis: Dict, date: datetime) -> WyckoffSignal:
-        """Generate Wyckoff trading signal"""
-        phase = phase_analysis['phase']
-        confidence = phase_analysis['confidence']
-        price = phase_analysis['price']
-        volume_trend = phase_analysis['volume_trend']
-        
-        # Determine action based on Wyckoff phase
-        if phase == WyckoffPhase.ACCUMULATION:
-            if volume_trend > 1.5:
-                action = TradeAction.BUY
-                reasoning = "High volume accumulation - institutional buying"
-            else:
-                action = TradeAction.HOLD
-                reasoning = "Accumulation phase - waiting for volume confirmation"
-        elif phase == WyckoffPhase.DISTRIBUTION:
-            if volume_trend > 1.5:
-                action = TradeAction.SELL
-                reasoning = "High volume distribution - institutional selling"
-            else:
-                action = TradeAction.HOLD
-                reasoning = "Distribution phase - waiting for volume confirmation"
-        elif phase == WyckoffPhase.MARKUP:
-            action = TradeAction.BUY
-            reasoning = "Strong uptrend with volume confirmation"
-        elif phase == WyckoffPhase.MARKDOWN:
-            action = TradeAction.SELL
-            reasoning = "Downtrend phase - avoid long positions"
-        else:
-            action = TradeAction.HOLD
-            reasoning = "Markup phase - uptrend continuation"
-        
-        # Calculate support/resistance levels
-        support, resistance = self._calculate_support_resistance(df)
-        
-        return WyckoffSignal(
-            date=date,
-            phase=phase,
-            action=action,
-            price=price,
-            volume_ratio=volume_trend,
-            confidence=confidence,
-            reasoning=reasoning,
-            support_level=support,
-            resistance_level=resistance
-        )
+        return PhaseInfo(phase, confidence, price_trend, volume_trend, volatility, current_price)
     
-    def _calculate_support_resistance(self, df: pd.DataFrame) -> Tuple[Optional[float], Optional[float]]:
-        """Calculate support and resistance levels"""
-        if len(df) < 50:
-            return None, None
-        
-        # Look for pivot highs and lows in recent data
-        recent_data = df.tail(50)
-        
-        # Find pivot lows (support)
-        pivot_lows = []
-        for i in range(5, len(recent_data) - 5):
-            if (recent_data['low'].iloc[i] < recent_data['low'].iloc[i-5:i].min() and 
-                recent_data['low'].iloc[i] < recent_data['low'].iloc[i+1:i+6].min()):
-                pivot_lows.append(recent_data['low'].iloc[i])
-        
-        # Find pivot highs (resistance)
-        pivot_highs = []
-        for i in range(5, len(recent_data) - 5):
-            if (recent_data['high'].iloc[i] > recent_data['high'].iloc[i-5:i].max() and 
-                recent_data['high'].iloc[i] > recent_data['high'].iloc[i+1:i+6].max()):
-                pivot_highs.append(recent_data['high'].iloc[i])
-        
-        # Get nearest levels
-        current_price = recent_data['close'].iloc[-1]
-        
-        support = None
-        resistance = None
-        
-        if pivot_lows:
-            support = max([p for p in pivot_lows if p < current_price], default=None)
-        
-        if pivot_highs:
-            resistance = min([p for p in pivot_highs if p > current_price], default=None)
-        
-        return support, resistance
-    
-    def _enter_position(self, signal: WyckoffSignal, current_data: pd.Series) -> Optional[Trade]:
-        """Enter a new position based on signal"""
-        if signal.action == TradeAction.HOLD:
-            return None
-        
-        # Calculate position size
-        position_value = self.current_capital * self.position_size_percent
-        shares = int(position_value / signal.price)
-        
-        if shares <= 0:
-            return None
-        
-        # Calculate stop loss and take profit levels
-        if signal.action == TradeAction.BUY:
-            stop_loss = signal.price * (1 - self.stop_loss_percent)
-            take_profit = signal.price * (1 + self.take_profit_percent)
-        else:  # SELL (short)
-            stop_loss = signal.price * (1 + self.stop_loss_percent)
-            take_profit = signal.price * (1 - self.take_profit_percent)
-        
-        return Trade(
-            symbol="",  # Will be set by caller
-            entry_date=signal.date,
-            exit_date=None,
-            entry_price=signal.price,
-            exit_price=None,
-            action=signal.action,
-            shares=shares,
-            entry_phase=signal.phase,
-            exit_phase=None,
-            entry_reasoning=signal.reasoning
-        )
+    def _write_signal(self, signals: SignalBuffer, k: int, phase_analysis: PhaseInfo):
+        """Write the Wyckoff trading signal of a day into slot k of signals (support and
+        resistance levels are filled in for all days at once, by _support_resistance)"""
+        phase = phase_analysis.phase
+        volume_trend = phase_analysis.volume_trend
+        
+        # Determine action based on Wyckoff phase (SIGNAL_RULES)
+        confirmed = int(volume_trend > 1.5)
+        
+        signals.phase[k] = phase
+        signals.action[k] = SIGNAL_ACTION_CODES[phase, confirmed]
+        signals.price[k] = phase_analysis.price
+        signals.volume_ratio[k] = volume_trend
+        signals.confidence[k] = phase_analysis.confidence
+        signals.reasoning[k] = SIGNAL_REASONING_CODES[phase, confirmed]
     
-    def _update_position(self, position: Trade, df: pd.DataFrame, signal: WyckoffSignal) -> Trade:
-        """Update existing position with current signal"""
-        # Position is updated in place, just return it
-        return position
-    
-    def _should_exit_position(self, position: Trade, df: pd.DataFrame, signal: WyckoffSignal) -> bool:
-        """Determine if position should be exited"""
-        current_price = df['close'].iloc[-1]
-        days_held = (signal.date - position.entry_date).days
-        
-        # Time-based exit
-        if days_held >= self.max_trade_duration:
-            return True
-        
-        # Stop loss / Take profit
-        if position.action == TradeAction.BUY:
-            if current_price <= position.entry_price * (1 - self.stop_loss_percent):
-                return True
-            if current_price >= position.entry_price * (1 + self.take_profit_percent):
-                return True
-        else:  # SELL (short)
-            if current_price >= position.entry_price * (1 + self.stop_loss_percent):
-                return True
-            if current_price <= position.entry_price * (1 - self.take_profit_percent):
-                return True
-        
-        # Phase-based exit
-        if position.action == TradeAction.BUY and signal.phase == WyckoffPhase.DISTRIBUTION:
-            return True
-        if position.action == TradeAction.SELL and signal.phase == WyckoffPhase.ACCUMULATION:
-            return True
-        
-        return False
-    
-    def _close_position(self, position: Trade, current_data: pd.Series, signal: WyckoffSignal) -> Trade:
-        """Close existing position"""
-        current_price = current_data['close']
-        
-        # Calculate P&L
-        if position.action == TradeAction.BUY:
-            pnl = (current_price - position.entry_price) * position.shares
-        else:  # SELL (short)
-            pnl = (position.entry_price - current_price) * position.shares
-        
-        pnl_percent = (pnl / (position.entry_price * position.shares)) * 100
-        duration_days = (signal.date - position.entry_date).days
-        
-        # Update capital
-        self.current_capital += pnl
-        
-        # Update position
-        position.exit_date = signal.date
-        position.exit_price = current_price
-        position.exit_phase = signal.phase
-        position.pnl = pnl
-        position.pnl_percent = pnl_percent
-        position.duration_days = duration_days
-        position.exit_reasoning = signal.reasoning
-        
-        return position
-    
-    def _calculate_portfolio_value(self, position: Trade, current_data: pd.Series) -> float:
-        """Calculate current portfolio value"""
-        if not position:
-            return self.current_capital
-        
-        current_price = current_data['close']
-        
-        if position.action == TradeAction.BUY:
-            unrealized_pnl = (current_price - position.entry_price) * position.shares
-        else:  # SELL (short)
-            unrealized_pnl = (position.entry_price - current_price) * position.shares
-        
-        return self.current_capital + unrealized_pnl
-    
-    def _calculate_performance_metrics(self, trades: List[Trade], equity_curve: List[Tuple[datetime, float]]) -> Dict:
-        """Calculate comprehensive performance metrics"""
+    def _calculate_performance_metrics(self, trades: List[Trade], equity: np.ndarray) -> Dict:
+        """Calculate comprehensive performance metrics from the trades and the daily portfolio values"""
         if not trades:
             return {
                 'total_return': 0.0,
@@ -488,51 +1006,38 @@ class WyckoffBacktestEngine:
             }
         
         # Basic metrics
+        pnl = np.array([t.pnl for t in trades], dtype=np.float64)
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
         total_trades = len(trades)
-        winning_trades = len([t for t in trades if t.pnl and t.pnl > 0])
-        losing_trades = len([t for t in trades if t.pnl and t.pnl < 0])
+        winning_trades = len(wins)
+        losing_trades = len(losses)
         
         # Returns
-        final_value = equity_curve[-1][1] if equity_curve else self.initial_capital
+        final_value = equity[-1] if len(equity) else self.initial_capital
         total_return = final_value - self.initial_capital
         total_return_percent = (total_return / self.initial_capital) * 100
         
         # Win/Loss analysis
-        wins = [t.pnl for t in trades if t.pnl and t.pnl > 0]
-        losses = [t.pnl for t in trades if t.pnl and t.pnl < 0]
-        
-        avg_win = np.mean(wins) if wins else 0
-        avg_loss = np.mean(losses) if losses else 0
+        avg_win = wins.mean() if len(wins) else 0
+        avg_loss = losses.mean() if len(losses) else 0
         win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
         
         # Profit factor
-        gross_profit = sum(wins) if wins else 0
-        gross_loss = abs(sum(losses)) if losses else 0
+        gross_profit = wins.sum()
+        gross_loss = abs(losses.sum())
         profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf') if gross_profit > 0 else 0
         
-        # Drawdown calculation
-        equity_values = [value for _, value in equity_curve]
-        peak = equity_values[0]
-        max_drawdown = 0
-        
-        for value in equity_values:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-        
+        # Drawdown from the running peak
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = ((peak - equity) / peak).max(initial=0)
         max_drawdown_percent = max_drawdown * 100
         
         # Sharpe ratio (simplified)
-        if len(equity_values) > 1:
-            returns = [equity_values[i] / equity_values[i-1] - 1 for i in range(1, len(equity_values))]
-            if returns:
-                avg_return = np.mean(returns)
-                std_return = np.std(returns)
-                sharpe_ratio = (avg_return / std_return) * np.sqrt(252) if std_return > 0 else 0
-            else:
-                sharpe_ratio = 0
+        if len(equity) > 1:
+            returns = equity[1:] / equity[:-1] - 1
+            std_return = returns.std()
+            sharpe_ratio = (returns.mean() / std_return) * np.sqrt(252) if std_return > 0 else 0
         else:
             sharpe_ratio = 0
         
@@ -551,43 +1056,73 @@ class WyckoffBacktestEngine:
             'sharpe_ratio': sharpe_ratio
         }
     
-    def _analyze_phases(self, signals: List[WyckoffSignal]) -> Dict:
+    def _analyze_phases(self, signals: SignalBuffer) -> Dict:
         """Analyze Wyckoff phases throughout the backtest"""
-        if not signals:
+        if not len(signals):
             return {}
         
-        phase_counts = {}
-        phase_durations = {}
-        phase_performance = {}
-        
-        current_phase = None
-        phase_start = None
-        
-        for signal in signals:
-            if signal.phase != current_phase:
-                # Phase change
-                if current_phase and phase_start:
-                    duration = (signal.date - phase_start).days
-                    phase_name = current_phase.value
-                    
-                    if phase_name not in phase_durations:
-                        phase_durations[phase_name] = []
-                    phase_durations[phase_name].append(duration)
-                
-                current_phase = signal.phase
-                phase_start = signal.date
-            
-            # Count phases
-            phase_name = signal.phase.value
-            phase_counts[phase_name] = phase_counts.get(phase_name, 0) + 1
+        # Runs of consecutive days in the same phase
+        codes = signals.phase
+        run_starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+        run_phases = codes[run_starts]
+        
+        # Phase counts, keyed in order of first appearance
+        counts = np.bincount(codes, minlength=len(PHASES))
+        phase_counts = {PHASES[code].value: int(counts[code]) for code in _first_seen(run_phases)}
+        
+        # A run's duration is the days from its start to the start of the next run, so
+        # the last (unfinished) run has none
+        start_ns = signals.dates.to_numpy(dtype='datetime64[ns]').view(np.int64)[run_starts]
+        durations = np.diff(start_ns) // NS_PER_DAY
+        ended_phases = run_phases[:-1]
+        duration_sums = np.bincount(ended_phases, weights=durations, minlength=len(PHASES))
+        duration_counts = np.bincount(ended_phases, minlength=len(PHASES))
         
         # Calculate average durations
-        avg_durations = {}
-        for phase, durations in phase_durations.items():
-            avg_durations[phase] = np.mean(durations) if durations else 0
+        avg_durations = {
+            PHASES[code].value: np.float64(duration_sums[code] / duration_counts[code])
+            for code in _first_seen(ended_phases)
+        }
         
         return {
             'phase_counts': phase_counts,
             'avg_durations': avg_durations,
             'total_signals': len(signals)
         }
+
+
+def _warm_up_kernels(n: int = 64) -> None:
+    """
+    Call each jitted kernel once on a tiny synthetic series, with the argument types
+    run_backtest passes, so the first real backtest (e.g. the first API request) doesn't
+    pay for compiling or loading them from the numba cache. Price arrays come out of
+    pandas read-only for float columns and writable for converted (Decimal, integer)
+    ones, which numba compiles separately, so both kinds are warmed.
+    """
+    engine = WyckoffBacktestEngine()
+    days = n - 30
+    phase = np.repeat(np.arange(len(PHASES), dtype=np.int8), days // len(PHASES) + 1)[:days]
+    action = SIGNAL_ACTION_CODES[phase, 1]
+    pivots = np.arange(5, n, 10, dtype=np.int64)
+    date_ns = np.arange(n, dtype=np.int64) * NS_PER_DAY
+    
+    for writable in (True, False):
+        close = 100.0 + np.cumsum(np.sin(np.arange(n, dtype=np.float64)))
+        high = close + 1.0
+        low = close - 1.0
+        for prices in (close, high, low):
+            prices.flags.writeable = writable
+        
+        for volume_writable in (True, False):
+            volume = np.full(n, 1e6)
+            volume.flags.writeable = volume_writable
+            _indicator_pass(high, low, close, volume)
+        _support_resistance(close, low, high, pivots, pivots, 30)
+        _simulate_trades(
+            close, date_ns, phase, action,
+            30, float(engine.initial_capital), engine.position_size_percent,
+            engine.stop_loss_percent, engine.take_profit_percent, engine.max_trade_duration
+        )
+
+if NUMBA_AVAILABLE and os.environ.get('WYCKOFF_WARMUP', '1') == '1':
+    _warm_up_kernels()
@@ -2,99 +2,105 @@
 Test script for the Flask API
 """
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import json
 import time
 
 BASE_URL = "http://localhost:5001"
 
+# One pooled keep-alive session for every request instead of a new connection per call
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
 def test_health_check():
     """Test health check endpoint"""
-    print("Testing health check...")
-    response = requests.get(f"{BASE_URL}/health")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
-    print()
+    report = ["Testing health check..."]
+    response = session.get(f"{BASE_URL}/health")
+    report.append(f"Status: {response.status_code}")
+    report.append(f"Response: {response.json()}")
+    return "\n".join(report) + "\n"
 
 def test_api_info():
     """Test API info endpoint"""
-    print("Testing API info...")
-    response = requests.get(f"{BASE_URL}/api")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    report = ["Testing API info..."]
+    response = session.get(f"{BASE_URL}/api")
+    report.append(f"Status: {response.status_code}")
+    report.append(f"Response: {json.dumps(response.json(), indent=2)}")
+    return "\n".join(report) + "\n"
 
 def test_sync_symbols():
     """Test syncing symbols from file"""
-    print("Testing symbol sync...")
-    response = requests.post(f"{BASE_URL}/api/stocks/sync", 
-                           json={"filename": "../../get_stock_data/stock_symbols.txt"})
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    report = ["Testing symbol sync..."]
+    response = session.post(f"{BASE_URL}/api/stocks/sync", 
+                          json={"filename": "../../get_stock_data/stock_symbols.txt"})
+    report.append(f"Status: {response.status_code}")
+    report.append(f"Response: {json.dumps(response.json(), indent=2)}")
+    return "\n".join(report) + "\n"
 
 def test_get_all_symbols():
     """Test getting all symbols"""
-    print("Testing get all symbols...")
-    response = requests.get(f"{BASE_URL}/api/stocks/")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    report = ["Testing get all symbols..."]
+    response = session.get(f"{BASE_URL}/api/stocks/")
+    report.append(f"Status: {response.status_code}")
+    report.append(f"Response: {json.dumps(response.json(), indent=2)}")
+    return "\n".join(report) + "\n"
 
 def test_fetch_single_stock():
     """Test fetching data for a single stock"""
-    print("Testing fetch single stock (AAPL)...")
-    response = requests.post(f"{BASE_URL}/api/stocks/AAPL/fetch", 
-                           json={"period": "1y"})
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    report = ["Testing fetch single stock (AAPL)..."]
+    response = session.post(f"{BASE_URL}/api/stocks/AAPL/fetch", 
+                          json={"period": "1y"})
+    report.append(f"Status: {response.status_code}")
+    report.append(f"Response: {json.dumps(response.json(), indent=2)}")
+    return "\n".join(report) + "\n"
 
 def test_get_stock_data():
     """Test getting stock data"""
-    print("Testing get stock data for AAPL...")
-    response = requests.get(f"{BASE_URL}/api/stocks/AAPL")
-    print(f"Status: {response.status_code}")
+    report = ["Testing get stock data for AAPL..."]
+    response = session.get(f"{BASE_URL}/api/stocks/AAPL")
+    report.append(f"Status: {response.status_code}")
     data = response.json()
     if data['success']:
-        print(f"Found {data['count']} records for AAPL")
+        report.append(f"Found {data['count']} records for AAPL")
         if data['data']:
-            print(f"Latest record: {data['data'][0]}")
+            report.append(f"Latest record: {data['data'][0]}")
     else:
-        print(f"Error: {data['error']}")
-    print()
+        report.append(f"Error: {data['error']}")
+    return "\n".join(report) + "\n"
 
 def test_get_latest_data():
     """Test getting latest data for all stocks"""
-    print("Testing get latest data...")
-    response = requests.get(f"{BASE_URL}/api/stocks/latest")
-    print(f"Status: {response.status_code}")
+    report = ["Testing get latest data..."]
+    response = session.get(f"{BASE_URL}/api/stocks/latest")
+    report.append(f"Status: {response.status_code}")
     data = response.json()
     if data['success']:
-        print(f"Found latest data for {data['count']} stocks")
+        report.append(f"Found latest data for {data['count']} stocks")
         for stock in data['data'][:3]:  # Show first 3
-            print(f"  {stock['symbol']}: ${stock['close']} on {stock['date']}")
+            report.append(f"  {stock['symbol']}: ${stock['close']} on {stock['date']}")
     else:
-        print(f"Error: {data['error']}")
-    print()
+        report.append(f"Error: {data['error']}")
+    return "\n".join(report) + "\n"
 
 def main():
     """Run all tests"""
     print("=== KyzerEye Stock API Tests ===\n")
     
     try:
-        # Test basic endpoints
-        test_health_check()
-        test_api_info()
-        
-        # Test symbol operations
-        test_sync_symbols()
-        test_get_all_symbols()
-        
-        # Test data operations
-        test_fetch_single_stock()
-        time.sleep(2)  # Give it time to process
-        test_get_stock_data()
-        test_get_latest_data()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            # Test basic endpoints (independent reads, run concurrently)
+            for report in pool.map(lambda test: test(), [test_health_check, test_api_info]):
+                print(report)
+            
+            # Test symbol and data writes, in order
+            print(test_sync_symbols())
+            print(test_fetch_single_stock())
+            time.sleep(2)  # Give it time to process
+            
+            # Read back what the writes stored
+            for report in pool.map(lambda test: test(), [test_get_all_symbols, test_get_stock_data, test_get_latest_data]):
+                print(report)
         
         print("=== All tests completed ===")
         
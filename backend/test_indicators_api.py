@@ -3,133 +3,183 @@
 Test script for Technical Indicators API
 """
 
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # API base URL
 BASE_URL = "http://localhost:5001"
 
-def test_indicators_api():
-    """Test the indicators API endpoints"""
-    print("🧪 Testing Technical Indicators API")
-    print("=" * 50)
-    
-    # Test 1: Get enabled indicators
-    print("\n1. Testing GET /api/indicators/")
+# One pooled keep-alive session for every request instead of a new connection per call
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=10,
+                                     max_retries=Retry(total=2, backoff_factor=0.2)))
+session.headers["Connection"] = "keep-alive"
+
+def check_enabled_indicators():
+    """Test 1: get enabled indicators"""
+    report = ["\n1. Testing GET /api/indicators/"]
     try:
-        response = requests.get(f"{BASE_URL}/api/indicators/")
+        response = session.get(f"{BASE_URL}/api/indicators/")
         if response.status_code == 200:
             data = response.json()
-            print(f"✅ Success: {data['count']} enabled indicators")
-            print(f"   Indicators: {', '.join(data['enabled_indicators'])}")
+            report.append(f"✅ Success: {data['count']} enabled indicators")
+            report.append(f"   Indicators: {', '.join(data['enabled_indicators'])}")
         else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
+            report.append(f"❌ Failed: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    # Test 2: Get indicators configuration
-    print("\n2. Testing GET /api/indicators/config")
+        report.append(f"❌ Error: {e}")
+    return "\n".join(report)
+
+def check_indicators_config():
+    """Test 2: get indicators configuration"""
+    report = ["\n2. Testing GET /api/indicators/config"]
     try:
-        response = requests.get(f"{BASE_URL}/api/indicators/config")
+        response = session.get(f"{BASE_URL}/api/indicators/config")
         if response.status_code == 200:
             data = response.json()
-            print("✅ Success: Retrieved indicators configuration")
-            print(f"   Available indicators: {len(data['config'])}")
+            report.append("✅ Success: Retrieved indicators configuration")
+            report.append(f"   Available indicators: {len(data['config'])}")
         else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
+            report.append(f"❌ Failed: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    # Test 3: Get indicators for a specific symbol (if data exists)
-    print("\n3. Testing GET /api/indicators/AAPL")
+        report.append(f"❌ Error: {e}")
+    return "\n".join(report)
+
+def check_symbol_indicators():
+    """Test 3: get indicators for a specific symbol (if data exists)"""
+    report = ["\n3. Testing GET /api/indicators/AAPL"]
     try:
-        response = requests.get(f"{BASE_URL}/api/indicators/AAPL")
+        response = session.get(f"{BASE_URL}/api/indicators/AAPL")
         if response.status_code == 200:
             data = response.json()
-            print(f"✅ Success: Found {data['count']} indicator records for AAPL")
+            report.append(f"✅ Success: Found {data['count']} indicator records for AAPL")
         elif response.status_code == 404:
-            print("⚠️  No indicators found for AAPL (this is expected if not calculated yet)")
+            report.append("⚠️  No indicators found for AAPL (this is expected if not calculated yet)")
         else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
+            report.append(f"❌ Failed: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    # Test 4: Calculate indicators for a specific symbol
-    print("\n4. Testing POST /api/indicators/AAPL/calculate")
+        report.append(f"❌ Error: {e}")
+    return "\n".join(report)
+
+def check_calculate_symbol():
+    """Test 4: calculate indicators for a specific symbol"""
+    report = ["\n4. Testing POST /api/indicators/AAPL/calculate"]
     try:
-        response = requests.post(f"{BASE_URL}/api/indicators/AAPL/calculate")
+        response = session.post(f"{BASE_URL}/api/indicators/AAPL/calculate")
         if response.status_code == 200:
             data = response.json()
-            print(f"✅ Success: {data['message']}")
-            print(f"   Data points processed: {data['data_points']}")
+            report.append(f"✅ Success: {data['message']}")
+            report.append(f"   Data points processed: {data['data_points']}")
         elif response.status_code == 404:
-            print("⚠️  No stock data found for AAPL")
+            report.append("⚠️  No stock data found for AAPL")
         else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
+            report.append(f"❌ Failed: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    # Test 5: Get latest indicators for a symbol
-    print("\n5. Testing GET /api/indicators/latest/AAPL")
+        report.append(f"❌ Error: {e}")
+    return "\n".join(report)
+
+def check_latest_indicators():
+    """Test 5: get latest indicators for a symbol"""
+    report = ["\n5. Testing GET /api/indicators/latest/AAPL"]
     try:
-        response = requests.get(f"{BASE_URL}/api/indicators/latest/AAPL")
+        response = session.get(f"{BASE_URL}/api/indicators/latest/AAPL")
         if response.status_code == 200:
             data = response.json()
-            print(f"✅ Success: Found {data['count']} latest indicator values for AAPL")
+            report.append(f"✅ Success: Found {data['count']} latest indicator values for AAPL")
         elif response.status_code == 404:
-            print("⚠️  No latest indicators found for AAPL")
+            report.append("⚠️  No latest indicators found for AAPL")
         else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
+            report.append(f"❌ Failed: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    # Test 6: Test indicators with parameters
-    print("\n6. Testing GET /api/indicators/AAPL?indicator=RSI&limit=5")
+        report.append(f"❌ Error: {e}")
+    return "\n".join(report)
+
+def check_batch_indicators():
+    """Test 6: test indicators with parameters, for several symbols in one request"""
+    report = ["\n6. Testing POST /api/indicators/batch (RSI and MACD, limit 5)"]
     try:
-        response = requests.get(f"{BASE_URL}/api/indicators/AAPL?indicator=RSI&limit=5")
+        response = session.post(f"{BASE_URL}/api/indicators/batch",
+                                json={"symbols": ["AAPL", "MSFT", "GOOGL"], "indicators": ["RSI", "MACD"], "limit": 5})
         if response.status_code == 200:
             data = response.json()
-            print(f"✅ Success: Found {data['count']} RSI records for AAPL")
-        elif response.status_code == 404:
-            print("⚠️  No RSI data found for AAPL")
+            for symbol, count in data['counts'].items():
+                report.append(f"✅ Success: Found {count} RSI/MACD records for {symbol}")
         else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
+            report.append(f"❌ Failed: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"❌ Error: {e}")
+        report.append(f"❌ Error: {e}")
+    return "\n".join(report)
 
-def test_calculate_all_indicators():
-    """Test calculating indicators for all symbols"""
-    print("\n7. Testing POST /api/indicators/calculate-all")
+def test_indicators_api():
+    """Test the indicators API endpoints"""
+    print("🧪 Testing Technical Indicators API")
+    print("=" * 50)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Independent reads run concurrently; reports print in test order
+        for report in pool.map(lambda check: check(), [check_enabled_indicators, check_indicators_config, check_symbol_indicators]):
+            print(report)
+        
+        # Reads of calculated indicators wait for the calculation
+        print(check_calculate_symbol())
+        for report in pool.map(lambda check: check(), [check_latest_indicators, check_batch_indicators]):
+            print(report)
+
+def calculate_symbol(symbol):
+    """POST /api/indicators/<symbol>/calculate; returns (symbol, data points or None)"""
     try:
-        response = requests.post(f"{BASE_URL}/api/indicators/calculate-all")
+        response = session.post(f"{BASE_URL}/api/indicators/{symbol}/calculate")
         if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Success: {data['message']}")
-            results = data['results']
-            print(f"   Total symbols: {results['total_symbols']}")
-            print(f"   Successful: {len(results['success'])}")
-            print(f"   Failed: {len(results['failed'])}")
-            
-            if results['success']:
-                print("   Successful symbols:")
-                for symbol_data in results['success'][:5]:  # Show first 5
-                    print(f"     - {symbol_data['symbol']}: {symbol_data['data_points']} points")
-        else:
+            return symbol, response.json()['data_points']
+    except Exception as e:
+        print(f"   ⚠️  {symbol}: {e}")
+    return symbol, None
+
+def test_calculate_all_indicators():
+    """Test calculating indicators for all symbols, one concurrent request per symbol"""
+    print("\n7. Testing POST /api/indicators/<symbol>/calculate for all symbols (concurrently)")
+    try:
+        response = session.get(f"{BASE_URL}/api/stocks/")
+        if response.status_code != 200:
             print(f"❌ Failed: {response.status_code} - {response.text}")
+            return
+        symbols = [row['symbol'] for row in response.json()['data']]
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(calculate_symbol, symbols))
+        
+        success = [(symbol, points) for symbol, points in results if points is not None]
+        failed = [symbol for symbol, points in results if points is None]
+        print(f"✅ Success: Processed {len(symbols)} symbols")
+        print(f"   Total symbols: {len(symbols)}")
+        print(f"   Successful: {len(success)}")
+        print(f"   Failed: {len(failed)}")
+        
+        if success:
+            print("   Successful symbols:")
+            for symbol, points in success[:5]:  # Show first 5
+                print(f"     - {symbol}: {points} points")
     except Exception as e:
         print(f"❌ Error: {e}")
 
 def main():
     """Main test function"""
+    parser = argparse.ArgumentParser(description="Test the Technical Indicators API")
+    parser.add_argument('--calculate-all', action='store_true',
+                        help="also calculate indicators for every symbol (this may take a while)")
+    args = parser.parse_args()
+    
     print("🚀 Starting Indicators API Tests...")
     
     # Test basic indicators API
     test_indicators_api()
     
-    # Ask user if they want to test calculate-all (this can take a while)
-    print("\n" + "=" * 50)
-    response = input("Test calculate-all indicators? This may take a while (y/N): ")
-    if response.lower() in ['y', 'yes']:
+    if args.calculate_all:
+        print("\n" + "=" * 50)
         test_calculate_all_indicators()
     
     print("\n🎉 Indicators API testing completed!")
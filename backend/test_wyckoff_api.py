@@ -4,11 +4,19 @@ Test script for Wyckoff Analysis API endpoints
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from datetime import datetime
 
 BASE_URL = "http://localhost:5001"
 
+# One pooled keep-alive session for every request instead of a new connection per call
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=10,
+                                     max_retries=Retry(total=2, backoff_factor=0.2)))
+session.headers["Connection"] = "keep-alive"
+
 def test_wyckoff_api():
     """Test Wyckoff Analysis API endpoints"""
     print("🔍 Wyckoff Analysis API Tests")
@@ -17,7 +25,7 @@ def test_wyckoff_api():
     # Test 1: Get Wyckoff API info
     print("Testing Wyckoff API info...")
     try:
-        response = requests.get(f"{BASE_URL}/api/wyckoff/")
+        response = session.get(f"{BASE_URL}/api/wyckoff/")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -33,7 +41,7 @@ def test_wyckoff_api():
     # Test 2: Get quick Wyckoff report
     print("Testing quick Wyckoff report...")
     try:
-        response = requests.get(f"{BASE_URL}/api/wyckoff/report")
+        response = session.get(f"{BASE_URL}/api/wyckoff/report")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -55,7 +63,7 @@ def test_wyckoff_api():
     # Test 3: Analyze specific symbol (AAPL)
     print("Testing Wyckoff analysis for AAPL...")
     try:
-        response = requests.post(f"{BASE_URL}/api/wyckoff/AAPL/analyze")
+        response = session.post(f"{BASE_URL}/api/wyckoff/AAPL/analyze")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -75,7 +83,7 @@ def test_wyckoff_api():
     # Test 4: Get phases for AAPL
     print("Testing Wyckoff phases for AAPL...")
     try:
-        response = requests.get(f"{BASE_URL}/api/wyckoff/AAPL/phases")
+        response = session.get(f"{BASE_URL}/api/wyckoff/AAPL/phases")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -96,7 +104,7 @@ def test_wyckoff_api():
     # Test 5: Get signals for AAPL
     print("Testing Wyckoff signals for AAPL...")
     try:
-        response = requests.get(f"{BASE_URL}/api/wyckoff/AAPL/signals")
+        response = session.get(f"{BASE_URL}/api/wyckoff/AAPL/signals")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
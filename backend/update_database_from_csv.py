@@ -6,16 +6,151 @@ Read 3-year CSV data and update the database
 
 import sys
 import os
+import argparse
+import multiprocessing
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(__file__))
 
 from utils.database import get_db_connection
 
-def update_database_from_csv():
-    """Update database with 3-year CSV data"""
+INSERT_BATCH_SIZE = 5000  # rows per CSV chunk and multi-row INSERT
+MAX_WORKERS = 4  # symbols loaded at once, each worker holding one database connection
+CSV_DTYPES = {'Open': 'float64', 'High': 'float64', 'Low': 'float64', 'Close': 'float64', 'Volume': 'float64'}
+
+def build_rows(symbol_id, df):
+    """
+    daily_stock_data parameter tuples for the rows of df, built column-wise.
+    Rows with a missing date, price or volume can't be stored and are left out;
+    returns (rows, number of rows left out).
+    """
+    complete = df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']].notna().all(axis=1).to_numpy()
+    skipped = int((~complete).sum())
+    if skipped:
+        df = df[complete]
+    
+    prices = df[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64)
+    rows = list(zip(
+        repeat(symbol_id),
+        df['Date'].dt.date.tolist(),
+        prices[:, 0].tolist(),
+        prices[:, 1].tolist(),
+        prices[:, 2].tolist(),
+        prices[:, 3].tolist(),
+        df['Volume'].to_numpy().astype(np.int64).tolist()
+    ))
+    return rows, skipped
+
+def process_symbol(symbol_data):
+    """
+    Load one symbol's CSV into daily_stock_data over its own database connection
+    (connections can't be shared with worker processes). When symbol_data has a
+    latest_date, only rows from that date on are stored: earlier ones are already
+    in the table, and the latest day is rewritten in case it was stored mid-session.
+    Returns (report, number of records stored).
+    """
+    symbol_id = symbol_data['id']
+    symbol = symbol_data['symbol']
+    since = pd.Timestamp(symbol_data['latest_date']) if symbol_data.get('latest_date') else None
+    report = [f"\n📈 Processing {symbol}..."]
+    
+    # Read CSV file
+    csv_path = f"../get_stock_data/csv_files/{symbol}_historical_data.csv"
+    
+    if not os.path.exists(csv_path):
+        report.append(f"  ⚠️  CSV file not found: {csv_path}")
+        return "\n".join(report), 0
+    
+    db = get_db_connection()
+    if not db.connect():
+        report.append(f"  ❌ Error processing {symbol}: failed to connect to database")
+        return "\n".join(report), 0
+    
+    insert_query = """
+        INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            open = VALUES(open),
+            high = VALUES(high),
+            low = VALUES(low),
+            close = VALUES(close),
+            volume = VALUES(volume)
+    """
+    
+    try:
+        # Stream the CSV in chunks so memory stays bounded by the chunk size. Each chunk
+        # goes out as one multi-row INSERT (pymysql's executemany folds the VALUES lists
+        # together), all in one transaction per symbol. The cursor is used directly so a
+        # failed chunk raises and rolls the whole symbol back (execute_many swallows errors)
+        stored_count = 0
+        total_rows = 0
+        skipped_rows = 0
+        stored_before = 0
+        first_date = last_date = None
+        cursor = db.connection.cursor()
+        db.connection.begin()
+        try:
+            for chunk in pd.read_csv(
+                csv_path,
+                usecols=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'],
+                dtype=CSV_DTYPES,
+                parse_dates=['Date'],
+                engine='c',
+                chunksize=INSERT_BATCH_SIZE
+            ):
+                if chunk.empty:
+                    continue
+                total_rows += len(chunk)
+                chunk_first, chunk_last = chunk['Date'].min(), chunk['Date'].max()
+                first_date = chunk_first if first_date is None else min(first_date, chunk_first)
+                last_date = chunk_last if last_date is None else max(last_date, chunk_last)
+                
+                if since is not None:
+                    new = (chunk['Date'] >= since).to_numpy()
+                    stored_before += int((~new).sum())
+                    chunk = chunk[new]
+                    if chunk.empty:
+                        continue
+                
+                rows, skipped = build_rows(symbol_id, chunk)
+                skipped_rows += skipped
+                if rows:
+                    cursor.executemany(insert_query, rows)
+                    # rowcount counts an upsert twice (or not at all if unchanged), so count rows
+                    stored_count += len(rows)
+            db.connection.commit()
+        except Exception:
+            db.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        if total_rows:
+            report.append(f"  📊 CSV Data: {total_rows} rows from {first_date.date()} to {last_date.date()}")
+        if stored_before:
+            report.append(f"  ⏭️  {stored_before} rows before {since.date()} already stored")
+        if skipped_rows:
+            report.append(f"    ⚠️  Skipped {skipped_rows} rows with missing values")
+        
+        report.append(f"  ✅ Stored {stored_count} records for {symbol}")
+        return "\n".join(report), stored_count
+        
+    except Exception as e:
+        report.append(f"  ❌ Error processing {symbol}: {e}")
+        return "\n".join(report), 0
+    finally:
+        db.disconnect()
+
+def update_database_from_csv(full=False):
+    """
+    Update database with 3-year CSV data. Only rows from each symbol's latest
+    stored date on are written, unless full is set.
+    """
     print("🔄 Updating Database with 3-Year CSV Data")
     print("=" * 50)
     
@@ -36,67 +171,22 @@ def update_database_from_csv():
         
         print(f"📊 Found {len(symbols_result)} symbols to update")
         
+        if not full:
+            # Latest stored date of every symbol in one query; each CSV is loaded from there on
+            latest_query = "SELECT symbol_id, MAX(date) as latest_date FROM daily_stock_data GROUP BY symbol_id"
+            latest = {row['symbol_id']: row['latest_date'] for row in db.execute_query(latest_query) or []}
+            for symbol_data in symbols_result:
+                symbol_data['latest_date'] = latest.get(symbol_data['id'])
+        
         total_stored = 0
         
-        for symbol_data in symbols_result:
-            symbol_id = symbol_data['id']
-            symbol = symbol_data['symbol']
-            
-            print(f"\n📈 Processing {symbol}...")
-            
-            # Read CSV file
-            csv_path = f"../get_stock_data/csv_files/{symbol}_historical_data.csv"
-            
-            if not os.path.exists(csv_path):
-                print(f"  ⚠️  CSV file not found: {csv_path}")
-                continue
-            
-            try:
-                # Read CSV data
-                df = pd.read_csv(csv_path)
-                df['Date'] = pd.to_datetime(df['Date'])
-                
-                print(f"  📊 CSV Data: {len(df)} rows from {df['Date'].min().date()} to {df['Date'].max().date()}")
-                
-                # Store in database
-                stored_count = 0
-                
-                for _, row in df.iterrows():
-                    try:
-                        # Insert data with ON DUPLICATE KEY UPDATE
-                        insert_query = """
-                            INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON DUPLICATE KEY UPDATE
-                                open = VALUES(open),
-                                high = VALUES(high),
-                                low = VALUES(low),
-                                close = VALUES(close),
-                                volume = VALUES(volume)
-                        """
-                        
-                        db.execute_query(insert_query, (
-                            symbol_id,
-                            row['Date'].date(),
-                            float(row['Open']),
-                            float(row['High']),
-                            float(row['Low']),
-                            float(row['Close']),
-                            int(row['Volume'])
-                        ))
-                        
-                        stored_count += 1
-                        
-                    except Exception as e:
-                        print(f"    ⚠️  Error storing record for {row['Date'].date()}: {e}")
-                        continue
-                
-                print(f"  ✅ Stored {stored_count} records for {symbol}")
+        # Symbols are independent, so they are processed in parallel worker processes, each
+        # with its own database connection; reports are printed in symbol order. Workers are
+        # spawned rather than forked so they don't inherit this process's open connection
+        with ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context('spawn')) as executor:
+            for report, stored_count in executor.map(process_symbol, symbols_result):
+                print(report)
                 total_stored += stored_count
-                
-            except Exception as e:
-                print(f"  ❌ Error processing {symbol}: {e}")
-                continue
         
         print(f"\n🎉 Database Update Complete!")
         print(f"📊 Total records stored: {total_stored}")
@@ -134,7 +224,12 @@ def update_database_from_csv():
 
 def main():
     """Main function"""
-    update_database_from_csv()
+    parser = argparse.ArgumentParser(description="Update the database from the 3-year CSV files")
+    parser.add_argument('--full', action='store_true',
+                        help="re-insert every CSV row, not just those from the latest stored date on")
+    args = parser.parse_args()
+    
+    update_database_from_csv(full=args.full)
 
 if __name__ == "__main__":
     main()
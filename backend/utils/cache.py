@@ -0,0 +1,12 @@
+"""
+Response cache for the API blueprints
+In-process (SimpleCache), so each worker process keeps its own entries.
+"""
+from flask_caching import Cache
+
+cache = Cache(config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
+
+
+def is_success(response):
+    """Cache only successful responses (error paths return a (response, status) tuple)"""
+    return not isinstance(response, tuple)
@@ -25,7 +25,8 @@ class DatabaseConnection:
                 database=self.config.MYSQL_DATABASE,
                 charset='utf8mb4',
                 cursorclass=pymysql.cursors.DictCursor,
-                autocommit=True
+                autocommit=True,
+                local_infile=self.config.MYSQL_LOCAL_INFILE
             )
             logger.info("Database connection established")
             return True
@@ -68,6 +69,20 @@ class DatabaseConnection:
             logger.error(f"Insert/Update execution failed: {e}")
             return False
     
+    def execute_statement(self, query, params=None):
+        """Execute any statement (DDL included); returns its rowcount, or None on failure"""
+        if not self.connection:
+            if not self.connect():
+                return None
+        
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Statement execution failed: {e}")
+            return None
+    
     def execute_many(self, query, params_list):
         """Execute multiple INSERT/UPDATE operations"""
         if not self.connection:
@@ -82,6 +97,44 @@ class DatabaseConnection:
             logger.error(f"Batch execution failed: {e}")
             return 0
 
+    def execute_load_data(self, file_path, table, columns):
+        """Bulk-load a CSV file into a table with LOAD DATA LOCAL INFILE"""
+        if not self.connection:
+            if not self.connect():
+                return None
+        
+        query = f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+            FIELDS TERMINATED BY ','
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columns)})
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(query, (file_path,))
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"LOAD DATA execution failed: {e}")
+            return None
+    
+    def execute_staged_load(self, file_path, stage_ddl, stage_table, columns, merge_query):
+        """
+        Bulk-load a CSV file into a staging table (created by stage_ddl), then
+        merge it into the target table with merge_query (an INSERT ... SELECT
+        from the stage). The stage is emptied afterwards.
+        Returns the number of rows loaded, or None if any step fails.
+        """
+        if self.execute_statement(stage_ddl) is None:
+            return None
+        
+        try:
+            loaded = self.execute_load_data(file_path, stage_table, columns)
+            if loaded is None or self.execute_statement(merge_query) is None:
+                return None
+            return loaded
+        finally:
+            self.execute_statement(f"TRUNCATE TABLE {stage_table}")
+
 def get_db_connection():
     """Get a database connection instance"""
     return DatabaseConnection()
@@ -0,0 +1,29 @@
+"""
+Optional Numba support
+
+Exposes ``njit`` and ``prange``. When numba is installed these are the real
+thing; otherwise ``njit`` becomes a no-op decorator and ``prange`` falls back
+to ``range`` so the kernels still run as plain Python/NumPy.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+    logger.info("numba not installed - using pure Python kernels")
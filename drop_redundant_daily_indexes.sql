@@ -0,0 +1,14 @@
+-- Drop the daily_stock_data indexes that duplicate unique_symbol_date
+-- Run this in MySQL to update your existing database
+
+USE kyzereye_stock_data;
+
+-- unique_symbol_date (symbol_id, date) already serves every lookup these two did
+-- (and the symbol_id foreign key), so they only slowed down inserts
+ALTER TABLE daily_stock_data
+    DROP INDEX idx_symbol_id,
+    DROP INDEX idx_symbol_date;
+
+-- Verify the remaining indexes, and that the per-symbol range query uses unique_symbol_date
+SHOW INDEX FROM daily_stock_data;
+EXPLAIN SELECT MIN(date), MAX(date), COUNT(*) FROM daily_stock_data WHERE symbol_id = 1;
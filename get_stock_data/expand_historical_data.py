@@ -220,6 +220,8 @@ def store_data_in_database(df, symbol_id, db):
     """
     try:
         stored_count = 0
+        error_count = 0
+        first_errors = []  # (row, error) of the first few failures, reported once at the end
         
         for index, row in df.iterrows():
             try:
@@ -235,9 +237,12 @@ def store_data_in_database(df, symbol_id, db):
                         volume = VALUES(volume)
                 """
                 
+                # The scraper returns dates in a 'Date' column; raw yfinance frames keep them in the index
+                date_val = row['Date'] if 'Date' in row else index.date()
+                
                 db.execute_query(insert_query, (
                     symbol_id,
-                    index.date(),
+                    date_val,
                     float(row['Open']),
                     float(row['High']),
                     float(row['Low']),
@@ -248,9 +253,14 @@ def store_data_in_database(df, symbol_id, db):
                 stored_count += 1
                 
             except Exception as e:
-                print(f"    ⚠️  Error storing record for {index.date()}: {e}")
+                error_count += 1
+                if len(first_errors) < 5:
+                    first_errors.append((index, str(e)))
                 continue
         
+        if error_count:
+            print(f"    ⚠️  {error_count} records could not be stored, first: {first_errors}")
+        
         return stored_count
         
     except Exception as e:
@@ -6,7 +6,13 @@ Simple script to get 3 years of data for better backtesting
 
 import sys
 import os
+import asyncio
+import csv
+import tempfile
+import numpy as np
+import pandas as pd
 from datetime import datetime
+from itertools import repeat
 
 # Add the current directory to the path
 sys.path.append(os.path.dirname(__file__))
@@ -15,6 +21,41 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from stock_scraper import StockDataScraper
 from utils.database import get_db_connection
+from services.stock_service import bulk_load_daily_csv
+
+FETCH_CONCURRENCY = 10  # Yahoo Finance requests in flight at once
+BULK_LOAD_MIN_ROWS = 10000  # Loads at least this large (all symbols together) go through LOAD DATA
+
+# Insert data with ON DUPLICATE KEY UPDATE to handle duplicates. Built once; executemany
+# sends each batch as a single multi-row INSERT
+DAILY_UPSERT_QUERY = """
+    INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        open = VALUES(open),
+        high = VALUES(high),
+        low = VALUES(low),
+        close = VALUES(close),
+        volume = VALUES(volume)
+"""
+
+def fetch_all_symbols(scraper, symbols, period="3y"):
+    """
+    Fetch every symbol's data concurrently, at most FETCH_CONCURRENCY at a time.
+    Returns {symbol: DataFrame, None (no data) or the exception the fetch raised}.
+    """
+    async def fetch_all():
+        limit = asyncio.Semaphore(FETCH_CONCURRENCY)
+        
+        async def fetch_one(symbol):
+            async with limit:
+                # The scraper (yfinance) is blocking, so each fetch runs on a worker thread
+                return await asyncio.to_thread(scraper.get_stock_data, symbol, period)
+        
+        results = await asyncio.gather(*(fetch_one(symbol) for symbol in symbols), return_exceptions=True)
+        return dict(zip(symbols, results))
+    
+    return asyncio.run(fetch_all())
 
 def fetch_3year_data():
     """Fetch 3 years of historical data for all symbols"""
@@ -22,7 +63,7 @@ def fetch_3year_data():
     print("=" * 50)
     
     # Initialize scraper
-    scraper = StockDataScraper()
+    scraper = StockDataScraper(cache_dir="cache")  # Re-runs within a day reuse fetched data
     
     # Load symbols from file
     symbols = scraper.load_symbols_from_file("stock_symbols.txt")
@@ -33,6 +74,11 @@ def fetch_3year_data():
     print(f"📊 Processing {len(symbols)} symbols for 3-year data...")
     print()
     
+    # Fetch 3 years of data for every symbol up front, concurrently
+    print(f"📥 Fetching 3 years of data for {len(symbols)} symbols...")
+    fetched = fetch_all_symbols(scraper, symbols, period="3y")
+    print()
+    
     # Connect to database
     db = get_db_connection()
     if not db.connect():
@@ -43,24 +89,42 @@ def fetch_3year_data():
         success_count = 0
         failed_count = 0
         
+        # Symbol IDs for every symbol in one query
+        placeholders = ', '.join(['%s'] * len(symbols))
+        id_query = f"SELECT id, symbol FROM stock_symbols WHERE symbol IN ({placeholders})"
+        sym_to_id = {row['symbol']: row['id'] for row in db.execute_query(id_query, symbols) or []}
+        
+        # Initial seeding: with LOAD DATA enabled and enough rows, every symbol goes into the
+        # table in one bulk load instead of a batched insert per symbol
+        bulk_counts = {}
+        if db.config.MYSQL_LOCAL_INFILE:
+            pending = {
+                symbol: build_rows(df, sym_to_id[symbol])[0] for symbol, df in fetched.items()
+                if symbol in sym_to_id and isinstance(df, pd.DataFrame) and not df.empty
+            }
+            all_rows = [row for rows in pending.values() for row in rows]
+            if len(all_rows) >= BULK_LOAD_MIN_ROWS:
+                print(f"💾 Bulk-loading {len(all_rows)} records for {len(pending)} symbols...")
+                if bulk_load_daily_data(all_rows, db) is not None:
+                    bulk_counts = {symbol: len(rows) for symbol, rows in pending.items()}
+                else:
+                    print("  ⚠️  Bulk load failed, falling back to batched inserts")
+                print()
+        
         for i, symbol in enumerate(symbols, 1):
             print(f"[{i}/{len(symbols)}] Processing {symbol}...")
             
             try:
-                # Get symbol ID
-                symbol_query = "SELECT id FROM stock_symbols WHERE symbol = %s"
-                symbol_result = db.execute_query(symbol_query, (symbol,))
-                
-                if not symbol_result:
+                symbol_id = sym_to_id.get(symbol)
+                if symbol_id is None:
                     print(f"  ❌ Symbol {symbol} not found in database")
                     failed_count += 1
                     continue
                 
-                symbol_id = symbol_result[0]['id']
-                
-                # Fetch 3 years of data
-                print(f"  📥 Fetching 3 years of data...")
-                df = scraper.get_stock_data(symbol, period="3y")
+                # 3 years of data, fetched above
+                df = fetched[symbol]
+                if isinstance(df, Exception):
+                    raise df
                 
                 if df is None or df.empty:
                     print(f"  ❌ No data received for {symbol}")
@@ -72,9 +136,12 @@ def fetch_3year_data():
                 end_date = df.index[-1].date() if hasattr(df.index[-1], 'date') else df.index[-1]
                 print(f"  📊 Received {len(df)} records from {start_date} to {end_date}")
                 
-                # Store in database
-                print(f"  💾 Storing in database...")
-                stored_count = store_data_in_database(df, symbol_id, db)
+                # Store in database (unless bulk-loaded above)
+                if symbol in bulk_counts:
+                    stored_count = bulk_counts[symbol]
+                else:
+                    print(f"  💾 Storing in database...")
+                    stored_count = store_data_in_database(df, symbol_id, db)
                 print(f"  ✅ Stored {stored_count} records in database")
                 
                 # Update CSV file
@@ -91,17 +158,13 @@ def fetch_3year_data():
             
             print()
         
-        # Update combined portfolio CSV
+        # Update combined portfolio CSV from the data fetched above
         print("📊 Updating combined portfolio data...")
         try:
-            all_data = {}
-            for symbol in symbols:
-                try:
-                    df = scraper.get_stock_data(symbol, period="3y")
-                    if df is not None and not df.empty:
-                        all_data[symbol] = df
-                except:
-                    continue
+            all_data = {
+                symbol: df for symbol, df in fetched.items()
+                if isinstance(df, pd.DataFrame) and not df.empty
+            }
             
             if all_data:
                 scraper.save_multiple_to_csv(all_data, individual_files=False, combined_file="portfolio_3year_data.csv")
@@ -119,32 +182,31 @@ def fetch_3year_data():
         # Show final data ranges
         print(f"\n📋 Final Data Ranges (3 years):")
         print("-" * 40)
+        ranges = {}
+        if sym_to_id:
+            # Date ranges of every symbol in one grouped query
+            id_placeholders = ', '.join(['%s'] * len(sym_to_id))
+            range_query = f"""
+                SELECT 
+                    symbol_id,
+                    MIN(date) as earliest_date,
+                    MAX(date) as latest_date,
+                    COUNT(*) as total_records
+                FROM daily_stock_data 
+                WHERE symbol_id IN ({id_placeholders})
+                GROUP BY symbol_id
+            """
+            ranges = {row['symbol_id']: row for row in db.execute_query(range_query, list(sym_to_id.values())) or []}
+        
         for symbol in symbols:
-            try:
-                symbol_query = "SELECT id FROM stock_symbols WHERE symbol = %s"
-                symbol_result = db.execute_query(symbol_query, (symbol,))
-                
-                if symbol_result:
-                    symbol_id = symbol_result[0]['id']
-                    range_query = """
-                        SELECT 
-                            MIN(date) as earliest_date,
-                            MAX(date) as latest_date,
-                            COUNT(*) as total_records
-                        FROM daily_stock_data 
-                        WHERE symbol_id = %s
-                    """
-                    range_result = db.execute_query(range_query, (symbol_id,))
-                    
-                    if range_result:
-                        earliest = range_result[0]['earliest_date']
-                        latest = range_result[0]['latest_date']
-                        records = range_result[0]['total_records']
-                        days = (latest - earliest).days
-                        years = days / 365.25
-                        print(f"  📊 {symbol}: {earliest} to {latest} ({records} records, {years:.1f} years)")
-            except Exception as e:
-                print(f"  ❌ {symbol}: Error getting final range - {e}")
+            range_row = ranges.get(sym_to_id.get(symbol))
+            if range_row:
+                earliest = range_row['earliest_date']
+                latest = range_row['latest_date']
+                records = range_row['total_records']
+                days = (latest - earliest).days
+                years = days / 365.25
+                print(f"  📊 {symbol}: {earliest} to {latest} ({records} records, {years:.1f} years)")
         
         print(f"\n✅ Ready for backtesting with 3 years of data!")
         
@@ -153,55 +215,70 @@ def fetch_3year_data():
     finally:
         db.disconnect()
 
+def build_rows(df, symbol_id):
+    """
+    daily_stock_data parameter tuples for the rows of df, built column-wise.
+    Rows with a missing price or volume can't be stored and are left out;
+    returns (rows, number of rows left out).
+    """
+    # The scraper returns dates in a 'Date' column; raw yfinance frames keep them in the index
+    dates = pd.DatetimeIndex(df['Date'] if 'Date' in df.columns else df.index).date
+    complete = df[['Open', 'High', 'Low', 'Close', 'Volume']].notna().all(axis=1).to_numpy()
+    
+    prices = df[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64)[complete]
+    rows = list(zip(
+        repeat(symbol_id),
+        dates[complete].tolist(),
+        prices[:, 0].tolist(),
+        prices[:, 1].tolist(),
+        prices[:, 2].tolist(),
+        prices[:, 3].tolist(),
+        df['Volume'].to_numpy()[complete].astype(np.int64).tolist()
+    ))
+    return rows, int((~complete).sum())
+
 def store_data_in_database(df, symbol_id, db):
     """Store stock data in database, handling duplicates"""
     try:
-        stored_count = 0
+        rows, skipped = build_rows(df, symbol_id)
+        if skipped:
+            print(f"    ⚠️  Skipping {skipped} rows with missing values")
+        if not rows:
+            return 0
         
-        for index, row in df.iterrows():
-            try:
-                # Insert data with ON DUPLICATE KEY UPDATE to handle duplicates
-                insert_query = """
-                    INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                        open = VALUES(open),
-                        high = VALUES(high),
-                        low = VALUES(low),
-                        close = VALUES(close),
-                        volume = VALUES(volume)
-                """
-                
-                # Handle different index types
-                if hasattr(index, 'date'):
-                    date_val = index.date()
-                elif hasattr(index, 'to_pydatetime'):
-                    date_val = index.to_pydatetime().date()
-                else:
-                    date_val = index
-                
-                db.execute_query(insert_query, (
-                    symbol_id,
-                    date_val,
-                    float(row['Open']),
-                    float(row['High']),
-                    float(row['Low']),
-                    float(row['Close']),
-                    int(row['Volume'])
-                ))
-                
-                stored_count += 1
-                
-            except Exception as e:
-                print(f"    ⚠️  Error storing record for {index}: {e}")
-                continue
+        # Written in one batch and one transaction, on a cursor of our own so a failure
+        # raises and rolls back (execute_many swallows errors)
+        db.connection.begin()
+        try:
+            with db.connection.cursor() as cursor:
+                cursor.executemany(DAILY_UPSERT_QUERY, rows)
+            db.connection.commit()
+        except Exception:
+            db.connection.rollback()
+            raise
         
-        return stored_count
+        # rowcount counts an upsert twice (or not at all if unchanged), so count rows
+        return len(rows)
         
     except Exception as e:
         print(f"    ❌ Error storing data: {e}")
         return 0
 
+def bulk_load_daily_data(rows, db):
+    """
+    Load daily_stock_data rows (of any number of symbols) with LOAD DATA LOCAL INFILE
+    into a staging table, then merge them with a single INSERT ... SELECT.
+    Returns the number of rows loaded, or None if any step fails.
+    """
+    fd, csv_path = tempfile.mkstemp(suffix='.csv')
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            csv.writer(f, lineterminator='\n').writerows(rows)
+        
+        return bulk_load_daily_csv(db, csv_path)
+    finally:
+        os.remove(csv_path)
+
 def main():
     """Main function"""
     print("📈 3-Year Historical Data Fetcher")
@@ -15,6 +15,18 @@ from stock_scraper import StockDataScraper
 from utils.database import get_db_connection
 from models.stock_models import StockSymbol
 
+# Built once; executemany sends each batch as a single multi-row INSERT
+DAILY_UPSERT_QUERY = """
+    INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    open = VALUES(open),
+    high = VALUES(high),
+    low = VALUES(low),
+    close = VALUES(close),
+    volume = VALUES(volume)
+"""
+
 def store_data_in_database(stock_data_dict):
     """Store stock data in MySQL database"""
     db = get_db_connection()
@@ -26,30 +38,19 @@ def store_data_in_database(stock_data_dict):
     try:
         stored_count = 0
         
+        # Symbol IDs for every symbol in one query, instead of a lookup per symbol
+        symbols = [symbol.upper() for symbol in stock_data_dict]
+        placeholders = ', '.join(['%s'] * len(symbols))
+        id_query = f"SELECT id, symbol FROM stock_symbols WHERE symbol IN ({placeholders})"
+        sym_to_id = {row['symbol']: row['id'] for row in db.execute_query(id_query, symbols) or []} if symbols else {}
+        
         for symbol, df in stock_data_dict.items():
             print(f"📊 Storing {symbol} data in database...")
             
-            # Get symbol ID
-            symbol_query = "SELECT id FROM stock_symbols WHERE symbol = %s"
-            symbol_result = db.execute_query(symbol_query, (symbol.upper(),))
-            
-            if not symbol_result:
+            symbol_id = sym_to_id.get(symbol.upper())
+            if symbol_id is None:
                 print(f"  ⚠️  Symbol {symbol} not found in database, skipping...")
                 continue
-                
-            symbol_id = symbol_result[0]['id']
-            
-            # Prepare data for insertion
-            insert_query = """
-                INSERT INTO daily_stock_data (symbol_id, date, open, high, low, close, volume)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                open = VALUES(open),
-                high = VALUES(high),
-                low = VALUES(low),
-                close = VALUES(close),
-                volume = VALUES(volume)
-            """
             
             data_to_insert = []
             for _, row in df.iterrows():
@@ -64,7 +65,7 @@ def store_data_in_database(stock_data_dict):
                 ))
             
             # Insert data
-            rows_inserted = db.execute_many(insert_query, data_to_insert)
+            rows_inserted = db.execute_many(DAILY_UPSERT_QUERY, data_to_insert)
             stored_count += rows_inserted
             print(f"  ✅ Stored {rows_inserted} rows for {symbol}")
         
@@ -83,7 +84,7 @@ def main():
     print("=" * 50)
     
     # Create scraper
-    scraper = StockDataScraper()
+    scraper = StockDataScraper(cache_dir="cache")  # Re-runs within a day reuse fetched data
     
     # Load stock symbols from file
     symbols = scraper.load_symbols_from_file("stock_symbols.txt")
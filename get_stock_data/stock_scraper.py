@@ -8,13 +8,21 @@ import yfinance as yf
 import pandas as pd
 import time
 import os
-from datetime import datetime
+from datetime import datetime, date
+
+CACHE_TTL_SECONDS = 24 * 60 * 60  # Reuse a fetched history for up to a day
 
 class StockDataScraper:
-    def __init__(self, output_dir="csv_files"):
+    def __init__(self, output_dir="csv_files", cache_dir=None, cache_ttl=CACHE_TTL_SECONDS):
         self.output_dir = output_dir
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Optional on-disk cache of fetched histories (off unless cache_dir is given)
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
     
     def load_symbols_from_file(self, filename="stock_symbols.txt"):
         """
@@ -48,7 +56,9 @@ class StockDataScraper:
         
     def get_stock_data(self, symbol, period='1y'):
         """
-        Get historical stock data for a given symbol using yfinance
+        Get historical stock data for a given symbol using yfinance.
+        A history fetched for the same symbol and period today, less than
+        cache_ttl seconds ago, is read back from the cache instead.
         
         Args:
             symbol (str): Stock symbol (e.g., 'A', 'AAPL')
@@ -57,6 +67,36 @@ class StockDataScraper:
         Returns:
             pandas.DataFrame: Historical stock data
         """
+        cache_path = self._cache_path(symbol, period)
+        if cache_path and os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < self.cache_ttl:
+            try:
+                df = pd.read_pickle(cache_path)
+                print(f"Using cached Yahoo Finance data for {symbol} ({period}): {len(df)} rows")
+                return df
+            except Exception as e:
+                print(f"  Could not read cached data for {symbol}, fetching again: {e}")
+        
+        df = self._fetch_stock_data(symbol, period)
+        
+        if cache_path and df is not None:
+            try:
+                # Write then rename, so a concurrent reader never sees a partial file
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                df.to_pickle(tmp_path)
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                print(f"  Could not cache data for {symbol}: {e}")
+        
+        return df
+    
+    def _cache_path(self, symbol, period):
+        """Cache file for symbol/period fetched today, or None when caching is off"""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{symbol}_{period}_{date.today().isoformat()}.pkl")
+    
+    def _fetch_stock_data(self, symbol, period):
+        """Fetch and clean historical data for symbol from Yahoo Finance"""
         try:
             print(f"Fetching Yahoo Finance data for {symbol} ({period})...")
             
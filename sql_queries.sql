@@ -35,10 +35,9 @@ CREATE TABLE IF NOT EXISTS daily_stock_data (
     volume BIGINT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (symbol_id) REFERENCES stock_symbols(id) ON DELETE CASCADE,
+    -- Backs the ON DUPLICATE KEY upserts, per-symbol lookups/ranges and the symbol_id foreign key
     UNIQUE KEY unique_symbol_date (symbol_id, date),
-    INDEX idx_symbol_id (symbol_id),
-    INDEX idx_date (date),
-    INDEX idx_symbol_date (symbol_id, date)
+    INDEX idx_date (date)
 );
 
 -- Table 3: Technical Indicators (Future-ready)
@@ -120,6 +119,6 @@ INSERT IGNORE INTO stock_symbols (symbol, company_name) VALUES
 -- Get latest data for all stocks
 -- SELECT s.symbol, d.date, d.close, d.volume 
 -- FROM stock_symbols s 
--- LEFT JOIN daily_stock_data d ON s.id = d.symbol_id 
--- WHERE d.date = (SELECT MAX(date) FROM daily_stock_data WHERE symbol_id = s.id) 
+-- JOIN (SELECT symbol_id, MAX(date) AS max_date FROM daily_stock_data GROUP BY symbol_id) m ON m.symbol_id = s.id
+-- JOIN daily_stock_data d ON d.symbol_id = s.id AND d.date = m.max_date
 -- ORDER BY s.symbol;